@@ -0,0 +1,12 @@
+-- AlterEnum
+ALTER TYPE "BatchItemStatus" ADD VALUE 'queued';
+ALTER TYPE "BatchItemStatus" ADD VALUE 'processing';
+
+-- AlterTable
+ALTER TABLE "BatchRunItem"
+ADD COLUMN "attemptCount" INTEGER NOT NULL DEFAULT 0,
+ADD COLUMN "lockedBy" TEXT,
+ADD COLUMN "lockedUntil" TIMESTAMP(3);
+
+-- CreateIndex
+CREATE INDEX "BatchRunItem_status_lockedUntil_idx" ON "BatchRunItem"("status", "lockedUntil");
@@ -0,0 +1,32 @@
+-- CreateEnum
+CREATE TYPE "PreflightImpactRunStatus" AS ENUM ('queued', 'processing', 'completed', 'failed');
+
+-- AlterTable
+ALTER TABLE "DesignJob"
+ADD COLUMN "preflightStatus" "ExportPreflightStatus",
+ADD COLUMN "preflightCheckedAt" TIMESTAMP(3);
+
+-- CreateIndex
+CREATE INDEX "DesignJob_productProfileId_status_idx" ON "DesignJob"("productProfileId", "status");
+
+-- CreateTable
+CREATE TABLE "PreflightImpactRun" (
+    "id" TEXT NOT NULL,
+    "productProfileId" TEXT NOT NULL,
+    "status" "PreflightImpactRunStatus" NOT NULL DEFAULT 'queued',
+    "checkedJobs" INTEGER NOT NULL DEFAULT 0,
+    "newlyFailingJobs" INTEGER NOT NULL DEFAULT 0,
+    "startedAt" TIMESTAMP(3),
+    "finishedAt" TIMESTAMP(3),
+    "summaryJson" JSONB,
+    "error" TEXT,
+    "createdAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "PreflightImpactRun_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE INDEX "PreflightImpactRun_productProfileId_createdAt_idx" ON "PreflightImpactRun"("productProfileId", "createdAt");
+
+-- AddForeignKey
+ALTER TABLE "PreflightImpactRun" ADD CONSTRAINT "PreflightImpactRun_productProfileId_fkey" FOREIGN KEY ("productProfileId") REFERENCES "ProductProfile"("id") ON DELETE CASCADE ON UPDATE CASCADE;
@@ -0,0 +1,16 @@
+-- CreateTable
+CREATE TABLE "DesignJobSummary" (
+    "productProfileId" TEXT NOT NULL,
+    "status" "DesignJobStatus" NOT NULL,
+    "preflightOutcome" TEXT NOT NULL,
+    "jobCount" INTEGER NOT NULL DEFAULT 0,
+    "updatedAt" TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "DesignJobSummary_pkey" PRIMARY KEY ("productProfileId", "status", "preflightOutcome")
+);
+
+-- Backfill
+INSERT INTO "DesignJobSummary" ("productProfileId", "status", "preflightOutcome", "jobCount", "updatedAt")
+SELECT "productProfileId", "status", COALESCE("preflightStatus"::text, 'unchecked'), COUNT(*), CURRENT_TIMESTAMP
+FROM "DesignJob"
+GROUP BY "productProfileId", "status", COALESCE("preflightStatus"::text, 'unchecked');
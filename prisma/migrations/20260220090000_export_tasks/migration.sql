@@ -0,0 +1,32 @@
+-- CreateEnum
+CREATE TYPE "ExportTaskStatus" AS ENUM ('queued', 'running', 'succeeded', 'failed');
+
+-- CreateTable
+CREATE TABLE "ExportTask" (
+    "id" TEXT NOT NULL,
+    "designJobId" TEXT NOT NULL,
+    "status" "ExportTaskStatus" NOT NULL DEFAULT 'queued',
+    "progress" DOUBLE PRECISION NOT NULL DEFAULT 0,
+    "artifactsJson" JSONB,
+    "metadataJson" JSONB,
+    "errorJson" JSONB,
+    "lockedBy" TEXT,
+    "lockedUntil" TIMESTAMP(3),
+    "finishedAt" TIMESTAMP(3),
+    "createdAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "updatedAt" TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "ExportTask_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE INDEX "ExportTask_designJobId_idx" ON "ExportTask"("designJobId");
+
+-- CreateIndex
+CREATE INDEX "ExportTask_status_lockedUntil_idx" ON "ExportTask"("status", "lockedUntil");
+
+-- CreateIndex
+CREATE INDEX "ExportTask_finishedAt_idx" ON "ExportTask"("finishedAt");
+
+-- AddForeignKey
+ALTER TABLE "ExportTask" ADD CONSTRAINT "ExportTask_designJobId_fkey" FOREIGN KEY ("designJobId") REFERENCES "DesignJob"("id") ON DELETE CASCADE ON UPDATE CASCADE;
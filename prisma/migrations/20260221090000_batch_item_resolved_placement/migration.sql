@@ -0,0 +1,7 @@
+-- AlterTable
+ALTER TABLE "BatchRun" ADD COLUMN "machineProfileId" TEXT;
+
+-- AlterTable
+ALTER TABLE "BatchRunItem"
+ADD COLUMN "placementJson" JSONB,
+ADD COLUMN "placementHash" TEXT;
@@ -0,0 +1,283 @@
+"""BatchRun executor.
+
+Workers claim queued ``BatchRunItem`` rows with ``SELECT ... FOR UPDATE SKIP LOCKED``,
+so any number of processes on any number of nodes can drain the same run. A claim
+is a lease: the item moves to ``processing`` with ``lockedBy``/``lockedUntil`` set.
+If a worker dies its lease expires and the item is claimed again, until
+``attemptCount`` reaches ``BATCH_WORKER_MAX_ATTEMPTS``.
+
+Items are queued by the web app's ``createBatchRun`` when ``BATCH_EXECUTION=worker``.
+It has already validated the row's tokens and applied the run's placement policy,
+and stores the resulting document and its fingerprint on the item, so the worker
+only turns that document into a job and exports it.
+
+Run with ``python -m app.batch_worker --processes 4 [--batch-run-id ID] [--drain]``.
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+from .config import settings
+from .db import SessionLocal, dispose_engine
+from .errors import AppError
+from .export import export_design_job_payload
+from .job_summary import job_summary_key, record_job_change
+from .models import BatchRun, BatchRunItem, DesignJob
+from .placement_models import load_placement_document
+
+logger = logging.getLogger("lt316.batch_worker")
+
+PENDING_ITEM_STATUSES = ("queued", "processing")
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_statement(now: datetime, limit: int, batch_run_id: str | None = None):
+    lease_expired = and_(BatchRunItem.status == "processing", BatchRunItem.lockedUntil < now)
+    stmt = (
+        select(BatchRunItem)
+        .where(
+            or_(BatchRunItem.status == "queued", lease_expired),
+            BatchRunItem.attemptCount < settings.batch_worker_max_attempts,
+        )
+        .order_by(BatchRunItem.batchRunId, BatchRunItem.rowIndex)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    if batch_run_id:
+        stmt = stmt.where(BatchRunItem.batchRunId == batch_run_id)
+    return stmt
+
+
+def claim_batch_items(db: Session, worker_id: str, limit: int, batch_run_id: str | None = None) -> list[str]:
+    now = _utcnow()
+    items = db.scalars(claim_statement(now, limit, batch_run_id)).all()
+
+    lease_until = now + timedelta(seconds=settings.batch_worker_lease_seconds)
+    for item in items:
+        item.status = "processing"
+        item.lockedBy = worker_id
+        item.lockedUntil = lease_until
+        item.attemptCount = (item.attemptCount or 0) + 1
+
+    run_ids = {item.batchRunId for item in items}
+    if run_ids:
+        db.execute(
+            update(BatchRun)
+            .where(BatchRun.id.in_(run_ids), BatchRun.status == "queued")
+            .values(status="processing", startedAt=now)
+        )
+
+    db.commit()
+    return [item.id for item in items]
+
+
+def fail_exhausted_items(db: Session) -> set[str]:
+    """Fail items whose lease expired after their last allowed attempt."""
+    items = db.scalars(
+        select(BatchRunItem)
+        .where(
+            BatchRunItem.status == "processing",
+            BatchRunItem.lockedUntil < _utcnow(),
+            BatchRunItem.attemptCount >= settings.batch_worker_max_attempts,
+        )
+        .with_for_update(skip_locked=True)
+    ).all()
+
+    for item in items:
+        item.status = "failed"
+        item.errorMessage = item.errorMessage or "Worker did not finish the item before its lease expired."
+        item.lockedBy = None
+        item.lockedUntil = None
+
+    db.commit()
+    return {item.batchRunId for item in items}
+
+
+def _design_job_for_item(db: Session, item: BatchRunItem, run: BatchRun) -> DesignJob:
+    # DesignJob.batchRunItemId is unique, so a retried item reuses the job
+    # created by an earlier attempt instead of creating a duplicate.
+    job = db.scalar(select(DesignJob).where(DesignJob.batchRunItemId == item.id))
+    if job:
+        return job
+
+    # Token validation and the placement policy ran when the item was queued; the
+    # worker must not rebuild the document from the template and skip them.
+    if item.placementJson is None:
+        raise AppError("Batch item has no policy-resolved placement", 422, "BATCH_ITEM_UNRESOLVED")
+
+    tokens = item.resolvedTokensJson or {}
+    now = _utcnow()
+    job = DesignJob(
+        id=str(uuid4()),
+        orderRef=tokens.get("order_number") or None,
+        productProfileId=run.productProfileId,
+        machineProfileId=run.machineProfileId or settings.batch_default_machine_profile_id,
+        status="draft",
+        placementJson=load_placement_document(item.placementJson).to_json_dict(),
+        placementHash=item.placementHash,
+        templateId=run.templateId,
+        batchRunItemId=item.id,
+        createdAt=now,
+        updatedAt=now,
+    )
+    db.add(job)
+    record_job_change(db, None, job_summary_key(job))
+    db.flush()
+    return job
+
+
+def process_batch_item(db: Session, item_id: str, worker_id: str) -> str | None:
+    """Process one claimed item; returns its batch run id, or None if the lease was lost."""
+    # Holding the row lock for the whole item makes the job, artifacts and
+    # status update commit atomically, and only while this worker owns the lease.
+    item = db.scalar(
+        select(BatchRunItem)
+        .where(BatchRunItem.id == item_id, BatchRunItem.lockedBy == worker_id, BatchRunItem.status == "processing")
+        .with_for_update()
+    )
+    if not item:
+        db.rollback()
+        return None
+
+    run_id = item.batchRunId
+    try:
+        run = db.get(BatchRun, run_id)
+        if not run:
+            raise AppError("Batch run not found", 404, "NOT_FOUND")
+        job = _design_job_for_item(db, item, run)
+        export_design_job_payload(db, job.id)
+        item.status = "success"
+        item.errorMessage = None
+    except AppError as error:
+        item.status = "failed"
+        item.errorMessage = error.message
+        if error.code == "PREFLIGHT_FAILED" and isinstance(error.details, dict):
+            item.warningsJson = error.details.get("issues", [])
+    except Exception as error:
+        db.rollback()
+        logger.exception("Batch item %s failed on attempt by %s", item_id, worker_id)
+        _release_for_retry(db, item_id, worker_id, str(error))
+        return run_id
+
+    item.lockedBy = None
+    item.lockedUntil = None
+    db.commit()
+    return run_id
+
+
+def _release_for_retry(db: Session, item_id: str, worker_id: str, reason: str) -> None:
+    item = db.scalar(
+        select(BatchRunItem).where(BatchRunItem.id == item_id, BatchRunItem.lockedBy == worker_id).with_for_update()
+    )
+    if not item:
+        db.rollback()
+        return
+
+    item.status = "queued" if item.attemptCount < settings.batch_worker_max_attempts else "failed"
+    item.errorMessage = reason
+    item.lockedBy = None
+    item.lockedUntil = None
+    db.commit()
+
+
+def finalize_batch_run(db: Session, batch_run_id: str) -> bool:
+    pending = db.scalar(
+        select(func.count())
+        .select_from(BatchRunItem)
+        .where(BatchRunItem.batchRunId == batch_run_id, BatchRunItem.status.in_(PENDING_ITEM_STATUSES))
+    )
+    if pending:
+        return False
+
+    items = db.scalars(select(BatchRunItem).where(BatchRunItem.batchRunId == batch_run_id).order_by(BatchRunItem.rowIndex)).all()
+    valid_rows = sum(1 for item in items if item.status == "success")
+    invalid_rows = sum(1 for item in items if item.status == "failed")
+    status = "partial" if invalid_rows and valid_rows else "failed" if invalid_rows else "completed"
+    results = [
+        {"rowIndex": item.rowIndex, "status": item.status, **({"error": item.errorMessage} if item.status == "failed" else {})}
+        for item in items
+    ]
+
+    # The status guard makes concurrent finalizers idempotent: only the first one applies.
+    finalized = db.execute(
+        update(BatchRun)
+        .where(BatchRun.id == batch_run_id, BatchRun.status.in_(("queued", "processing")))
+        .values(
+            validRows=valid_rows,
+            invalidRows=invalid_rows,
+            status=status,
+            finishedAt=_utcnow(),
+            summaryJson={"results": results},
+        )
+    )
+    db.commit()
+    return finalized.rowcount > 0
+
+
+def run_worker(worker_id: str | None = None, batch_run_id: str | None = None, drain: bool = False) -> int:
+    worker_id = worker_id or default_worker_id()
+    processed = 0
+
+    while True:
+        with SessionLocal() as db:
+            touched_runs = fail_exhausted_items(db)
+            for run_id in touched_runs:
+                finalize_batch_run(db, run_id)
+            claimed = claim_batch_items(db, worker_id, settings.batch_worker_claim_size, batch_run_id)
+
+        if not claimed:
+            if drain:
+                return processed
+            time.sleep(settings.batch_worker_poll_seconds)
+            continue
+
+        for item_id in claimed:
+            with SessionLocal() as db:
+                run_id = process_batch_item(db, item_id, worker_id)
+                if run_id:
+                    finalize_batch_run(db, run_id)
+            processed += 1
+
+
+def _worker_process(batch_run_id: str | None, drain: bool) -> None:
+    # Each process owns its own connection pool.
+    dispose_engine()
+    processed = run_worker(batch_run_id=batch_run_id, drain=drain)
+    logger.info("Worker %s processed %s items", default_worker_id(), processed)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Drain queued BatchRun items.")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-run-id", default=None)
+    parser.add_argument("--drain", action="store_true", help="exit once no claimable items remain")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_worker_process, args=(args.batch_run_id, args.drain))
+        for _ in range(max(1, args.processes))
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,35 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     database_url: str = ""
+    # Optional read replica for read-only endpoints; empty means every query uses database_url.
+    database_read_url: str = ""
+    # After a write, reads of the same resource stay on the primary for this long (replica lag).
+    # Other workers honour it through the X-Read-After header/cookie set on the write's response.
+    read_your_writes_seconds: float = 5.0
     api_auth_required: bool = False
     api_auth_required_in_test: bool = False
     api_key: str = ""
     env: str = "development"
+    startup_warmup: bool = False
+    db_pool_warmup_connections: int = 0
+    batch_default_machine_profile_id: str = "fiber-galvo-300-lens-default"
+    batch_worker_claim_size: int = 10
+    # A claim must be processed within the lease or another worker may retry it.
+    batch_worker_lease_seconds: int = 300
+    batch_worker_max_attempts: int = 3
+    batch_worker_poll_seconds: float = 2.0
+    export_worker_threads: int = 4
+    export_task_max_pending: int = 100
+    export_task_retention_seconds: int = 3600
+    # The worker renews a running task's lease; once it expires (the process died) the sweep resumes the task.
+    export_task_lease_seconds: int = 300
+    export_task_sweep_interval_seconds: float = 60.0
+    asset_derivative_cache_dir: str = "./storage/derivatives"
+    asset_derivative_cache_max_bytes: int = 512 * 1024 * 1024
+    asset_derivative_workers: int = 2
+    asset_derivative_timeout_seconds: float = 30.0
+    preflight_impact_chunk_size: int = 200
+    preflight_impact_workers: int = 4
 
     model_config = SettingsConfigDict(
         env_file=(".env.local", ".env"),
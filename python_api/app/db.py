@@ -1,14 +1,29 @@
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Callable, TypeVar
 from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
 from .config import settings
+from .errors import AppError
+
+RECENT_WRITES_MAX_KEYS = 10_000
+ModelT = TypeVar("ModelT")
+T = TypeVar("T")
 
 
 def _sqlalchemy_database_url(raw: str) -> str:
     parsed = urlparse(raw)
 
     scheme = parsed.scheme
-    if scheme == "postgresql":
+    if scheme not in ("postgres", "postgresql", "postgresql+psycopg"):
+        return raw
+    if scheme in ("postgres", "postgresql"):
         scheme = "postgresql+psycopg"
 
     query_pairs = [(key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True) if key.lower() != "schema"]
@@ -17,8 +32,186 @@ def _sqlalchemy_database_url(raw: str) -> str:
     return urlunparse(normalized)
 
 
-engine = create_engine(_sqlalchemy_database_url(settings.database_url), pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+@lru_cache(maxsize=1)
+def get_engine() -> Engine:
+    # Built on first use so a worker can boot (and answer /api/health with a
+    # proper error) while DATABASE_URL or the database itself is unavailable.
+    if not settings.database_url:
+        raise AppError("Database configuration missing. Set DATABASE_URL.", 500, "DATABASE_URL_MISSING")
+    return create_engine(_sqlalchemy_database_url(settings.database_url), pool_pre_ping=True)
+
+
+@lru_cache(maxsize=1)
+def get_session_factory() -> sessionmaker[Session]:
+    return sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=get_engine())
+
+
+def SessionLocal() -> Session:
+    return get_session_factory()()
+
+
+def replica_configured() -> bool:
+    return bool(settings.database_read_url)
+
+
+@lru_cache(maxsize=1)
+def get_read_engine() -> Engine:
+    if not replica_configured():
+        return get_engine()
+    return create_engine(_sqlalchemy_database_url(settings.database_read_url), pool_pre_ping=True)
+
+
+@lru_cache(maxsize=1)
+def get_read_session_factory() -> sessionmaker[Session]:
+    return sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=get_read_engine())
+
+
+class RecentWrites:
+    """Resources written by this process in the last ``read_your_writes_seconds``.
+
+    Reads of those resources go to the primary, so a client that PATCHes and then
+    GETs sees its own write even while the replica lags behind. That only holds
+    when the GET reaches the same worker; across workers the client carries the
+    write time instead (see ``track_request_writes``).
+    """
+
+    def __init__(self, max_keys: int = RECENT_WRITES_MAX_KEYS) -> None:
+        self.max_keys = max_keys
+        self._until: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, key: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._until) >= self.max_keys:
+                self._until = {k: until for k, until in self._until.items() if until > now}
+            self._until[key] = now + settings.read_your_writes_seconds
+
+    def is_recent(self, key: str) -> bool:
+        with self._lock:
+            until = self._until.get(key)
+        return until is not None and until > time.monotonic()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._until.clear()
+
+
+recent_writes = RecentWrites()
+_read_primary: ContextVar[bool] = ContextVar("read_primary", default=False)
+# Wall-clock times of the writes made by the current request; a shared list, so
+# writes made in a threadpool copy of the context are still seen by the middleware.
+_request_writes: ContextVar[list[float] | None] = ContextVar("request_writes", default=None)
+
+
+def design_job_key(id: str) -> str:
+    return f"design-job:{id}"
+
+
+def product_profile_key(id: str) -> str:
+    return f"product-profile:{id}"
+
+
+def mark_written(*keys: str) -> None:
+    for key in keys:
+        recent_writes.mark(key)
+    writes = _request_writes.get()
+    if writes is not None and keys:
+        writes.append(time.time())
+
+
+@contextmanager
+def track_request_writes() -> Iterator[list[float]]:
+    """Collect the times of writes made while handling one request.
+
+    The middleware returns the latest as ``X-Read-After`` (and a cookie); a request
+    that sends it back within ``read_your_writes_seconds`` reads from the primary,
+    whichever worker serves it.
+    """
+    writes: list[float] = []
+    token = _request_writes.set(writes)
+    try:
+        yield writes
+    finally:
+        _request_writes.reset(token)
+
+
+def written_recently(written_at: float | None) -> bool:
+    return written_at is not None and time.time() < written_at + settings.read_your_writes_seconds
+
+
+@contextmanager
+def read_primary(enabled: bool = True) -> Iterator[None]:
+    """Send every read in this context to the primary (the ``X-Read-Primary`` request header)."""
+    token = _read_primary.set(enabled)
+    try:
+        yield
+    finally:
+        _read_primary.reset(token)
+
+
+def _reads_from_replica(keys: tuple[str, ...]) -> bool:
+    if not replica_configured() or _read_primary.get():
+        return False
+    return not any(recent_writes.is_recent(key) for key in keys)
+
+
+def ReadSessionLocal(*keys: str) -> Session:
+    """Session for read-only endpoints: the replica when one is configured, unless
+    the request asked for the primary or one of ``keys`` was written recently.
+    """
+    if _reads_from_replica(keys):
+        return get_read_session_factory()()
+    return SessionLocal()
+
+
+def read_with_primary_fallback(load: Callable[[Session], T | None], *keys: str) -> T | None:
+    """Run ``load`` on a ``ReadSessionLocal`` session and, when the replica returns
+    nothing, once more on the primary: the row may have been created moments ago.
+    """
+    from_replica = _reads_from_replica(keys)
+    with ReadSessionLocal(*keys) as db:
+        result = load(db)
+    if result is None and from_replica:
+        with SessionLocal() as db:
+            result = load(db)
+    return result
+
+
+def read_get(model: type[ModelT], id: Any, *keys: str) -> ModelT | None:
+    return read_with_primary_fallback(lambda db: db.get(model, id), *keys)
+
+
+def engine_created() -> bool:
+    return get_engine.cache_info().currsize > 0
+
+
+def warm_up_pool(connections: int) -> None:
+    """Open ``connections`` pooled connections up front and return them to the pool."""
+    if connections <= 0:
+        return
+
+    engine = get_engine()
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(engine.connect())
+    finally:
+        for connection in opened:
+            connection.close()
+
+
+def dispose_engine() -> None:
+    if get_read_engine.cache_info().currsize > 0:
+        # Without a replica this is the primary engine; disposing it twice is harmless.
+        get_read_engine().dispose()
+    get_read_session_factory.cache_clear()
+    get_read_engine.cache_clear()
+    if engine_created():
+        get_engine().dispose()
+    get_session_factory.cache_clear()
+    get_engine.cache_clear()
+    recent_writes.clear()
 
 
 def get_db():
@@ -27,3 +220,10 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def __getattr__(name: str):
+    # Backwards compatible access to ``app.db.engine``; resolving it creates the engine.
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
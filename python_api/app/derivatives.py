@@ -0,0 +1,236 @@
+"""Lazily generated, width-bucketed previews of image assets.
+
+Derivatives are rendered with Pillow in a process pool and written to a
+hash-addressed cache under ``ASSET_DERIVATIVE_CACHE_DIR``. Because asset bytes
+never change for a given id, the cache key (asset id, byte size, width bucket,
+format) identifies the derivative's content. The process keeps an LRU index of
+the cache (path -> size) and a running byte total, seeded from one scan of the
+directory (ordered by mtime) on first use. Hits move an entry to the back and
+bump the file's mtime so the order survives a restart. Renders add an entry, and
+only when the total passes ``ASSET_DERIVATIVE_CACHE_MAX_BYTES`` are the least
+recently used files evicted.
+
+A render that times out keeps its worker busy, and a worker that dies breaks
+the whole pool, so either way the pool is terminated and replaced; the next
+request starts a fresh one.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from uuid import uuid4
+from PIL import Image, ImageOps
+from .config import settings
+from .errors import AppError
+from .models import Asset
+
+WIDTH_BUCKETS = (64, 128, 256, 512, 1024, 2048)
+FORMATS = {"webp": ("WEBP", "image/webp"), "png": ("PNG", "image/png")}
+SOURCE_MIME_TYPES = frozenset({"image/png", "image/jpeg", "image/webp", "image/gif", "image/bmp", "image/tiff"})
+
+_lock = threading.Lock()
+_executor: ProcessPoolExecutor | None = None
+_in_flight: dict[str, Future[None]] = {}
+
+_index_lock = threading.Lock()
+_index: OrderedDict[str, int] | None = None
+_index_root: str | None = None
+_index_bytes = 0
+
+
+def width_bucket(width: int) -> int:
+    """Round a requested width up to the nearest bucket so previews are shared."""
+    for bucket in WIDTH_BUCKETS:
+        if width <= bucket:
+            return bucket
+    return WIDTH_BUCKETS[-1]
+
+
+def derivative_key(asset: Asset, bucket: int, fmt: str) -> str:
+    source = f"{asset.id}:{asset.byteSize}:{bucket}:{fmt}"
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def derivative_path(key: str, fmt: str) -> Path:
+    return Path(settings.asset_derivative_cache_dir) / key[:2] / f"{key}.{fmt}"
+
+
+def render_derivative(source_path: str, output_path: str, width: int, fmt: str) -> None:
+    # Runs in a worker process; writes to a temporary file and renames it into
+    # place so readers never see a partial derivative.
+    with Image.open(source_path) as image:
+        image.draft("RGB", (width, width))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        if image.width > width:
+            image = image.resize((width, max(1, round(image.height * width / image.width))), Image.Resampling.LANCZOS)
+
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        temp_path = f"{output_path}.{uuid4().hex}.tmp"
+        try:
+            image.save(temp_path, format=FORMATS[fmt][0], optimize=True)
+            os.replace(temp_path, output_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # Spawned rather than forked: the API process runs request threads.
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.asset_derivative_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def _recycle_executor(executor: ProcessPoolExecutor) -> None:
+    """Drop a hung or broken pool; renders still queued on it fail with ``BrokenProcessPool``."""
+    global _executor
+    with _lock:
+        if _executor is not executor:
+            return  # another request already replaced it
+        _executor = None
+    # shutdown() would wait for the hung render, so its workers are terminated first.
+    for process in list((getattr(executor, "_processes", None) or {}).values()):
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _scan_cache(root: Path) -> OrderedDict[str, int]:
+    entries = []
+    if root.is_dir():
+        for path in root.glob("*/*"):
+            if path.suffix == ".tmp":
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, str(path), stat.st_size))
+    return OrderedDict((path, size) for _, path, size in sorted(entries))
+
+
+def _cache_index() -> OrderedDict[str, int]:
+    """Return the LRU index, scanning the cache directory only the first time (call with ``_index_lock`` held)."""
+    global _index, _index_root, _index_bytes
+    root = settings.asset_derivative_cache_dir
+    if _index is None or _index_root != root:
+        _index = _scan_cache(Path(root))
+        _index_root = root
+        _index_bytes = sum(_index.values())
+    return _index
+
+
+def _index_touch(path: Path) -> None:
+    """Mark a derivative as most recently used, indexing it if another process rendered it."""
+    global _index_bytes
+    with _index_lock:
+        index = _cache_index()
+        if str(path) in index:
+            index.move_to_end(str(path))
+            return
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        return
+    with _index_lock:
+        index = _cache_index()
+        _index_bytes += size - index.pop(str(path), 0)
+        index[str(path)] = size
+
+
+def evict_derivatives(max_bytes: int | None = None) -> int:
+    """Delete least recently used derivatives until the cache fits; returns bytes freed."""
+    global _index_bytes
+    limit = settings.asset_derivative_cache_max_bytes if max_bytes is None else max_bytes
+    victims = []
+    with _index_lock:
+        index = _cache_index()
+        while index and _index_bytes > limit:
+            path, size = index.popitem(last=False)
+            _index_bytes -= size
+            victims.append((path, size))
+
+    freed = 0
+    for path, size in victims:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            continue
+        freed += size
+    return freed
+
+
+def get_derivative(asset: Asset, width: int, fmt: str) -> tuple[Path, str]:
+    """Return the cached derivative's path and media type, rendering it on first request."""
+    if fmt not in FORMATS:
+        raise AppError("Unsupported derivative format", 400, "INVALID_DERIVATIVE", {"formats": sorted(FORMATS)})
+    if width < 1:
+        raise AppError("Derivative width must be positive", 400, "INVALID_DERIVATIVE")
+    if asset.mimeType not in SOURCE_MIME_TYPES:
+        raise AppError("Asset type has no image derivatives", 415, "UNSUPPORTED_ASSET_TYPE")
+
+    bucket = width_bucket(width)
+    key = derivative_key(asset, bucket, fmt)
+    path = derivative_path(key, fmt)
+    media_type = FORMATS[fmt][1]
+
+    if path.is_file():
+        try:
+            os.utime(path)
+            _index_touch(path)
+            return path, media_type
+        except FileNotFoundError:
+            pass  # evicted between the check and the touch; render it again
+
+    if not os.path.isfile(asset.filePath):
+        raise AppError("Asset file is missing", 404, "ASSET_FILE_MISSING")
+
+    # Concurrent requests for the same derivative share one render.
+    with _lock:
+        future = _in_flight.get(key)
+        owner = future is None
+        if owner:
+            executor = _get_executor()
+            future = executor.submit(render_derivative, asset.filePath, str(path), bucket, fmt)
+            _in_flight[key] = future
+
+    try:
+        future.result(timeout=settings.asset_derivative_timeout_seconds)
+    except TimeoutError as error:
+        if owner:
+            _recycle_executor(executor)
+        raise AppError("Derivative generation timed out", 503, "DERIVATIVE_TIMEOUT") from error
+    except BrokenProcessPool as error:
+        if owner:
+            _recycle_executor(executor)
+        raise AppError("Derivative workers are restarting, retry later", 503, "DERIVATIVE_UNAVAILABLE") from error
+    except Image.DecompressionBombError as error:
+        raise AppError("Asset image is too large to preview", 413, "ASSET_TOO_LARGE") from error
+    except OSError as error:
+        raise AppError("Asset image could not be decoded", 422, "DERIVATIVE_FAILED") from error
+    finally:
+        if owner:
+            with _lock:
+                _in_flight.pop(key, None)
+
+    if owner:
+        _index_touch(path)
+        evict_derivatives()
+    return path, media_type
+
+
+def shutdown_derivative_workers(wait: bool = True) -> None:
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
@@ -0,0 +1,217 @@
+from datetime import datetime, timezone
+from typing import Any
+from uuid import uuid4
+from sqlalchemy import select
+from .errors import AppError
+from .job_summary import job_summary_key, record_job_change
+from .models import Asset, DesignJob, ExportArtifact, MachineProfile, ProductProfile
+from .placement import to_float
+from .placement_models import PlacementDocument, load_placement_document
+from .preflight import run_design_job_preflight
+
+
+def round_mm(value: float) -> float:
+    return round(float(value), 3)
+
+
+def escape_xml(value: str) -> str:
+    return (
+        value.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace('"', "&quot;")
+        .replace("'", "&apos;")
+    )
+
+
+def build_export_manifest(
+    job: DesignJob,
+    product: ProductProfile,
+    machine: MachineProfile,
+    preflight: dict[str, Any],
+    placement: PlacementDocument | None = None,
+) -> dict[str, Any]:
+    if placement is None:
+        placement = load_placement_document(job.placementJson)
+
+    manifest_objects: list[dict[str, Any]] = []
+    for index, obj in enumerate(placement.ordered_visible_objects()):
+        kind = obj.kind
+        bounds = obj.bounds()
+        if bounds is None:
+            continue
+
+        if kind == "image":
+            source = {
+                "anchor": "top-left",
+                "offsetXMm": round_mm(bounds.xMm),
+                "offsetYMm": round_mm(bounds.yMm),
+                "boxWidthMm": round_mm(bounds.widthMm),
+                "boxHeightMm": round_mm(bounds.heightMm),
+                "rotationDeg": round_mm(obj.rotationDeg),
+                "mirrorX": False,
+                "mirrorY": False,
+            }
+        else:
+            source = {
+                "anchor": obj.anchor,
+                "offsetXMm": round_mm(obj.offsetXMm),
+                "offsetYMm": round_mm(obj.offsetYMm),
+                "boxWidthMm": round_mm(obj.boxWidthMm),
+                "boxHeightMm": round_mm(obj.boxHeightMm),
+                "rotationDeg": round_mm(obj.rotationDeg),
+                "mirrorX": obj.mirrorX,
+                "mirrorY": obj.mirrorY,
+            }
+
+        manifest_objects.append(
+            {
+                "id": obj.id,
+                "kind": kind,
+                "zIndex": index if obj.zIndex is None else int(obj.zIndex),
+                "source": source,
+                "absoluteBoundsMm": {
+                    "xMm": round_mm(bounds.xMm),
+                    "yMm": round_mm(bounds.yMm),
+                    "widthMm": round_mm(bounds.widthMm),
+                    "heightMm": round_mm(bounds.heightMm),
+                },
+            }
+        )
+
+    issues = preflight.get("issues", []) if isinstance(preflight, dict) else []
+    return {
+        "version": "1.0",
+        "designJobId": job.id,
+        "machineProfileId": machine.id,
+        "placementVersion": placement.version,
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "productProfile": {
+            "id": product.id,
+            "sku": product.sku,
+            "name": product.name,
+            "engraveZoneWidthMm": to_float(product.engraveZoneWidthMm),
+            "engraveZoneHeightMm": to_float(product.engraveZoneHeightMm),
+            "diameterMm": to_float(product.diameterMm),
+            "heightMm": to_float(product.heightMm),
+        },
+        "objects": manifest_objects,
+        "preflight": {
+            "status": preflight.get("status", "fail"),
+            "issueCount": len(issues),
+            "errorCount": len([issue for issue in issues if issue.get("severity") == "error"]),
+            "warningCount": len([issue for issue in issues if issue.get("severity") == "warning"]),
+        },
+    }
+
+
+def build_export_svg(job: DesignJob, product: ProductProfile, placement: PlacementDocument | None = None) -> str:
+    if placement is None:
+        placement = load_placement_document(job.placementJson)
+    canvas_width = placement.canvas.widthMm
+    canvas_height = placement.canvas.heightMm
+
+    fragments: list[str] = []
+    for obj in placement.ordered_visible_objects():
+        kind = obj.kind
+        obj_id = escape_xml(obj.id or "")
+        bounds = obj.bounds()
+        if bounds is None:
+            continue
+
+        if kind == "image":
+            href = escape_xml(f"/api/assets/{obj.assetId}")
+            opacity = round_mm(obj.opacity or 1)
+            fragments.append(
+                f'<image id="{obj_id}" x="{round_mm(bounds.xMm)}" y="{round_mm(bounds.yMm)}" width="{round_mm(bounds.widthMm)}" height="{round_mm(bounds.heightMm)}" href="{href}" opacity="{opacity}" preserveAspectRatio="none" />'
+            )
+            continue
+
+        if kind == "vector":
+            path_data = escape_xml(obj.pathData)
+            fragments.append(f'<path id="{obj_id}" d="{path_data}" fill="none" stroke="black" stroke-width="0.1" />')
+            continue
+
+        content = escape_xml(obj.content)
+        font_family = escape_xml(obj.fontFamily)
+        font_size = round_mm(obj.fontSizeMm or 1)
+        y_text = round_mm(bounds.yMm + font_size)
+        fragments.append(
+            f'<text id="{obj_id}" x="{round_mm(bounds.xMm)}" y="{y_text}" font-family="{font_family}" font-size="{font_size}">{content}</text>'
+        )
+
+    return (
+        "<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n"
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{round_mm(canvas_width)}mm" height="{round_mm(canvas_height)}mm" viewBox="0 0 {round_mm(canvas_width)} {round_mm(canvas_height)}" data-product-profile="{escape_xml(product.id)}">\n'
+        + "\n".join(fragments)
+        + "\n</svg>"
+    )
+
+
+def run_design_job_export(db, design_job_id: str) -> tuple[dict[str, Any], list[ExportArtifact]]:
+    job = db.get(DesignJob, design_job_id)
+    if not job:
+        raise AppError("DesignJob not found", 404, "NOT_FOUND")
+
+    product = db.get(ProductProfile, job.productProfileId)
+    machine = db.get(MachineProfile, job.machineProfileId)
+    if not product or not machine:
+        raise AppError("Design job dependencies not found", 404, "NOT_FOUND")
+
+    assets = db.scalars(select(Asset).where(Asset.designJobId == job.id).order_by(Asset.createdAt.asc())).all()
+    # Validate the stored placement once and hand the typed document to every stage.
+    try:
+        placement = load_placement_document(job.placementJson)
+    except AppError:
+        placement = None
+    preflight = run_design_job_preflight(job=job, product=product, assets=assets, placement=placement)
+
+    if preflight.get("status") == "fail":
+        raise AppError("Preflight failed", 422, "PREFLIGHT_FAILED", preflight)
+    before = job_summary_key(job)
+    job.preflightStatus = preflight["status"]
+    job.preflightCheckedAt = datetime.now(timezone.utc)
+    record_job_change(db, before, job_summary_key(job))
+
+    manifest = build_export_manifest(job=job, product=product, machine=machine, preflight=preflight, placement=placement)
+    svg = build_export_svg(job=job, product=product, placement=placement)
+
+    now = datetime.now(timezone.utc)
+    artifacts = [
+        ExportArtifact(
+            id=str(uuid4()),
+            designJobId=job.id,
+            kind="manifest",
+            version="1.0",
+            preflightStatus=preflight.get("status", "fail"),
+            payloadJson=manifest,
+            textContent=None,
+            createdAt=now,
+        ),
+        ExportArtifact(
+            id=str(uuid4()),
+            designJobId=job.id,
+            kind="svg",
+            version="1.0",
+            preflightStatus=preflight.get("status", "fail"),
+            payloadJson=None,
+            textContent=svg,
+            createdAt=now,
+        ),
+    ]
+    db.add_all(artifacts)
+
+    payload = {
+        "manifest": manifest,
+        "svg": svg,
+        "metadata": {
+            "preflightStatus": preflight.get("status", "fail"),
+            "issueCount": len(preflight.get("issues", [])),
+        },
+    }
+    return payload, artifacts
+
+
+def export_design_job_payload(db, design_job_id: str) -> dict[str, Any]:
+    payload, _ = run_design_job_export(db, design_job_id)
+    return payload
@@ -0,0 +1,279 @@
+"""Asynchronous design-job exports.
+
+Each export is an ``ExportTask`` row, so any API worker can answer a status
+poll and tasks survive restarts. The accepting process runs the task on its
+thread pool after claiming it with a lease (``lockedBy``/``lockedUntil``), the
+same way batch workers claim ``BatchRunItem`` rows, and renews the lease while
+the export runs. The artifacts and the final status commit in one transaction,
+after locking the task row and checking the lease is still held, so a task
+whose lease was lost never produces a second set of artifacts.
+
+Every process periodically re-submits queued tasks and tasks whose lease
+expired (their process died); the conditional claim makes sure only one
+process runs a task at a time.
+"""
+
+import logging
+import os
+import socket
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import uuid4
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from .config import settings
+from .db import SessionLocal
+from .errors import AppError
+from .export import run_design_job_export
+from .models import ExportTask
+
+logger = logging.getLogger("lt316.export_tasks")
+
+PENDING_TASK_STATUSES = ("queued", "running")
+
+_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+_sweeper: tuple[threading.Thread, threading.Event] | None = None
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _worker_id() -> str:
+    # Unique per run: a sweep in the same process may re-claim a task whose lease this run lost.
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.export_worker_threads, thread_name_prefix="export")
+        return _executor
+
+
+def serialize_export_task(task: ExportTask) -> dict[str, Any]:
+    return {
+        "taskId": task.id,
+        "designJobId": task.designJobId,
+        "status": task.status,
+        "progress": task.progress,
+        "artifacts": task.artifactsJson or [],
+        "metadata": task.metadataJson,
+        "error": task.errorJson,
+        "createdAt": task.createdAt,
+        "updatedAt": task.updatedAt,
+    }
+
+
+def _lease_until(now: datetime) -> datetime:
+    return now + timedelta(seconds=settings.export_task_lease_seconds)
+
+
+def _claimable(now: datetime):
+    lease_expired = and_(ExportTask.status == "running", ExportTask.lockedUntil < now)
+    return or_(ExportTask.status == "queued", lease_expired)
+
+
+def _claim(task_id: str, worker_id: str) -> bool:
+    now = _utcnow()
+    with SessionLocal() as db:
+        claimed = db.execute(
+            update(ExportTask)
+            .where(ExportTask.id == task_id, _claimable(now))
+            .values(
+                status="running",
+                progress=0.1,
+                lockedBy=worker_id,
+                lockedUntil=_lease_until(now),
+                updatedAt=now,
+            )
+        ).rowcount
+        db.commit()
+    return claimed == 1
+
+
+def _update(task_id: str, worker_id: str, **changes: Any) -> None:
+    now = _utcnow()
+    if changes.get("status") in ("succeeded", "failed"):
+        changes.update(finishedAt=now, lockedBy=None, lockedUntil=None)
+    with SessionLocal() as db:
+        # Only the lease holder may move the task; a stale worker's writes are dropped.
+        db.execute(
+            update(ExportTask)
+            .where(ExportTask.id == task_id, ExportTask.lockedBy == worker_id)
+            .values(updatedAt=now, **changes)
+        )
+        db.commit()
+
+
+def _renew(task_id: str, worker_id: str) -> bool:
+    now = _utcnow()
+    with SessionLocal() as db:
+        renewed = db.execute(
+            update(ExportTask)
+            .where(ExportTask.id == task_id, ExportTask.lockedBy == worker_id, ExportTask.status == "running")
+            .values(lockedUntil=_lease_until(now), updatedAt=now)
+        ).rowcount
+        db.commit()
+    return renewed == 1
+
+
+@contextmanager
+def _keep_lease(task_id: str, worker_id: str) -> Iterator[None]:
+    stop = threading.Event()
+
+    def renew() -> None:
+        while not stop.wait(settings.export_task_lease_seconds / 3):
+            try:
+                if not _renew(task_id, worker_id):
+                    return
+            except SQLAlchemyError:
+                logger.exception("Could not renew the lease on export task %s", task_id)
+
+    thread = threading.Thread(target=renew, name=f"export-lease-{task_id[:8]}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def _export(task_id: str, worker_id: str) -> None:
+    with SessionLocal() as db:
+        task = db.get(ExportTask, task_id)
+        payload, artifacts = run_design_job_export(db, task.designJobId)
+
+        # Lock the task and re-check the lease in the transaction that writes the
+        # artifacts: a worker that lost its lease must not add a second set.
+        owned = db.scalar(
+            select(ExportTask.id).where(ExportTask.id == task_id, ExportTask.lockedBy == worker_id).with_for_update()
+        )
+        if owned is None:
+            db.rollback()
+            logger.warning("Export task %s lost its lease; discarding this run's artifacts", task_id)
+            return
+
+        now = _utcnow()
+        db.execute(
+            update(ExportTask)
+            .where(ExportTask.id == task_id)
+            .values(
+                status="succeeded",
+                progress=1.0,
+                metadataJson=payload["metadata"],
+                artifactsJson=[
+                    {"id": artifact.id, "kind": artifact.kind, "url": f"/api/export-artifacts/{artifact.id}"}
+                    for artifact in artifacts
+                ],
+                finishedAt=now,
+                lockedBy=None,
+                lockedUntil=None,
+                updatedAt=now,
+            )
+        )
+        db.commit()
+
+
+def _run_export_task(task_id: str) -> None:
+    worker_id = _worker_id()
+    if not _claim(task_id, worker_id):
+        return
+
+    try:
+        with _keep_lease(task_id, worker_id):
+            _export(task_id, worker_id)
+    except AppError as error:
+        _update(task_id, worker_id, status="failed", errorJson={"message": error.message, "code": error.code, "details": error.details})
+    except Exception as error:
+        logger.exception("Export task %s failed", task_id)
+        _update(task_id, worker_id, status="failed", errorJson={"message": str(error), "code": "INTERNAL_ERROR", "details": None})
+
+
+def submit_export_task(design_job_id: str) -> ExportTask:
+    now = _utcnow()
+    with SessionLocal() as db:
+        db.execute(
+            delete(ExportTask).where(
+                ExportTask.finishedAt < now - timedelta(seconds=settings.export_task_retention_seconds)
+            )
+        )
+        pending = db.scalar(
+            select(func.count()).select_from(ExportTask).where(ExportTask.status.in_(PENDING_TASK_STATUSES))
+        )
+        if pending >= settings.export_task_max_pending:
+            db.commit()
+            raise AppError("Export queue is full, retry later", 503, "EXPORT_QUEUE_FULL")
+
+        task = ExportTask(id=str(uuid4()), designJobId=design_job_id, status="queued", progress=0.0, createdAt=now, updatedAt=now)
+        db.add(task)
+        db.commit()
+        db.refresh(task)
+
+    _get_executor().submit(_run_export_task, task.id)
+    return task
+
+
+def resume_export_tasks() -> int:
+    """Submit tasks left queued or abandoned by a process that stopped; returns how many."""
+    with SessionLocal() as db:
+        task_ids = db.scalars(select(ExportTask.id).where(_claimable(_utcnow())).order_by(ExportTask.createdAt)).all()
+    for task_id in task_ids:
+        _get_executor().submit(_run_export_task, task_id)
+    if task_ids:
+        logger.info("Resumed %s export tasks", len(task_ids))
+    return len(task_ids)
+
+
+def _sweep_forever(stop: threading.Event) -> None:
+    # The first pass runs straight away, so tasks abandoned before a restart resume on boot.
+    while True:
+        try:
+            resume_export_tasks()
+        except SQLAlchemyError:
+            logger.exception("Could not resume export tasks")
+        if stop.wait(settings.export_task_sweep_interval_seconds):
+            return
+
+
+def schedule_export_task_recovery() -> None:
+    """Start the background sweep that resumes abandoned tasks.
+
+    It runs off the startup path, so a slow or missing database never blocks boot,
+    and keeps running, so a task orphaned by a crashed worker is picked up within a
+    lease plus a sweep interval rather than at the next restart.
+    """
+    global _sweeper
+    with _lock:
+        if _sweeper is not None:
+            return
+        stop = threading.Event()
+        thread = threading.Thread(target=_sweep_forever, args=(stop,), name="export-sweeper", daemon=True)
+        _sweeper = (thread, stop)
+    thread.start()
+
+
+def get_export_task(task_id: str) -> dict[str, Any] | None:
+    with SessionLocal() as db:
+        task = db.get(ExportTask, task_id)
+        return serialize_export_task(task) if task else None
+
+
+def shutdown_export_workers(wait: bool = True) -> None:
+    global _executor, _sweeper
+    with _lock:
+        executor, _executor = _executor, None
+        sweeper, _sweeper = _sweeper, None
+    if sweeper is not None:
+        thread, stop = sweeper
+        stop.set()
+        if wait:
+            thread.join()
+    if executor is not None:
+        executor.shutdown(wait=wait)
@@ -0,0 +1,147 @@
+"""Materialized design-job counts for the admin overview.
+
+``DesignJobSummary`` keeps one row per (product profile, job status, preflight
+outcome) with the number of jobs in it. Every write path that creates a job or
+moves it between buckets applies its +1/-1 deltas in the same transaction as
+the job write, through an atomic upsert, so concurrent writers never lose
+counts. The web app's Prisma writes do the same through
+``src/lib/designJobs/summary.ts``. Reading the overview scans this small table
+instead of every job.
+Jobs without a recorded preflight are counted under ``unchecked``.
+
+Rebuild from scratch with ``python -m app.job_summary --rebuild``.
+"""
+
+import argparse
+import json
+import logging
+from collections import Counter
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from typing import Any
+from sqlalchemy import String, cast, delete, func, insert, literal, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from .db import SessionLocal
+from .errors import AppError
+from .models import DesignJob, DesignJobSummary
+
+logger = logging.getLogger("lt316.job_summary")
+
+UNCHECKED = "unchecked"
+PREFLIGHT_OUTCOMES = ("pass", "warn", "fail", UNCHECKED)
+
+SummaryKey = tuple[str, str, str]
+_UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def summary_key(product_profile_id: str, status: str, preflight_status: str | None) -> SummaryKey:
+    return (product_profile_id, status, preflight_status or UNCHECKED)
+
+
+def job_summary_key(job: DesignJob) -> SummaryKey:
+    return summary_key(job.productProfileId, job.status, job.preflightStatus)
+
+
+def apply_summary_deltas(db: Session, deltas: Mapping[SummaryKey, int]) -> None:
+    """Add ``deltas`` to the summary counts inside the caller's transaction."""
+    now = datetime.now(timezone.utc)
+    # Sorted so concurrent transactions lock summary rows in the same order.
+    rows = [
+        {"productProfileId": key[0], "status": key[1], "preflightOutcome": key[2], "jobCount": delta, "updatedAt": now}
+        for key, delta in sorted(deltas.items())
+        if delta
+    ]
+    if not rows:
+        return
+
+    dialect = db.get_bind().dialect.name
+    if dialect not in _UPSERT_DIALECTS:
+        raise AppError(f"Job summary upserts are not supported on {dialect}", 500, "UNSUPPORTED_DATABASE")
+    stmt = _UPSERT_DIALECTS[dialect](DesignJobSummary)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["productProfileId", "status", "preflightOutcome"],
+        set_={"jobCount": DesignJobSummary.jobCount + stmt.excluded.jobCount, "updatedAt": stmt.excluded.updatedAt},
+    )
+    db.execute(stmt, rows)
+
+
+def record_job_change(db: Session, before: SummaryKey | None, after: SummaryKey | None) -> None:
+    """Move one job between buckets; ``None`` means it did not exist (before) or was removed (after)."""
+    if before == after:
+        return
+    deltas: Counter[SummaryKey] = Counter()
+    if before is not None:
+        deltas[before] -= 1
+    if after is not None:
+        deltas[after] += 1
+    apply_summary_deltas(db, deltas)
+
+
+def rebuild_summary(db: Session) -> int:
+    """Recompute every count from ``DesignJob`` in one grouped INSERT ... SELECT; returns the row count."""
+    if db.get_bind().dialect.name == "postgresql":
+        # Writers block on their summary upsert until the rebuild commits, so their
+        # jobs are either in the snapshot below or counted after it, never both.
+        db.execute(text('LOCK TABLE "DesignJobSummary" IN EXCLUSIVE MODE'))
+    db.execute(delete(DesignJobSummary))
+    outcome = func.coalesce(cast(DesignJob.preflightStatus, String), UNCHECKED)
+    grouped = select(
+        DesignJob.productProfileId,
+        DesignJob.status,
+        outcome,
+        func.count(),
+        literal(datetime.now(timezone.utc), DesignJobSummary.updatedAt.type),
+    ).group_by(DesignJob.productProfileId, DesignJob.status, outcome)
+    db.execute(
+        insert(DesignJobSummary).from_select(
+            ["productProfileId", "status", "preflightOutcome", "jobCount", "updatedAt"], grouped
+        )
+    )
+    return db.scalar(select(func.count()).select_from(DesignJobSummary)) or 0
+
+
+def read_overview(db: Session) -> dict[str, Any]:
+    rows = db.scalars(select(DesignJobSummary).where(DesignJobSummary.jobCount != 0)).all()
+
+    by_status: Counter[str] = Counter()
+    by_preflight: Counter[str] = Counter({outcome: 0 for outcome in PREFLIGHT_OUTCOMES})
+    by_product: dict[str, dict[str, Any]] = {}
+    updated_at = None
+    for row in rows:
+        by_status[row.status] += row.jobCount
+        by_preflight[row.preflightOutcome] += row.jobCount
+        product = by_product.setdefault(row.productProfileId, {"total": 0, "byStatus": Counter(), "byPreflight": Counter()})
+        product["total"] += row.jobCount
+        product["byStatus"][row.status] += row.jobCount
+        product["byPreflight"][row.preflightOutcome] += row.jobCount
+        updated_at = row.updatedAt if updated_at is None or row.updatedAt > updated_at else updated_at
+
+    return {
+        "total": sum(by_status.values()),
+        "byStatus": dict(by_status),
+        "byPreflight": dict(by_preflight),
+        "byProductProfile": {
+            product_id: {"total": item["total"], "byStatus": dict(item["byStatus"]), "byPreflight": dict(item["byPreflight"])}
+            for product_id, item in sorted(by_product.items())
+        },
+        "updatedAt": updated_at,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Maintain the DesignJobSummary table.")
+    parser.add_argument("--rebuild", action="store_true", help="recompute all counts from DesignJob")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    with SessionLocal() as db:
+        if args.rebuild:
+            rows = rebuild_summary(db)
+            db.commit()
+            logger.info("Rebuilt DesignJobSummary with %s rows", rows)
+        print(json.dumps(read_overview(db), default=str, indent=2))
+
+
+if __name__ == "__main__":
+    main()
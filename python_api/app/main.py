@@ -1,13 +1,68 @@
-from fastapi import Depends, FastAPI
+import math
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request
 from fastapi.responses import JSONResponse
 from .auth import require_api_role
+from .config import settings
+from .db import dispose_engine, read_primary, track_request_writes, written_recently
+from .derivatives import shutdown_derivative_workers
 from .errors import AppError
+from .export_tasks import schedule_export_task_recovery, shutdown_export_workers
+from .preflight_impact import shutdown_preflight_impact_workers
+from .routes.assets import router as assets_router
 from .routes.codegen import router as codegen_router
 from .routes.design_jobs import router as design_jobs_router
 from .routes.health import router as health_router
 from .routes.product_profiles import router as product_profiles_router
+from .startup import warm_up
 
-app = FastAPI(title="LT316 Python API", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    warm_up()
+    if settings.database_url:
+        schedule_export_task_recovery()
+    yield
+    shutdown_export_workers()
+    shutdown_preflight_impact_workers()
+    shutdown_derivative_workers()
+    dispose_engine()
+
+
+app = FastAPI(title="LT316 Python API", version="0.1.0", lifespan=lifespan)
+
+
+READ_AFTER_HEADER = "X-Read-After"
+READ_AFTER_COOKIE = "lt316_read_after"
+
+
+def _read_after(request: Request) -> float | None:
+    raw = request.headers.get(READ_AFTER_HEADER) or request.cookies.get(READ_AFTER_COOKIE)
+    try:
+        return float(raw) if raw else None
+    except ValueError:
+        return None
+
+
+@app.middleware("http")
+async def route_reads(request: Request, call_next):
+    # A write is echoed back as X-Read-After (header or cookie), so the client's next
+    # reads skip the replica on every worker, not just the one that took the write.
+    # X-Read-Primary forces the primary outright.
+    wants_primary = request.headers.get("x-read-primary", "").strip().lower() in ("1", "true")
+    with read_primary(wants_primary or written_recently(_read_after(request))), track_request_writes() as writes:
+        response = await call_next(request)
+    if writes:
+        written_at = f"{max(writes):.3f}"
+        response.headers[READ_AFTER_HEADER] = written_at
+        response.set_cookie(
+            READ_AFTER_COOKIE,
+            written_at,
+            max_age=max(1, math.ceil(settings.read_your_writes_seconds)),
+            httponly=True,
+            samesite="lax",
+        )
+    return response
 
 
 @app.exception_handler(AppError)
@@ -27,6 +82,7 @@ async def app_error_handler(_, exc: AppError):
 app.include_router(health_router)
 app.include_router(product_profiles_router)
 app.include_router(design_jobs_router)
+app.include_router(assets_router)
 app.include_router(codegen_router)
 
 
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import String, DateTime, Numeric, JSON, Enum
+from sqlalchemy import Boolean, String, DateTime, Float, Numeric, JSON, Enum
 
 
 class Base(DeclarativeBase):
@@ -51,7 +51,10 @@ class DesignJob(Base):
     proofImagePath: Mapped[str | None] = mapped_column(String)
     placementHash: Mapped[str | None] = mapped_column(String)
     templateId: Mapped[str | None] = mapped_column(String)
-    batchRunItemId: Mapped[str | None] = mapped_column(String)
+    batchRunItemId: Mapped[str | None] = mapped_column(String, unique=True)
+    # Outcome of the last preflight (endpoint, export or fleet re-preflight); cleared when the placement changes.
+    preflightStatus: Mapped[str | None] = mapped_column(Enum("pass", "warn", "fail", name="ExportPreflightStatus"))
+    preflightCheckedAt: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True))
     createdAt: Mapped[DateTime] = mapped_column(DateTime(timezone=True))
     updatedAt: Mapped[DateTime] = mapped_column(DateTime(timezone=True))
 
@@ -82,3 +85,99 @@ class ExportArtifact(Base):
     payloadJson: Mapped[dict | None] = mapped_column(JSON)
     textContent: Mapped[str | None] = mapped_column(String)
     createdAt: Mapped[DateTime] = mapped_column(DateTime(timezone=True))
+
+
+class ExportTask(Base):
+    __tablename__ = "ExportTask"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    designJobId: Mapped[str] = mapped_column(String)
+    status: Mapped[str] = mapped_column(Enum("queued", "running", "succeeded", "failed", name="ExportTaskStatus"))
+    progress: Mapped[float] = mapped_column(Float, default=0.0)
+    artifactsJson: Mapped[list | None] = mapped_column(JSON)
+    metadataJson: Mapped[dict | None] = mapped_column(JSON)
+    errorJson: Mapped[dict | None] = mapped_column(JSON)
+    lockedBy: Mapped[str | None] = mapped_column(String)
+    lockedUntil: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True))
+    finishedAt: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True))
+    createdAt: Mapped[DateTime] = mapped_column(DateTime(timezone=True))
+    updatedAt: Mapped[DateTime] = mapped_column(DateTime(timezone=True))
+
+
+class Template(Base):
+    __tablename__ = "Template"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    name: Mapped[str] = mapped_column(String)
+    slug: Mapped[str] = mapped_column(String)
+    productProfileId: Mapped[str | None] = mapped_column(String)
+    placementDocument: Mapped[dict] = mapped_column(JSON)
+    version: Mapped[int] = mapped_column(default=1)
+    isActive: Mapped[bool] = mapped_column(Boolean, default=True)
+    createdBy: Mapped[str] = mapped_column(String)
+    createdAt: Mapped[DateTime] = mapped_column(DateTime(timezone=True))
+    updatedAt: Mapped[DateTime] = mapped_column(DateTime(timezone=True))
+
+
+class BatchRun(Base):
+    __tablename__ = "BatchRun"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    templateId: Mapped[str] = mapped_column(String)
+    productProfileId: Mapped[str] = mapped_column(String)
+    sourceCsvPath: Mapped[str] = mapped_column(String)
+    totalRows: Mapped[int] = mapped_column()
+    validRows: Mapped[int] = mapped_column(default=0)
+    invalidRows: Mapped[int] = mapped_column(default=0)
+    status: Mapped[str] = mapped_column(Enum("queued", "processing", "completed", "failed", "partial", name="BatchRunStatus"))
+    policyMode: Mapped[str] = mapped_column(String, default="STRICT")
+    machineProfileId: Mapped[str | None] = mapped_column(String)
+    startedAt: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True))
+    finishedAt: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True))
+    summaryJson: Mapped[dict | None] = mapped_column(JSON)
+    createdAt: Mapped[DateTime] = mapped_column(DateTime(timezone=True))
+
+
+class BatchRunItem(Base):
+    __tablename__ = "BatchRunItem"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    batchRunId: Mapped[str] = mapped_column(String)
+    rowIndex: Mapped[int] = mapped_column()
+    rowDataJson: Mapped[dict] = mapped_column(JSON)
+    resolvedTokensJson: Mapped[dict | None] = mapped_column(JSON)
+    placementJson: Mapped[dict | None] = mapped_column(JSON)
+    placementHash: Mapped[str | None] = mapped_column(String)
+    status: Mapped[str] = mapped_column(Enum("success", "failed", "skipped", "queued", "processing", name="BatchItemStatus"))
+    warningsJson: Mapped[list | None] = mapped_column(JSON)
+    errorMessage: Mapped[str | None] = mapped_column(String)
+    attemptCount: Mapped[int] = mapped_column(default=0)
+    lockedBy: Mapped[str | None] = mapped_column(String)
+    lockedUntil: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True))
+    createdAt: Mapped[DateTime] = mapped_column(DateTime(timezone=True))
+
+
+class PreflightImpactRun(Base):
+    __tablename__ = "PreflightImpactRun"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    productProfileId: Mapped[str] = mapped_column(String)
+    status: Mapped[str] = mapped_column(Enum("queued", "processing", "completed", "failed", name="PreflightImpactRunStatus"))
+    checkedJobs: Mapped[int] = mapped_column(default=0)
+    newlyFailingJobs: Mapped[int] = mapped_column(default=0)
+    startedAt: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True))
+    finishedAt: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True))
+    summaryJson: Mapped[dict | None] = mapped_column(JSON)
+    error: Mapped[str | None] = mapped_column(String)
+    createdAt: Mapped[DateTime] = mapped_column(DateTime(timezone=True))
+
+
+class DesignJobSummary(Base):
+    __tablename__ = "DesignJobSummary"
+
+    productProfileId: Mapped[str] = mapped_column(String, primary_key=True)
+    status: Mapped[str] = mapped_column(Enum("draft", "approved", "exported", "failed", name="DesignJobStatus"), primary_key=True)
+    # ExportPreflightStatus values plus "unchecked" for jobs never preflighted.
+    preflightOutcome: Mapped[str] = mapped_column(String, primary_key=True)
+    jobCount: Mapped[int] = mapped_column(default=0)
+    updatedAt: Mapped[DateTime] = mapped_column(DateTime(timezone=True))
@@ -1,3 +1,4 @@
+from decimal import Decimal
 from typing import Any
 from .errors import AppError
 
@@ -40,3 +41,12 @@ def parse_placement_document(raw: Any) -> dict[str, Any]:
         }
 
     raise AppError("Invalid placement payload", 400, "INVALID_PLACEMENT")
+
+
+def to_float(value: Any) -> float | None:
+    if isinstance(value, (int, float, Decimal)):
+        return float(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,271 @@
+from abc import abstractmethod
+from functools import cached_property, lru_cache
+from typing import Annotated, Any, Literal, NamedTuple, Union
+from pydantic import (
+    AfterValidator,
+    BaseModel,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+    TypeAdapter,
+    ValidationError,
+    WrapValidator,
+    model_validator,
+)
+from .errors import AppError
+
+# Top-level canvas sizes keep the historical strict check: real numbers only, no numeric strings.
+StrictNumber = Annotated[float, Field(strict=True)]
+
+
+def _lenient(default: Any) -> WrapValidator:
+    """Fall back to ``default`` instead of rejecting the value, as the old dict readers did."""
+
+    def validate(value: Any, handler: Any) -> Any:
+        try:
+            return handler(value)
+        except ValidationError:
+            return default
+
+    return WrapValidator(validate)
+
+
+# Optional styling numbers were read with to_float() before, so junk meant "unset", not an invalid object.
+LenientFloat = Annotated[float | None, _lenient(None)]
+
+
+class Bounds(NamedTuple):
+    xMm: float
+    yMm: float
+    widthMm: float
+    heightMm: float
+
+
+def _anchored_origin(anchor: str, offset_x: float, offset_y: float, width: float, height: float) -> tuple[float, float]:
+    if anchor == "center":
+        return offset_x - width / 2, offset_y - height / 2
+    if anchor == "top-right":
+        return offset_x - width, offset_y
+    if anchor == "bottom-left":
+        return offset_x, offset_y - height
+    if anchor == "bottom-right":
+        return offset_x - width, offset_y - height
+    return offset_x, offset_y
+
+
+class _PlacementObject(BaseModel):
+    model_config = ConfigDict(extra="allow", coerce_numbers_to_str=True)
+
+    id: str | None = None
+    visible: bool = True
+    # Stored documents contain fractional zIndex values; they only ever ordered objects.
+    zIndex: LenientFloat = None
+    rotationDeg: Annotated[float, _lenient(0.0)] = 0.0
+
+    @property
+    def sort_key(self) -> tuple[float, str]:
+        return (self.zIndex or 0, self.id or "")
+
+    def bounds(self) -> Bounds | None:
+        return self._bounds
+
+    @property
+    @abstractmethod
+    def _bounds(self) -> Bounds | None:
+        """Each kind computes its bounds once, as a ``cached_property``."""
+
+
+class ImageObject(_PlacementObject):
+    kind: Literal["image"]
+    assetId: str | None = None
+    xMm: float
+    yMm: float
+    widthMm: float
+    heightMm: float
+    opacity: LenientFloat = None
+
+    @cached_property
+    def _bounds(self) -> Bounds:
+        return Bounds(self.xMm, self.yMm, self.widthMm, self.heightMm)
+
+
+class _BoxObject(_PlacementObject):
+    anchor: str = "top-left"
+    offsetXMm: float
+    offsetYMm: float
+    boxWidthMm: float
+    boxHeightMm: float
+    mirrorX: bool = False
+    mirrorY: bool = False
+
+    @cached_property
+    def _bounds(self) -> Bounds:
+        x, y = _anchored_origin(self.anchor, self.offsetXMm, self.offsetYMm, self.boxWidthMm, self.boxHeightMm)
+        return Bounds(x, y, self.boxWidthMm, self.boxHeightMm)
+
+
+class VectorObject(_BoxObject):
+    kind: Literal["vector"]
+    pathData: str = ""
+
+
+class _TextObject(_BoxObject):
+    content: str = ""
+    fontFamily: str = "Arial"
+    fontSizeMm: LenientFloat = None
+    horizontalAlign: str = "left"
+    fillMode: str = "fill"
+    strokeWidthMm: LenientFloat = None
+
+
+class TextLineObject(_TextObject):
+    kind: Literal["text_line"]
+
+
+class TextBlockObject(_TextObject):
+    kind: Literal["text_block"]
+
+
+class TextArcObject(_TextObject):
+    kind: Literal["text_arc"]
+    arc: dict[str, Any] | None = None
+
+
+class InvalidObject(BaseModel):
+    """An object whose kind or geometry did not validate; preflight reports it and export skips it."""
+
+    model_config = ConfigDict(extra="allow")
+
+    id: Any = None
+    kind: Any = None
+    visible: Any = True
+    zIndex: Any = None
+
+    @property
+    def sort_key(self) -> tuple[Any, str]:
+        return (0 if self.zIndex is None else self.zIndex, "" if self.id is None else str(self.id))
+
+    def bounds(self) -> None:
+        return None
+
+
+KnownPlacementObject = Annotated[
+    Union[ImageObject, VectorObject, TextLineObject, TextBlockObject, TextArcObject],
+    Field(discriminator="kind"),
+]
+PlacementObject = Annotated[Union[KnownPlacementObject, InvalidObject], Field(union_mode="left_to_right")]
+# Non-object entries are carried through untouched and ignored by consumers, as before.
+PlacementEntry = Annotated[Union[PlacementObject, Any], Field(union_mode="left_to_right")]
+TEXT_KINDS = frozenset({"text_line", "text_block", "text_arc"})
+
+
+class PlacementCanvas(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    widthMm: StrictNumber
+    heightMm: StrictNumber
+
+
+class PlacementMachine(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    strokeWidthWarningThresholdMm: LenientFloat = None
+
+
+class PlacementWrap(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    enabled: Annotated[bool, WrapValidator(lambda value, handler: bool(value))] = False
+    wrapWidthMm: LenientFloat = None
+    seamXmm: LenientFloat = None
+    microOverlapMm: LenientFloat = None
+
+
+class PlacementDocument(BaseModel):
+    model_config = ConfigDict(extra="allow", defer_build=True)
+
+    version: Literal[2]
+    canvas: PlacementCanvas
+    machine: PlacementMachine
+    objects: list[PlacementEntry]
+    # Wrap settings were optional extras; a malformed block means no wrap, not a rejected document.
+    wrap: Annotated[PlacementWrap | None, _lenient(None)] = None
+
+    _raw: dict[str, Any] | None = PrivateAttr(default=None)
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def _keep_raw(cls, data: Any, handler: Any) -> "PlacementDocument":
+        document = handler(data)
+        if isinstance(data, dict):
+            document._raw = data
+        return document
+
+    def ordered_visible_objects(self) -> list[_PlacementObject | InvalidObject]:
+        return self._ordered_visible_objects
+
+    @cached_property
+    def _ordered_visible_objects(self) -> list[_PlacementObject | InvalidObject]:
+        visible = [obj for obj in self.objects if isinstance(obj, (_PlacementObject, InvalidObject)) and obj.visible is not False]
+        return sorted(visible, key=lambda obj: obj.sort_key)
+
+    def to_json_dict(self) -> dict[str, Any]:
+        """The document as it was submitted; validation only decides whether it is accepted.
+
+        Dumping the models would rewrite stored values (ints as floats, numeric ids as
+        strings, lenient fields as null), so the validated input is returned unchanged.
+        """
+        if self._raw is not None:
+            return self._raw
+        return self.model_dump(mode="json", exclude_unset=True)
+
+
+class LegacyPlacementDocument(BaseModel):
+    """Pre-v2 single-box placement; only its canvas size survives the upgrade."""
+
+    widthMm: StrictNumber
+    heightMm: StrictNumber
+    offsetXMm: Any
+    offsetYMm: Any
+    rotationDeg: Any
+    anchor: Any
+
+    def to_document(self) -> PlacementDocument:
+        return PlacementDocument.model_validate(
+            {
+                "version": 2,
+                "canvas": {"widthMm": self.widthMm, "heightMm": self.heightMm},
+                "machine": {"strokeWidthWarningThresholdMm": 0.1},
+                "objects": [],
+            }
+        )
+
+
+def _upgrade_legacy(value: PlacementDocument | LegacyPlacementDocument) -> PlacementDocument:
+    return value.to_document() if isinstance(value, LegacyPlacementDocument) else value
+
+
+PlacementPayload = Annotated[
+    Union[PlacementDocument, LegacyPlacementDocument],
+    Field(union_mode="left_to_right"),
+    AfterValidator(_upgrade_legacy),
+]
+
+
+@lru_cache(maxsize=1)
+def _placement_adapter() -> TypeAdapter[PlacementDocument]:
+    return TypeAdapter(PlacementPayload)
+
+
+def load_placement_document(raw: Any) -> PlacementDocument:
+    try:
+        return _placement_adapter().validate_python(raw)
+    except ValidationError as error:
+        raise AppError("Invalid placement payload", 400, "INVALID_PLACEMENT") from error
+
+
+def load_placement_document_json(data: str | bytes) -> PlacementDocument:
+    try:
+        return _placement_adapter().validate_json(data)
+    except ValidationError as error:
+        raise AppError("Invalid placement payload", 400, "INVALID_PLACEMENT") from error
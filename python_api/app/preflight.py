@@ -0,0 +1,179 @@
+from typing import Any
+from .errors import AppError
+from .models import Asset, DesignJob, ProductProfile
+from .placement import to_float
+from .placement_models import TEXT_KINDS, Bounds, PlacementDocument, load_placement_document
+
+SEAM_MARGIN_MM = 1.0
+
+
+def invalid_placement_preflight_result() -> dict[str, Any]:
+    return {
+        "status": "fail",
+        "issues": [
+            {
+                "code": "INVALID_PLACEMENT",
+                "severity": "error",
+                "message": "Placement payload is invalid and cannot be parsed.",
+                "suggestedFix": "Open the job editor and save placement again.",
+            }
+        ],
+    }
+
+
+def _intersects(bounds_a: Bounds, bounds_b: Bounds) -> bool:
+    return (
+        bounds_a.xMm < bounds_b.xMm + bounds_b.widthMm
+        and bounds_a.xMm + bounds_a.widthMm > bounds_b.xMm
+        and bounds_a.yMm < bounds_b.yMm + bounds_b.heightMm
+        and bounds_a.yMm + bounds_a.heightMm > bounds_b.yMm
+    )
+
+
+def run_design_job_preflight(
+    job: DesignJob,
+    product: ProductProfile,
+    assets: list[Asset],
+    placement: PlacementDocument | None = None,
+) -> dict[str, Any]:
+    issues: list[dict[str, Any]] = []
+
+    if placement is None:
+        try:
+            placement = load_placement_document(job.placementJson)
+        except AppError:
+            return invalid_placement_preflight_result()
+
+    canvas_width = placement.canvas.widthMm
+    canvas_height = placement.canvas.heightMm
+    zone_width = to_float(product.engraveZoneWidthMm)
+    zone_height = to_float(product.engraveZoneHeightMm)
+
+    if zone_width is not None and zone_height is not None and (canvas_width > zone_width or canvas_height > zone_height):
+        issues.append(
+            {
+                "code": "CANVAS_EXCEEDS_ENGRAVE_ZONE",
+                "severity": "error",
+                "message": "Canvas dimensions exceed product engrave zone.",
+                "suggestedFix": "Resize canvas to fit within product profile engrave zone.",
+            }
+        )
+
+    known_assets = set()
+    for asset in assets:
+        known_assets.add(asset.id)
+        known_assets.add(asset.filePath)
+        known_assets.add(f"/api/assets/{asset.id}")
+
+    stroke_threshold = placement.machine.strokeWidthWarningThresholdMm
+    if stroke_threshold is None:
+        stroke_threshold = 0.1
+
+    object_bounds: list[tuple[Any, Bounds]] = []
+
+    for obj in placement.ordered_visible_objects():
+        bounds = obj.bounds()
+        object_id = obj.id
+        if bounds is None:
+            issues.append(
+                {
+                    "code": "INVALID_OBJECT_DATA",
+                    "severity": "error",
+                    "message": "Object has invalid geometry values.",
+                    "objectId": object_id,
+                    "suggestedFix": "Recreate this object in the editor.",
+                }
+            )
+            continue
+
+        object_bounds.append((obj, bounds))
+
+        if (
+            bounds.xMm < 0
+            or bounds.yMm < 0
+            or bounds.xMm + bounds.widthMm > canvas_width
+            or bounds.yMm + bounds.heightMm > canvas_height
+        ):
+            issues.append(
+                {
+                    "code": "OBJECT_OUT_OF_CANVAS",
+                    "severity": "error",
+                    "message": "Object exceeds canvas bounds.",
+                    "objectId": object_id,
+                    "suggestedFix": "Move or resize object within canvas bounds.",
+                }
+            )
+
+        if zone_width is not None and zone_height is not None:
+            if (
+                bounds.xMm < 0
+                or bounds.yMm < 0
+                or bounds.xMm + bounds.widthMm > zone_width
+                or bounds.yMm + bounds.heightMm > zone_height
+            ):
+                issues.append(
+                    {
+                        "code": "OBJECT_OUT_OF_ENGRAVE_ZONE",
+                        "severity": "error",
+                        "message": "Object exceeds product engrave zone.",
+                        "objectId": object_id,
+                        "suggestedFix": "Clamp object to engrave zone before export.",
+                    }
+                )
+
+        kind = obj.kind
+        if kind in TEXT_KINDS and obj.fillMode == "stroke":
+            stroke_width = obj.strokeWidthMm
+            if stroke_width is not None and stroke_width < stroke_threshold:
+                issues.append(
+                    {
+                        "code": "STROKE_TOO_THIN",
+                        "severity": "warning",
+                        "message": f"Stroke width {stroke_width}mm is below threshold {stroke_threshold}mm.",
+                        "objectId": object_id,
+                        "suggestedFix": "Increase stroke width or switch to fill mode.",
+                    }
+                )
+
+        if kind == "image" and obj.assetId not in known_assets:
+            issues.append(
+                {
+                    "code": "MISSING_ASSET_REFERENCE",
+                    "severity": "error",
+                    "message": "Image object references a missing asset.",
+                    "objectId": object_id,
+                    "suggestedFix": "Upload/relink the image asset before export.",
+                }
+            )
+
+        if bounds.xMm <= SEAM_MARGIN_MM or bounds.xMm + bounds.widthMm >= canvas_width - SEAM_MARGIN_MM:
+            issues.append(
+                {
+                    "code": "SEAM_RISK",
+                    "severity": "warning",
+                    "message": "Object is very close to the seam boundary.",
+                    "objectId": object_id,
+                    "suggestedFix": "Offset object away from seam boundary.",
+                }
+            )
+
+    for index in range(len(object_bounds)):
+        left_obj, left_bounds = object_bounds[index]
+        for compare_index in range(index + 1, len(object_bounds)):
+            right_obj, right_bounds = object_bounds[compare_index]
+            if _intersects(left_bounds, right_bounds):
+                issues.append(
+                    {
+                        "code": "OBJECT_OVERLAP_RISK",
+                        "severity": "warning",
+                        "message": f"Objects {left_obj.id} and {right_obj.id} overlap and may over-burn.",
+                        "objectId": left_obj.id,
+                        "suggestedFix": "Separate objects or tune operation order/power in LightBurn.",
+                    }
+                )
+
+    has_error = any(issue.get("severity") == "error" for issue in issues)
+    has_warning = any(issue.get("severity") == "warning" for issue in issues)
+    status = "fail" if has_error else "warn" if has_warning else "pass"
+
+    return {"status": status, "issues": issues}
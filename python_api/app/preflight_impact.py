@@ -0,0 +1,284 @@
+"""Fleet-wide re-preflight of the design jobs on one product profile.
+
+After a product profile changes (say its engrave zone shrinks), every draft or
+approved job on it may pass or fail differently. A ``PreflightImpactRun``
+streams those jobs with a server-side cursor (``yield_per``), re-runs preflight
+on chunks in a thread pool, stores each job's new ``preflightStatus`` and keeps
+a report of the jobs that newly fail. A job written by someone else after it was
+read (new placement, status or preflight) is left alone and counted as skipped.
+
+Run with ``python -m app.preflight_impact PRODUCT_PROFILE_ID [--chunk-size N] [--workers N]``.
+"""
+
+import argparse
+import json
+import logging
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Any, Sequence
+from uuid import uuid4
+from sqlalchemy import Row, select, update
+from sqlalchemy.orm import Session
+from .config import settings
+from .db import SessionLocal, design_job_key, mark_written
+from .errors import AppError
+from .job_summary import SummaryKey, apply_summary_deltas, summary_key
+from .models import Asset, DesignJob, PreflightImpactRun, ProductProfile
+from .placement import to_float
+from .preflight import run_design_job_preflight
+
+logger = logging.getLogger("lt316.preflight_impact")
+
+# Exported and failed jobs are done; only jobs that can still be exported are re-checked.
+IMPACT_JOB_STATUSES = ("draft", "approved")
+# The report lists at most this many newly failing jobs; the counts are always complete.
+REPORT_MAX_JOBS = 1000
+
+_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def affected_jobs_statement(product_profile_id: str):
+    return (
+        select(
+            DesignJob.id,
+            DesignJob.orderRef,
+            DesignJob.status,
+            DesignJob.placementJson,
+            DesignJob.preflightStatus,
+            DesignJob.updatedAt,
+        )
+        .where(DesignJob.productProfileId == product_profile_id, DesignJob.status.in_(IMPACT_JOB_STATUSES))
+        .order_by(DesignJob.id)
+    )
+
+
+def _store_if_unchanged(db: Session, row: Row, status: str, checked_at: datetime) -> bool:
+    """Store a preflight result only if the job still matches the snapshot it was computed from."""
+    stored = db.execute(
+        update(DesignJob)
+        .where(
+            DesignJob.id == row.id,
+            DesignJob.status == row.status,
+            DesignJob.updatedAt == row.updatedAt,
+            DesignJob.preflightStatus.is_not_distinct_from(row.preflightStatus),
+        )
+        .values(preflightStatus=status, preflightCheckedAt=checked_at)
+        .execution_options(synchronize_session=False)
+    )
+    return stored.rowcount == 1
+
+
+def _preflight_chunk(product: ProductProfile, rows: Sequence[Row]) -> tuple[list[dict[str, Any]], int]:
+    """Preflight one chunk of jobs and store their statuses; runs in a pool thread with its own session.
+
+    Returns the outcomes that were stored and the number of jobs skipped because
+    they changed after the cursor read them.
+    """
+    job_ids = [row.id for row in rows]
+    with SessionLocal() as db:
+        assets_by_job: dict[str, list[Asset]] = defaultdict(list)
+        for asset in db.scalars(select(Asset).where(Asset.designJobId.in_(job_ids)).order_by(Asset.createdAt.asc())):
+            assets_by_job[asset.designJobId].append(asset)
+
+        outcomes = []
+        summary_deltas: Counter[SummaryKey] = Counter()
+        checked_at = _utcnow()
+        for row in rows:
+            # Preflight only reads the placement, so a transient job avoids loading full rows.
+            job = DesignJob(id=row.id, placementJson=row.placementJson)
+            result = run_design_job_preflight(job=job, product=product, assets=assets_by_job[row.id])
+            if not _store_if_unchanged(db, row, result["status"], checked_at):
+                continue
+            outcomes.append(
+                {
+                    "designJobId": row.id,
+                    "orderRef": row.orderRef,
+                    "previousStatus": row.preflightStatus,
+                    "status": result["status"],
+                    "issueCodes": sorted({issue["code"] for issue in result["issues"] if issue["severity"] == "error"}),
+                }
+            )
+            summary_deltas[summary_key(product.id, row.status, row.preflightStatus)] -= 1
+            summary_deltas[summary_key(product.id, row.status, result["status"])] += 1
+
+        apply_summary_deltas(db, summary_deltas)
+        db.commit()
+    mark_written(*(design_job_key(outcome["designJobId"]) for outcome in outcomes))
+    return outcomes, len(rows) - len(outcomes)
+
+
+class ImpactReport:
+    def __init__(self, product: ProductProfile) -> None:
+        self.product = product
+        self.checked = 0
+        # Jobs written concurrently after they were read; their new state was not overwritten.
+        self.skipped = 0
+        self.status_counts = {"pass": 0, "warn": 0, "fail": 0}
+        self.newly_failing: list[dict[str, Any]] = []
+        self.newly_failing_count = 0
+        self.recovered_count = 0
+        # Jobs failing now whose earlier outcome was never recorded.
+        self.unchecked_failing_count = 0
+
+    def add(self, chunk: tuple[list[dict[str, Any]], int]) -> None:
+        outcomes, skipped = chunk
+        self.skipped += skipped
+        for outcome in outcomes:
+            self.checked += 1
+            self.status_counts[outcome["status"]] += 1
+            previous, failing = outcome["previousStatus"], outcome["status"] == "fail"
+            if failing and previous in ("pass", "warn"):
+                self.newly_failing_count += 1
+                self.newly_failing.append(outcome)
+            elif failing and previous is None:
+                self.unchecked_failing_count += 1
+            elif not failing and previous == "fail":
+                self.recovered_count += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        newly_failing = sorted(self.newly_failing, key=lambda item: item["designJobId"])
+        return {
+            "productProfileId": self.product.id,
+            "engraveZone": {
+                "widthMm": to_float(self.product.engraveZoneWidthMm),
+                "heightMm": to_float(self.product.engraveZoneHeightMm),
+            },
+            "checkedJobs": self.checked,
+            "skippedJobs": self.skipped,
+            "statusCounts": self.status_counts,
+            "newlyFailingCount": self.newly_failing_count,
+            "recoveredCount": self.recovered_count,
+            "uncheckedFailingCount": self.unchecked_failing_count,
+            "newlyFailing": newly_failing[:REPORT_MAX_JOBS],
+            "newlyFailingTruncated": len(newly_failing) > REPORT_MAX_JOBS,
+        }
+
+
+def run_preflight_impact(product_profile_id: str, chunk_size: int | None = None, workers: int | None = None) -> dict[str, Any]:
+    chunk_size = max(1, chunk_size or settings.preflight_impact_chunk_size)
+    workers = max(1, workers or settings.preflight_impact_workers)
+
+    with SessionLocal() as db:
+        product = db.get(ProductProfile, product_profile_id)
+    if not product:
+        raise AppError("ProductProfile not found", 404, "NOT_FOUND")
+
+    report = ImpactReport(product)
+    # The cursor stays open on its own session; chunks commit through their own sessions.
+    with SessionLocal() as stream, ThreadPoolExecutor(max_workers=workers, thread_name_prefix="preflight-impact") as pool:
+        rows = stream.execute(affected_jobs_statement(product_profile_id).execution_options(yield_per=chunk_size))
+        pending: set[Future[tuple[list[dict[str, Any]], int]]] = set()
+        for chunk in rows.partitions():
+            pending.add(pool.submit(_preflight_chunk, product, chunk))
+            # Bound the chunks held in memory so the cursor advances only as fast as workers drain it.
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    report.add(future.result())
+        for future in pending:
+            report.add(future.result())
+
+    return report.to_dict()
+
+
+def serialize_impact_run(run: PreflightImpactRun) -> dict[str, Any]:
+    return {
+        "id": run.id,
+        "productProfileId": run.productProfileId,
+        "status": run.status,
+        "checkedJobs": run.checkedJobs,
+        "newlyFailingJobs": run.newlyFailingJobs,
+        "report": run.summaryJson,
+        "error": run.error,
+        "startedAt": run.startedAt,
+        "finishedAt": run.finishedAt,
+        "createdAt": run.createdAt,
+    }
+
+
+def create_impact_run(product_profile_id: str) -> PreflightImpactRun:
+    with SessionLocal() as db:
+        if not db.get(ProductProfile, product_profile_id):
+            raise AppError("ProductProfile not found", 404, "NOT_FOUND")
+        run = PreflightImpactRun(id=str(uuid4()), productProfileId=product_profile_id, status="queued", createdAt=_utcnow())
+        db.add(run)
+        db.commit()
+        db.refresh(run)
+    return run
+
+
+def execute_impact_run(run_id: str, chunk_size: int | None = None, workers: int | None = None) -> PreflightImpactRun:
+    with SessionLocal() as db:
+        run = db.get(PreflightImpactRun, run_id)
+        if not run:
+            raise AppError("PreflightImpactRun not found", 404, "NOT_FOUND")
+        run.status = "processing"
+        run.startedAt = _utcnow()
+        db.commit()
+
+        try:
+            report = run_preflight_impact(run.productProfileId, chunk_size, workers)
+        except Exception as error:
+            logger.exception("Preflight impact run %s failed", run_id)
+            run.status = "failed"
+            run.error = error.message if isinstance(error, AppError) else str(error)
+        else:
+            run.status = "completed"
+            run.checkedJobs = report["checkedJobs"]
+            run.newlyFailingJobs = report["newlyFailingCount"]
+            run.summaryJson = report
+        run.finishedAt = _utcnow()
+        db.commit()
+        db.refresh(run)
+    return run
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            # One run at a time; each run parallelizes its own chunks.
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preflight-impact-run")
+        return _executor
+
+
+def submit_impact_run(product_profile_id: str) -> PreflightImpactRun:
+    run = create_impact_run(product_profile_id)
+    _get_executor().submit(execute_impact_run, run.id)
+    return run
+
+
+def get_impact_run(run_id: str) -> PreflightImpactRun | None:
+    with SessionLocal() as db:
+        return db.get(PreflightImpactRun, run_id)
+
+
+def shutdown_preflight_impact_workers(wait: bool = True) -> None:
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Re-run preflight for every open design job on a product profile.")
+    parser.add_argument("product_profile_id")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    run = execute_impact_run(create_impact_run(args.product_profile_id).id, args.chunk_size, args.workers)
+    print(json.dumps(serialize_impact_run(run), default=str, indent=2))
+
+
+if __name__ == "__main__":
+    main()
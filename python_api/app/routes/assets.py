@@ -0,0 +1,69 @@
+import os
+from fastapi import APIRouter, Request, Response
+from fastapi.responses import FileResponse
+from ..db import read_get
+from ..derivatives import get_derivative
+from ..errors import AppError
+from ..models import Asset
+
+router = APIRouter(prefix="/api", tags=["assets"])
+
+# Asset bytes never change for a given id (normalizing or re-uploading creates a
+# new Asset row), so clients and proxies may cache them for as long as they like.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def asset_etag(asset_id: str, byte_size: int) -> str:
+    return f'"{asset_id}-{byte_size}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _get_asset(id: str) -> Asset:
+    asset = read_get(Asset, id)
+    if not asset:
+        raise AppError("Asset not found", 404, "NOT_FOUND")
+    return asset
+
+
+@router.api_route("/assets/{id}", methods=["GET", "HEAD"])
+def get_asset_file(id: str, request: Request):
+    asset = _get_asset(id)
+
+    try:
+        stat_result = os.stat(asset.filePath)
+    except OSError as error:
+        raise AppError("Asset file is missing", 404, "ASSET_FILE_MISSING") from error
+
+    etag = asset_etag(asset.id, asset.byteSize if asset.byteSize is not None else stat_result.st_size)
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    # FileResponse answers Range/If-Range itself and uses the server's
+    # zero-copy path (ASGI pathsend) for full responses where available.
+    return FileResponse(
+        asset.filePath,
+        media_type=asset.mimeType,
+        headers=headers,
+        filename=asset.originalName,
+        stat_result=stat_result,
+        content_disposition_type="inline",
+    )
+
+
+@router.get("/assets/{id}/derivatives")
+def get_asset_derivative(id: str, request: Request, width: int = 256, format: str = "webp"):
+    asset = _get_asset(id)
+    path, media_type = get_derivative(asset, width, format)
+
+    etag = f'"{path.stem}"'
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
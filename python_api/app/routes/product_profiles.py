@@ -1,15 +1,19 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy import select
-from ..db import SessionLocal
+from ..auth import require_api_role
+from ..db import ReadSessionLocal, product_profile_key, read_get
 from ..models import ProductProfile
 from ..errors import AppError
+from ..preflight_impact import get_impact_run, serialize_impact_run, submit_impact_run
 
 router = APIRouter(prefix="/api", tags=["product-profiles"])
 
 
 @router.get("/product-profiles")
 def list_product_profiles():
-    with SessionLocal() as db:
+    with ReadSessionLocal() as db:
         rows = db.scalars(select(ProductProfile).order_by(ProductProfile.createdAt.desc())).all()
 
     data = [
@@ -35,8 +39,7 @@ def list_product_profiles():
 
 @router.get("/product-profiles/{id}")
 def get_product_profile_by_id(id: str):
-    with SessionLocal() as db:
-        row = db.get(ProductProfile, id)
+    row = read_get(ProductProfile, id, product_profile_key(id))
 
     if not row:
         raise AppError("ProductProfile not found", 404, "NOT_FOUND")
@@ -57,3 +60,23 @@ def get_product_profile_by_id(id: str):
             "updatedAt": row.updatedAt,
         }
     }
+
+
+@router.post("/product-profiles/{id}/preflight-impact", dependencies=[Depends(require_api_role)])
+def start_product_profile_preflight_impact(id: str):
+    run = submit_impact_run(id)
+    status_url = f"/api/preflight-impact-runs/{run.id}"
+    return JSONResponse(
+        status_code=202,
+        content={"data": jsonable_encoder(serialize_impact_run(run))},
+        headers={"Location": status_url},
+    )
+
+
+@router.get("/preflight-impact-runs/{id}", dependencies=[Depends(require_api_role)])
+def get_preflight_impact_run(id: str):
+    run = get_impact_run(id)
+    if not run:
+        raise AppError("PreflightImpactRun not found", 404, "NOT_FOUND")
+
+    return {"data": serialize_impact_run(run)}
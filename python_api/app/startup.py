@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from .config import settings
+from .db import warm_up_pool
+
+
+def _request_models() -> tuple[type[BaseModel], ...]:
+    from .routes.design_jobs import (
+        BatchExportRequest,
+        BulkCreateDesignJobsRequest,
+        CreateDesignJobRequest,
+        UpdatePlacementRequest,
+    )
+
+    return (CreateDesignJobRequest, UpdatePlacementRequest, BatchExportRequest, BulkCreateDesignJobsRequest)
+
+
+def warm_up_validators() -> None:
+    # Request models use ``defer_build`` so importing the app stays cheap; build
+    # their pydantic-core validators here instead of on the first request.
+    for model in _request_models():
+        model.model_rebuild()
+
+
+def warm_up() -> None:
+    if not settings.startup_warmup:
+        return
+
+    warm_up_validators()
+    if settings.database_url:
+        warm_up_pool(settings.db_pool_warmup_connections)
@@ -0,0 +1,25 @@
+import re
+from typing import Any
+
+TOKEN_PATTERN = re.compile(r'\{\{\s*([^}|]+?)\s*(?:\|\s*default:"([^"]*)")?\s*\}\}')
+
+
+def resolve_token_string(template: str, values: dict[str, Any]) -> str:
+    def replace(match: re.Match[str]) -> str:
+        value = values.get(match.group(1).strip())
+        if value is None or value == "":
+            return match.group(2) or ""
+        return str(value)
+
+    return TOKEN_PATTERN.sub(replace, template)
+
+
+def resolve_tokens_for_object(doc: Any, values: dict[str, Any]) -> Any:
+    if isinstance(doc, list):
+        return [resolve_tokens_for_object(item, values) for item in doc]
+    if isinstance(doc, dict):
+        return {
+            key: resolve_token_string(value, values) if isinstance(value, str) else resolve_tokens_for_object(value, values)
+            for key, value in doc.items()
+        }
+    return doc
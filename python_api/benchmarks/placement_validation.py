@@ -0,0 +1,121 @@
+"""Compare the typed placement path with the raw-dict path it replaced.
+
+The dict path mirrors what preflight, the manifest builder and the SVG builder
+each did before: parse the stored document, filter and sort the objects, then
+coerce geometry with ``to_float`` again in every consumer. The typed path
+validates the request bytes once in pydantic-core (``validate_json``) and hands the
+coerced objects to all three consumers.
+
+Run from ``python_api``: ``python -m benchmarks.placement_validation [--objects 200]``.
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Any, Callable
+from app.placement import parse_placement_document, to_float
+from app.placement_models import load_placement_document_json
+
+CONSUMER_PASSES = 3
+
+
+def build_document(object_count: int) -> dict[str, Any]:
+    objects: list[dict[str, Any]] = []
+    for index in range(object_count):
+        kind = ("image", "vector", "text_line", "text_block", "text_arc")[index % 5]
+        if kind == "image":
+            objects.append(
+                {"id": f"obj-{index}", "kind": kind, "assetId": "asset-1", "xMm": index % 40, "yMm": 5, "widthMm": 8, "heightMm": 8, "zIndex": index}
+            )
+            continue
+        obj: dict[str, Any] = {
+            "id": f"obj-{index}",
+            "kind": kind,
+            "anchor": "center",
+            "offsetXMm": str(10 + index % 30),
+            "offsetYMm": 20,
+            "boxWidthMm": 6.5,
+            "boxHeightMm": 4,
+            "rotationDeg": 0,
+            "zIndex": index,
+        }
+        if kind == "vector":
+            obj["pathData"] = "M0 0 L10 10 Z"
+        else:
+            obj.update({"content": f"Line {index}", "fontFamily": "Inter", "fontSizeMm": 3, "fillMode": "stroke", "strokeWidthMm": 0.2})
+        objects.append(obj)
+
+    return {"version": 2, "canvas": {"widthMm": 100, "heightMm": 60}, "machine": {"strokeWidthWarningThresholdMm": 0.1}, "objects": objects}
+
+
+def _dict_bounds(obj: dict[str, Any]) -> tuple[float, float, float, float] | None:
+    if obj.get("kind") == "image":
+        values = [to_float(obj.get(key)) for key in ("xMm", "yMm", "widthMm", "heightMm")]
+    else:
+        values = [to_float(obj.get(key)) for key in ("offsetXMm", "offsetYMm", "boxWidthMm", "boxHeightMm")]
+    if any(value is None for value in values):
+        return None
+    x, y, width, height = values
+    if obj.get("anchor", "top-left") == "center":
+        x, y = x - width / 2, y - height / 2
+    return x, y, width, height
+
+
+def dict_path(raw: bytes) -> float:
+    document = json.loads(raw)
+    total = 0.0
+    for _ in range(CONSUMER_PASSES):
+        placement = parse_placement_document(document)
+        objects = [obj for obj in placement["objects"] if isinstance(obj, dict) and obj.get("visible", True) is not False]
+        for obj in sorted(objects, key=lambda obj: (obj.get("zIndex", 0), str(obj.get("id", "")))):
+            bounds = _dict_bounds(obj)
+            if bounds is not None:
+                total += bounds[2] + (to_float(obj.get("rotationDeg")) or 0) + (to_float(obj.get("strokeWidthMm")) or 0)
+    return total
+
+
+def typed_path(raw: bytes) -> float:
+    placement = load_placement_document_json(raw)
+    total = 0.0
+    for _ in range(CONSUMER_PASSES):
+        for obj in placement.ordered_visible_objects():
+            bounds = obj.bounds()
+            if bounds is not None:
+                total += bounds.widthMm + obj.rotationDeg + (getattr(obj, "strokeWidthMm", None) or 0)
+    return total
+
+
+def _time(fn: Callable[[bytes], float], raw: bytes, repeat: int) -> list[float]:
+    samples: list[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(raw)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def run(object_count: int, repeat: int) -> dict[str, Any]:
+    raw = json.dumps(build_document(object_count)).encode("utf-8")
+    if abs(dict_path(raw) - typed_path(raw)) > 1e-6:
+        raise AssertionError("dict and typed paths disagree")
+
+    report: dict[str, Any] = {"objects": object_count, "payloadBytes": len(raw), "repeat": repeat}
+    for name, fn in (("dict", dict_path), ("typed", typed_path)):
+        samples = _time(fn, raw, repeat)
+        report[name] = {"medianMs": round(statistics.median(samples) * 1000, 4), "minMs": round(min(samples) * 1000, 4)}
+    report["speedup"] = round(report["dict"]["medianMs"] / report["typed"]["medianMs"], 2)
+    return report
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--objects", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    print(json.dumps([run(count, args.repeat) for count in args.objects], indent=2))
+
+
+if __name__ == "__main__":
+    main()
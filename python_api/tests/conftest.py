@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.db import SessionLocal, dispose_engine, get_engine
+from app.main import app
+from app.models import Base, MachineProfile, ProductProfile
+
+
+@pytest.fixture
+def db_url(monkeypatch, tmp_path):
+    url = f"sqlite:///{tmp_path / 'api.db'}"
+    monkeypatch.setattr(settings, "database_url", url)
+    dispose_engine()
+    Base.metadata.create_all(get_engine())
+
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        db.add(
+            ProductProfile(
+                id="product-1",
+                name="20oz Tumbler",
+                sku="TUMBLER-20",
+                diameterMm=73.7,
+                heightMm=175,
+                engraveZoneWidthMm=100,
+                engraveZoneHeightMm=80,
+                seamReference="left",
+                toolOutlineSvgPath="/tools/tumbler-20.svg",
+                defaultSettingsProfile={},
+                createdAt=now,
+                updatedAt=now,
+            )
+        )
+        db.add(
+            MachineProfile(
+                id="machine-1",
+                name="Fiber 50W",
+                laserType="fiber",
+                lens="110",
+                rotaryModeDefault="chuck",
+                powerDefault=80,
+                speedDefault=1000,
+                frequencyDefault=30,
+                createdAt=now,
+                updatedAt=now,
+            )
+        )
+        db.commit()
+
+    yield url
+    dispose_engine()
+
+
+@pytest.fixture
+def api(db_url):
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,145 @@
+import os
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+
+import pytest
+from PIL import Image
+
+from app.config import settings
+from app.db import SessionLocal
+from app import derivatives
+from app.derivatives import evict_derivatives, width_bucket
+from app.models import Asset
+
+
+@pytest.fixture
+def image_asset(db_url, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "asset_derivative_cache_dir", str(tmp_path / "derivatives"))
+    path = tmp_path / "photo.png"
+    Image.new("RGB", (900, 300), (200, 40, 40)).save(path)
+    svg_path = tmp_path / "logo.svg"
+    svg_path.write_text("<svg xmlns='http://www.w3.org/2000/svg'/>")
+
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        for asset_id, file_path, mime in (("photo", path, "image/png"), ("logo", svg_path, "image/svg+xml")):
+            db.add(
+                Asset(
+                    id=asset_id,
+                    designJobId="job-1",
+                    kind="original",
+                    originalName=file_path.name,
+                    mimeType=mime,
+                    byteSize=file_path.stat().st_size,
+                    filePath=str(file_path),
+                    createdAt=now,
+                )
+            )
+        db.commit()
+    return path
+
+
+def test_width_bucket_rounds_up():
+    assert width_bucket(1) == 64
+    assert width_bucket(200) == 256
+    assert width_bucket(10_000) == 2048
+
+
+def test_derivative_is_rendered_once_and_cached(api, image_asset, tmp_path):
+    first = api.get("/api/assets/photo/derivatives", params={"width": 200, "format": "webp"})
+
+    assert first.status_code == 200
+    assert first.headers["content-type"] == "image/webp"
+    assert "immutable" in first.headers["cache-control"]
+    cached = list((tmp_path / "derivatives").glob("*/*.webp"))
+    assert len(cached) == 1
+    with Image.open(cached[0]) as preview:
+        assert preview.size == (256, 85)
+
+    second = api.get("/api/assets/photo/derivatives", params={"width": 256, "format": "webp"})
+    assert second.content == first.content
+    assert api.get(
+        "/api/assets/photo/derivatives", params={"width": 256}, headers={"If-None-Match": first.headers["etag"]}
+    ).status_code == 304
+
+
+def test_png_derivative_never_upscales(api, image_asset):
+    response = api.get("/api/assets/photo/derivatives", params={"width": 2048, "format": "png"})
+
+    assert response.headers["content-type"] == "image/png"
+    assert response.content.startswith(b"\x89PNG")
+
+
+def test_rejects_unsupported_requests(api, image_asset):
+    assert api.get("/api/assets/logo/derivatives").status_code == 415
+    assert api.get("/api/assets/photo/derivatives", params={"format": "gif"}).json()["error"]["code"] == "INVALID_DERIVATIVE"
+
+
+class _StuckPool:
+    """Stands in for the process pool; every render ends with ``outcome`` (or never, if None)."""
+
+    def __init__(self, outcome=None):
+        self.outcome = outcome
+        self.shut_down = False
+
+    def submit(self, *args):
+        future = Future()
+        if self.outcome is not None:
+            future.set_exception(self.outcome)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+@pytest.mark.parametrize(
+    ("outcome", "status", "code", "recycled"),
+    [
+        (None, 503, "DERIVATIVE_TIMEOUT", True),
+        (BrokenProcessPool("worker died"), 503, "DERIVATIVE_UNAVAILABLE", True),
+        (Image.DecompressionBombError("too many pixels"), 413, "ASSET_TOO_LARGE", False),
+    ],
+)
+def test_render_failures_map_to_errors_and_replace_a_hung_pool(api, image_asset, monkeypatch, outcome, status, code, recycled):
+    pool = _StuckPool(outcome)
+    monkeypatch.setattr(derivatives, "_executor", pool)
+    monkeypatch.setattr(settings, "asset_derivative_timeout_seconds", 0.01)
+
+    response = api.get("/api/assets/photo/derivatives", params={"width": 200})
+
+    assert response.status_code == status
+    assert response.json()["error"]["code"] == code
+    assert pool.shut_down is recycled
+    assert (derivatives._executor is None) is recycled
+
+
+def test_eviction_removes_least_recently_used(tmp_path, monkeypatch):
+    root = tmp_path / "derivatives"
+    monkeypatch.setattr(settings, "asset_derivative_cache_dir", str(root))
+    (root / "aa").mkdir(parents=True)
+    for index, name in enumerate(("old", "mid", "new")):
+        path = root / "aa" / f"{name}.webp"
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (1000 + index, 1000 + index))
+
+    assert evict_derivatives(max_bytes=150) == 200
+    assert [path.stem for path in root.glob("*/*")] == ["new"]
+
+
+def test_cache_is_scanned_once_and_hits_refresh_the_lru_order(api, image_asset, tmp_path, monkeypatch):
+    scans = []
+    scan = derivatives._scan_cache
+    monkeypatch.setattr(derivatives, "_scan_cache", lambda root: scans.append(root) or scan(root))
+    cache = tmp_path / "derivatives"
+
+    api.get("/api/assets/photo/derivatives", params={"width": 64})
+    (small,) = cache.glob("*/*")
+    api.get("/api/assets/photo/derivatives", params={"width": 128})
+    (large,) = set(cache.glob("*/*")) - {small}
+    api.get("/api/assets/photo/derivatives", params={"width": 64})
+
+    assert len(scans) == 1
+    large_size = large.stat().st_size
+    assert evict_derivatives(max_bytes=small.stat().st_size) == large_size
+    assert small.exists() and not large.exists()
@@ -0,0 +1,73 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.db import SessionLocal
+from app.models import Asset
+
+PAYLOAD = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def asset(db_url, tmp_path):
+    path = tmp_path / "logo.png"
+    path.write_bytes(PAYLOAD)
+    with SessionLocal() as db:
+        db.add(
+            Asset(
+                id="asset-1",
+                designJobId="job-1",
+                kind="original",
+                originalName="logo.png",
+                mimeType="image/png",
+                byteSize=len(PAYLOAD),
+                filePath=str(path),
+                createdAt=datetime.now(timezone.utc),
+            )
+        )
+        db.commit()
+    return path
+
+
+def test_serves_file_with_immutable_cache_headers(api, asset):
+    response = api.get("/api/assets/asset-1")
+
+    assert response.status_code == 200
+    assert response.content == PAYLOAD
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["etag"] == f'"asset-1-{len(PAYLOAD)}"'
+    assert "immutable" in response.headers["cache-control"]
+    assert response.headers["accept-ranges"] == "bytes"
+
+
+def test_range_request_returns_partial_content(api, asset):
+    response = api.get("/api/assets/asset-1", headers={"Range": "bytes=10-19"})
+
+    assert response.status_code == 206
+    assert response.content == PAYLOAD[10:20]
+    assert response.headers["content-range"] == f"bytes 10-19/{len(PAYLOAD)}"
+
+
+def test_if_range_with_stale_etag_returns_full_body(api, asset):
+    response = api.get("/api/assets/asset-1", headers={"Range": "bytes=0-9", "If-Range": '"asset-1-1"'})
+
+    assert response.status_code == 200
+    assert response.content == PAYLOAD
+
+
+def test_if_none_match_returns_not_modified(api, asset):
+    etag = api.get("/api/assets/asset-1").headers["etag"]
+    response = api.get("/api/assets/asset-1", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def test_missing_asset_and_missing_file(api, asset):
+    assert api.get("/api/assets/nope").json()["error"]["code"] == "NOT_FOUND"
+
+    asset.unlink()
+    response = api.get("/api/assets/asset-1")
+    assert response.status_code == 404
+    assert response.json()["error"]["code"] == "ASSET_FILE_MISSING"
@@ -0,0 +1,193 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app import batch_worker
+from app.config import settings
+from app.db import SessionLocal
+from app.models import BatchRun, BatchRunItem, DesignJob, ExportArtifact, Template
+from app.vdp import resolve_tokens_for_object
+
+
+def _placement(width_mm=40):
+    return {
+        "version": 2,
+        "canvas": {"widthMm": 50, "heightMm": 50},
+        "machine": {"strokeWidthWarningThresholdMm": 0.1},
+        "objects": [
+            {
+                "id": "name",
+                "kind": "text_line",
+                "content": "{{ name }}",
+                "offsetXMm": 5,
+                "offsetYMm": 5,
+                "boxWidthMm": width_mm,
+                "boxHeightMm": 10,
+                "anchor": "top-left",
+            }
+        ],
+    }
+
+
+@pytest.fixture
+def batch_run(db_url):
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        db.add(
+            Template(
+                id="template-1",
+                name="Names",
+                slug="names",
+                placementDocument=_placement(),
+                createdBy="test",
+                createdAt=now,
+                updatedAt=now,
+            )
+        )
+        db.add(
+            BatchRun(
+                id="run-1",
+                templateId="template-1",
+                productProfileId="product-1",
+                sourceCsvPath="names.csv",
+                totalRows=4,
+                status="queued",
+                policyMode="CLAMP",
+                machineProfileId="machine-1",
+                createdAt=now,
+            )
+        )
+        for index in range(4):
+            db.add(
+                BatchRunItem(
+                    id=f"item-{index}",
+                    batchRunId="run-1",
+                    rowIndex=index + 1,
+                    rowDataJson={"name": f"Name {index}"},
+                    resolvedTokensJson={"name": f"Name {index}", "order_number": f"SO-{index}"},
+                    # As createBatchRun queues it: tokens resolved and the policy applied.
+                    placementJson=resolve_tokens_for_object(_placement(), {"name": f"Name {index}"}),
+                    placementHash=f"hash-{index}",
+                    status="queued",
+                    createdAt=now,
+                )
+            )
+        db.commit()
+    return "run-1"
+
+
+def test_claim_statement_uses_skip_locked():
+    sql = str(batch_worker.claim_statement(datetime.now(timezone.utc), 5).compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE SKIP LOCKED" in sql
+
+
+def test_workers_claim_disjoint_items(batch_run):
+    with SessionLocal() as db:
+        first = batch_worker.claim_batch_items(db, "worker-a", 2)
+    with SessionLocal() as db:
+        second = batch_worker.claim_batch_items(db, "worker-b", 10)
+
+    assert len(first) == 2
+    assert len(second) == 2
+    assert not set(first) & set(second)
+
+    with SessionLocal() as db:
+        run = db.get(BatchRun, batch_run)
+        assert run.status == "processing"
+        assert run.startedAt is not None
+
+
+def test_drain_creates_and_exports_jobs(batch_run):
+    assert batch_worker.run_worker("worker-a", drain=True) == 4
+
+    with SessionLocal() as db:
+        run = db.get(BatchRun, batch_run)
+        jobs = db.scalars(select(DesignJob).order_by(DesignJob.orderRef)).all()
+        artifacts = db.scalars(select(ExportArtifact)).all()
+        items = db.scalars(select(BatchRunItem)).all()
+
+    assert run.status == "completed"
+    assert run.validRows == 4
+    assert [job.orderRef for job in jobs] == ["SO-0", "SO-1", "SO-2", "SO-3"]
+    assert jobs[0].placementJson["objects"][0]["content"] == "Name 0"
+    assert [job.placementHash for job in jobs] == ["hash-0", "hash-1", "hash-2", "hash-3"]
+    assert {job.machineProfileId for job in jobs} == {"machine-1"}
+    assert len(artifacts) == 8
+    assert all(item.status == "success" and item.lockedBy is None for item in items)
+
+
+def test_preflight_failure_marks_item_failed(batch_run):
+    with SessionLocal() as db:
+        db.get(BatchRunItem, "item-0").placementJson = _placement(width_mm=400)
+        db.commit()
+
+    batch_worker.run_worker("worker-a", drain=True)
+
+    with SessionLocal() as db:
+        run = db.get(BatchRun, batch_run)
+        item = db.get(BatchRunItem, "item-0")
+
+    assert run.status == "partial"
+    assert item.status == "failed"
+    assert item.errorMessage == "Preflight failed"
+    assert any(issue["code"] == "OBJECT_OUT_OF_CANVAS" for issue in item.warningsJson)
+
+
+def test_expired_lease_is_retried_without_duplicate_job(batch_run):
+    with SessionLocal() as db:
+        claimed = batch_worker.claim_batch_items(db, "crashed-worker", 1)
+        # Simulate a worker that created the job and died before finishing.
+        item = db.get(BatchRunItem, claimed[0])
+        batch_worker._design_job_for_item(db, item, db.get(BatchRun, batch_run))
+        item.lockedUntil = datetime.now(timezone.utc) - timedelta(seconds=1)
+        db.commit()
+
+    batch_worker.run_worker("worker-b", drain=True)
+
+    with SessionLocal() as db:
+        item = db.get(BatchRunItem, claimed[0])
+        jobs = db.scalars(select(DesignJob).where(DesignJob.batchRunItemId == claimed[0])).all()
+
+    assert item.status == "success"
+    assert item.attemptCount == 2
+    assert len(jobs) == 1
+
+
+def test_lost_lease_discards_stale_worker(batch_run):
+    with SessionLocal() as db:
+        claimed = batch_worker.claim_batch_items(db, "worker-a", 1)
+        db.get(BatchRunItem, claimed[0]).lockedBy = "worker-b"
+        db.commit()
+
+    with SessionLocal() as db:
+        assert batch_worker.process_batch_item(db, claimed[0], "worker-a") is None
+
+
+def test_exhausted_items_are_failed(batch_run, monkeypatch):
+    monkeypatch.setattr(settings, "batch_worker_max_attempts", 1)
+    with SessionLocal() as db:
+        claimed = batch_worker.claim_batch_items(db, "worker-a", 4)
+        for item_id in claimed:
+            db.get(BatchRunItem, item_id).lockedUntil = datetime.now(timezone.utc) - timedelta(seconds=1)
+        db.commit()
+
+    assert batch_worker.run_worker("worker-b", drain=True) == 0
+
+    with SessionLocal() as db:
+        assert db.get(BatchRun, batch_run).status == "failed"
+
+
+def test_items_queued_without_a_resolved_placement_fail(batch_run):
+    with SessionLocal() as db:
+        db.get(BatchRunItem, "item-0").placementJson = None
+        db.commit()
+
+    batch_worker.run_worker("worker-a", drain=True)
+
+    with SessionLocal() as db:
+        item = db.get(BatchRunItem, "item-0")
+        assert item.status == "failed"
+        assert item.errorMessage == "Batch item has no policy-resolved placement"
+        assert db.scalar(select(DesignJob).where(DesignJob.batchRunItemId == "item-0")) is None
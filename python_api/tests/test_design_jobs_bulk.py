@@ -0,0 +1,69 @@
+from sqlalchemy import func, select
+
+from app.db import SessionLocal
+from app.models import DesignJob
+
+
+def _job(**overrides):
+    job = {
+        "orderRef": "ORDER-1",
+        "productProfileId": "product-1",
+        "machineProfileId": "machine-1",
+        "placementJson": {
+            "version": 2,
+            "canvas": {"widthMm": 50, "heightMm": 50},
+            "machine": {"strokeWidthWarningThresholdMm": 0.1},
+            "objects": [],
+        },
+    }
+    job.update(overrides)
+    return job
+
+
+def test_bulk_create_reports_per_row_results(api):
+    response = api.post(
+        "/api/design-jobs/bulk",
+        json={
+            "jobs": [
+                _job(orderRef="A"),
+                _job(productProfileId="missing"),
+                _job(placementJson={"nope": True}),
+                _job(machineProfileId="missing"),
+                _job(orderRef="B"),
+            ]
+        },
+    )
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["createdCount"] == 2
+    assert data["failedCount"] == 3
+
+    results = data["results"]
+    assert [item["index"] for item in results] == [0, 1, 2, 3, 4]
+    assert [item["success"] for item in results] == [True, False, False, False, True]
+    assert results[1]["code"] == "INVALID_PRODUCT_PROFILE"
+    assert results[2]["code"] == "VALIDATION_ERROR"
+    assert results[3]["code"] == "INVALID_MACHINE_PROFILE"
+
+    with SessionLocal() as db:
+        rows = db.scalars(select(DesignJob).order_by(DesignJob.orderRef)).all()
+    assert [row.orderRef for row in rows] == ["A", "B"]
+    assert {row.id for row in rows} == {results[0]["designJobId"], results[4]["designJobId"]}
+    assert all(row.status == "draft" for row in rows)
+
+
+def test_bulk_create_inserts_in_chunks(api, monkeypatch):
+    from app.routes import design_jobs
+
+    monkeypatch.setattr(design_jobs, "BULK_CREATE_CHUNK_SIZE", 3)
+    response = api.post("/api/design-jobs/bulk", json={"jobs": [_job(orderRef=f"R{i}") for i in range(7)]})
+    assert response.json()["data"]["createdCount"] == 7
+
+    with SessionLocal() as db:
+        assert db.scalar(select(func.count()).select_from(DesignJob)) == 7
+
+
+def test_bulk_create_rejects_empty_payload(api):
+    response = api.post("/api/design-jobs/bulk", json={"jobs": []})
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "VALIDATION_ERROR"
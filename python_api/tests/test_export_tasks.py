@@ -0,0 +1,186 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from app import export_tasks
+from app.config import settings
+from app.db import SessionLocal
+from app.export_tasks import resume_export_tasks, schedule_export_task_recovery, shutdown_export_workers
+from app.models import DesignJob, ExportArtifact, ExportTask
+
+
+def _create_job(width_mm=10):
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        db.add(
+            DesignJob(
+                id="job-1",
+                productProfileId="product-1",
+                machineProfileId="machine-1",
+                status="draft",
+                placementJson={
+                    "version": 2,
+                    "canvas": {"widthMm": 50, "heightMm": 50},
+                    "machine": {"strokeWidthWarningThresholdMm": 0.1},
+                    "objects": [
+                        {
+                            "id": "v1",
+                            "kind": "vector",
+                            "pathData": "M0 0 L1 1",
+                            "offsetXMm": 10,
+                            "offsetYMm": 10,
+                            "boxWidthMm": width_mm,
+                            "boxHeightMm": 10,
+                        }
+                    ],
+                },
+                createdAt=now,
+                updatedAt=now,
+            )
+        )
+        db.commit()
+    return "job-1"
+
+
+def _poll(api, status_url, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        task = api.get(status_url).json()["data"]
+        if task["status"] in ("succeeded", "failed"):
+            return task
+        time.sleep(0.02)
+    pytest.fail("export task did not finish")
+
+
+def test_async_export_returns_202_and_produces_artifacts(api):
+    job_id = _create_job()
+    response = api.post(f"/api/design-jobs/{job_id}/export?mode=async")
+    assert response.status_code == 202
+    body = response.json()["data"]
+    assert response.headers["location"] == body["statusUrl"]
+
+    task = _poll(api, body["statusUrl"])
+    assert task["status"] == "succeeded"
+    assert task["progress"] == 1.0
+    assert {artifact["kind"] for artifact in task["artifacts"]} == {"manifest", "svg"}
+
+    svg_url = next(artifact["url"] for artifact in task["artifacts"] if artifact["kind"] == "svg")
+    svg = api.get(svg_url)
+    assert svg.status_code == 200
+    assert svg.headers["content-type"].startswith("image/svg+xml")
+
+    with SessionLocal() as db:
+        assert db.scalar(select(func.count()).select_from(ExportArtifact)) == 2
+
+
+def test_async_export_reports_preflight_failure(api):
+    job_id = _create_job(width_mm=400)
+    response = api.post(f"/api/design-jobs/{job_id}/export", headers={"Prefer": "respond-async"})
+    assert response.status_code == 202
+
+    task = _poll(api, response.json()["data"]["statusUrl"])
+    assert task["status"] == "failed"
+    assert task["error"]["code"] == "PREFLIGHT_FAILED"
+
+
+def test_async_export_unknown_job_is_404(api):
+    response = api.post("/api/design-jobs/missing/export?mode=async")
+    assert response.status_code == 404
+
+
+def test_sync_export_still_returns_payload(api):
+    job_id = _create_job()
+    response = api.post(f"/api/design-jobs/{job_id}/export")
+    assert response.status_code == 200
+    assert response.json()["data"]["metadata"]["preflightStatus"] in ("pass", "warn")
+
+
+def test_task_status_is_read_from_the_database_and_resumed_after_a_restart(api):
+    job_id = _create_job()
+    shutdown_export_workers()  # let the startup recovery finish before seeding abandoned tasks
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        # Left behind by a process that stopped: one never started, one whose lease ran out.
+        db.add(ExportTask(id="queued", designJobId=job_id, status="queued", progress=0.0, createdAt=now, updatedAt=now))
+        db.add(
+            ExportTask(
+                id="abandoned",
+                designJobId=job_id,
+                status="running",
+                progress=0.1,
+                lockedBy="gone:1",
+                lockedUntil=now - timedelta(seconds=1),
+                createdAt=now,
+                updatedAt=now,
+            )
+        )
+        db.commit()
+
+    assert resume_export_tasks() == 2
+    for task_id in ("queued", "abandoned"):
+        task = _poll(api, f"/api/design-jobs/{job_id}/export/tasks/{task_id}")
+        assert task["status"] == "succeeded"
+    assert resume_export_tasks() == 0
+    assert api.get("/api/design-jobs/other/export/tasks/queued").status_code == 404
+
+
+def _abandoned_task(job_id, task_id="abandoned", locked_by="gone:1", expired=True):
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        db.add(
+            ExportTask(
+                id=task_id,
+                designJobId=job_id,
+                status="running",
+                progress=0.1,
+                lockedBy=locked_by,
+                lockedUntil=now + timedelta(seconds=-1 if expired else 300),
+                createdAt=now,
+                updatedAt=now,
+            )
+        )
+        db.commit()
+
+
+def test_export_that_lost_its_lease_writes_nothing(api):
+    job_id = _create_job()
+    _abandoned_task(job_id, locked_by="new-owner", expired=False)
+
+    export_tasks._export("abandoned", "old-owner")
+
+    with SessionLocal() as db:
+        assert db.scalar(select(func.count()).select_from(ExportArtifact)) == 0
+        task = db.get(ExportTask, "abandoned")
+        assert (task.status, task.lockedBy) == ("running", "new-owner")
+
+
+def test_lease_is_renewed_while_the_export_runs(api, monkeypatch):
+    job_id = _create_job()
+    monkeypatch.setattr(settings, "export_task_lease_seconds", 0.15)
+    renewals = []
+    renew = export_tasks._renew
+    monkeypatch.setattr(export_tasks, "_renew", lambda *args: renewals.append(args) or renew(*args))
+    export = export_tasks.run_design_job_export
+    monkeypatch.setattr(export_tasks, "run_design_job_export", lambda db, id: time.sleep(0.3) or export(db, id))
+
+    response = api.post(f"/api/design-jobs/{job_id}/export?mode=async")
+    task = _poll(api, response.json()["data"]["statusUrl"])
+
+    assert task["status"] == "succeeded"
+    assert renewals
+
+
+def test_periodic_sweep_resumes_tasks_without_a_restart(api, monkeypatch):
+    job_id = _create_job()
+    shutdown_export_workers()
+    monkeypatch.setattr(settings, "export_task_sweep_interval_seconds", 0.05)
+    schedule_export_task_recovery()
+    try:
+        time.sleep(0.1)  # the first pass has run; this task is orphaned later
+        _abandoned_task(job_id)
+        task = _poll(api, f"/api/design-jobs/{job_id}/export/tasks/abandoned")
+        assert task["status"] == "succeeded"
+    finally:
+        shutdown_export_workers()
@@ -0,0 +1,95 @@
+import json
+from datetime import datetime, timezone
+
+from app.db import SessionLocal
+from app.job_summary import main, read_overview, rebuild_summary
+from app.models import DesignJob
+from app.preflight_impact import run_preflight_impact
+
+
+def _job(width_mm: float = 50, **overrides):
+    job = {
+        "productProfileId": "product-1",
+        "machineProfileId": "machine-1",
+        "placementJson": {
+            "version": 2,
+            "canvas": {"widthMm": width_mm, "heightMm": 50},
+            "machine": {"strokeWidthWarningThresholdMm": 0.1},
+            "objects": [],
+        },
+    }
+    job.update(overrides)
+    return job
+
+
+def _overview(api):
+    response = api.get("/api/design-jobs/overview")
+    assert response.status_code == 200
+    data = response.json()["data"]
+    data.pop("updatedAt")
+    return data
+
+
+def _rebuilt():
+    with SessionLocal() as db:
+        rebuild_summary(db)
+        db.commit()
+        data = read_overview(db)
+    data.pop("updatedAt")
+    return data
+
+
+def test_overview_follows_every_write_path(api):
+    first = api.post("/api/design-jobs", json=_job()).json()["data"]["id"]
+    second = api.post("/api/design-jobs", json=_job(width_mm=150)).json()["data"]["id"]
+    api.post("/api/design-jobs/bulk", json={"jobs": [_job(), _job(), _job(productProfileId="missing")]})
+
+    assert _overview(api) == {
+        "total": 4,
+        "byStatus": {"draft": 4},
+        "byPreflight": {"pass": 0, "warn": 0, "fail": 0, "unchecked": 4},
+        "byProductProfile": {"product-1": {"total": 4, "byStatus": {"draft": 4}, "byPreflight": {"unchecked": 4}}},
+    }
+
+    api.post(f"/api/design-jobs/{first}/preflight")
+    api.post(f"/api/design-jobs/{second}/preflight")
+    assert _overview(api)["byPreflight"] == {"pass": 1, "warn": 0, "fail": 1, "unchecked": 2}
+
+    # A new placement invalidates the earlier preflight.
+    api.patch(f"/api/design-jobs/{first}", json={"placementJson": _job(width_mm=60)["placementJson"]})
+    assert _overview(api)["byPreflight"] == {"pass": 0, "warn": 0, "fail": 1, "unchecked": 3}
+
+    assert api.post(f"/api/design-jobs/{first}/export").status_code == 200
+    run_preflight_impact("product-1", chunk_size=2, workers=2)
+
+    overview = _overview(api)
+    assert overview["byPreflight"] == {"pass": 3, "warn": 0, "fail": 1, "unchecked": 0}
+    assert overview == _rebuilt()
+
+
+def test_rebuild_recovers_from_writes_that_bypassed_the_summary(api, capsys):
+    api.post("/api/design-jobs", json=_job())
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        db.add(
+            DesignJob(
+                id="imported",
+                productProfileId="product-2",
+                machineProfileId="machine-1",
+                status="exported",
+                placementJson=_job()["placementJson"],
+                preflightStatus="warn",
+                createdAt=now,
+                updatedAt=now,
+            )
+        )
+        db.commit()
+    assert _overview(api)["total"] == 1
+
+    main(["--rebuild"])
+    printed = json.loads(capsys.readouterr().out)
+
+    overview = _overview(api)
+    assert overview["total"] == printed["total"] == 2
+    assert overview["byProductProfile"]["product-2"] == {"total": 1, "byStatus": {"exported": 1}, "byPreflight": {"warn": 1}}
+    assert overview["byPreflight"] == {"pass": 0, "warn": 1, "fail": 0, "unchecked": 1}
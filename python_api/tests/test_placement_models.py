@@ -0,0 +1,127 @@
+import json
+
+import pytest
+
+from app.errors import AppError
+from app.placement_models import (
+    ImageObject,
+    InvalidObject,
+    TextArcObject,
+    TextLineObject,
+    VectorObject,
+    _PlacementObject,
+    load_placement_document,
+    load_placement_document_json,
+)
+
+
+def _document(objects):
+    return {
+        "version": 2,
+        "canvas": {"widthMm": 100, "heightMm": 80},
+        "machine": {"strokeWidthWarningThresholdMm": 0.1},
+        "objects": objects,
+    }
+
+
+def test_objects_are_parsed_by_kind():
+    placement = load_placement_document_json(
+        json.dumps(
+            _document(
+                [
+                    {"id": "img", "kind": "image", "assetId": "a1", "xMm": 1, "yMm": 2, "widthMm": 10, "heightMm": 5, "zIndex": 2},
+                    {"id": "vec", "kind": "vector", "anchor": "center", "offsetXMm": 10, "offsetYMm": 10, "boxWidthMm": 4, "boxHeightMm": 2, "zIndex": 1},
+                    {"id": "arc", "kind": "text_arc", "content": "Hi", "offsetXMm": 0, "offsetYMm": 0, "boxWidthMm": 1, "boxHeightMm": 1, "arc": {"radiusMm": 5}},
+                    "not-an-object",
+                ]
+            )
+        )
+    )
+
+    ordered = placement.ordered_visible_objects()
+    assert [type(obj) for obj in ordered] == [TextArcObject, VectorObject, ImageObject]
+    assert ordered[1].bounds() == (8, 9, 4, 2)
+    assert ordered[2].bounds() == (1, 2, 10, 5)
+
+
+def test_unknown_kind_and_bad_geometry_become_invalid_objects():
+    placement = load_placement_document(
+        _document(
+            [
+                {"id": "x", "kind": "hologram"},
+                {"id": "y", "kind": "image", "xMm": "left", "yMm": 0, "widthMm": 1, "heightMm": 1},
+            ]
+        )
+    )
+
+    assert all(isinstance(obj, InvalidObject) for obj in placement.objects)
+    assert all(obj.bounds() is None for obj in placement.ordered_visible_objects())
+
+
+def test_legacy_placement_is_upgraded():
+    placement = load_placement_document(
+        {"widthMm": 30, "heightMm": 20, "offsetXMm": 0, "offsetYMm": 0, "rotationDeg": 0, "anchor": "center"}
+    )
+
+    assert placement.to_json_dict() == _document([]) | {"canvas": {"widthMm": 30.0, "heightMm": 20.0}}
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        {"version": 2, "canvas": {"widthMm": "100", "heightMm": 80}, "machine": {}, "objects": []},
+        {"version": 3, "canvas": {"widthMm": 100, "heightMm": 80}, "machine": {}, "objects": []},
+        {"widthMm": 30, "heightMm": 20},
+        [],
+    ],
+)
+def test_invalid_documents_raise_invalid_placement(raw):
+    with pytest.raises(AppError) as error:
+        load_placement_document(raw)
+    assert error.value.code == "INVALID_PLACEMENT"
+
+
+def test_round_trip_keeps_unknown_fields():
+    raw = _document([{"id": "t", "kind": "text_line", "offsetXMm": 0, "offsetYMm": 0, "boxWidthMm": 1, "boxHeightMm": 1, "letterSpacingMm": 0.2}])
+    raw["canvas"]["unit"] = "mm"
+
+    assert load_placement_document(raw).to_json_dict()["objects"][0]["letterSpacingMm"] == 0.2
+    assert load_placement_document(raw).to_json_dict()["canvas"]["unit"] == "mm"
+
+
+def test_legacy_styling_values_are_read_leniently():
+    raw = _document(
+        [
+            {"id": 7, "kind": "text_line", "offsetXMm": 0, "offsetYMm": 0, "boxWidthMm": 1, "boxHeightMm": 1, "strokeWidthMm": "thin", "zIndex": 1.5},
+            {"id": "a", "kind": "image", "xMm": 0, "yMm": 0, "widthMm": 1, "heightMm": 1, "opacity": "", "rotationDeg": None, "zIndex": 1},
+        ]
+    )
+    raw["machine"]["strokeWidthWarningThresholdMm"] = "n/a"
+    raw["wrap"] = "enabled"
+
+    placement = load_placement_document_json(json.dumps(raw))
+
+    text, image = placement.objects
+    assert isinstance(text, TextLineObject) and text.strokeWidthMm is None
+    assert isinstance(image, ImageObject) and image.opacity is None and image.rotationDeg == 0
+    assert [obj.id for obj in placement.ordered_visible_objects()] == ["a", "7"]
+    assert placement.machine.strokeWidthWarningThresholdMm is None
+    assert placement.wrap is None
+
+
+def test_stored_document_is_the_submitted_one():
+    raw = _document([{"id": 7, "kind": "vector", "offsetXMm": 1, "offsetYMm": 2, "boxWidthMm": 3, "boxHeightMm": 4, "zIndex": 2}])
+    raw["wrap"] = {"enabled": 1, "wrapWidthMm": "wide"}
+
+    assert load_placement_document(raw).to_json_dict() == raw
+    assert json.dumps(load_placement_document_json(json.dumps(raw)).to_json_dict()) == json.dumps(raw)
+
+
+def test_placement_object_kinds_must_define_bounds():
+    with pytest.raises(TypeError):
+        _PlacementObject()
+
+
+def test_create_rejects_malformed_json_body(api):
+    response = api.post("/api/design-jobs", content=b"{not json", headers={"content-type": "application/json"})
+    assert response.status_code == 400
@@ -0,0 +1,103 @@
+import time
+
+from sqlalchemy import select, update
+
+from app.db import SessionLocal
+from app.models import DesignJob, ProductProfile
+from app.job_summary import read_overview
+from app.preflight_impact import _preflight_chunk, affected_jobs_statement, run_preflight_impact
+
+
+def _create_job(api, width_mm: float, order_ref: str) -> str:
+    placement = {
+        "version": 2,
+        "canvas": {"widthMm": width_mm, "heightMm": 50},
+        "machine": {"strokeWidthWarningThresholdMm": 0.1},
+        "objects": [],
+    }
+    response = api.post(
+        "/api/design-jobs",
+        json={"orderRef": order_ref, "productProfileId": "product-1", "machineProfileId": "machine-1", "placementJson": placement},
+    )
+    assert response.status_code == 201
+    return response.json()["data"]["id"]
+
+
+def _set_zone_width(width_mm: float) -> None:
+    with SessionLocal() as db:
+        db.execute(update(ProductProfile).where(ProductProfile.id == "product-1").values(engraveZoneWidthMm=width_mm))
+        db.commit()
+
+
+def _statuses() -> dict[str, str | None]:
+    with SessionLocal() as db:
+        return {row.orderRef: row.preflightStatus for row in db.execute(select(DesignJob.orderRef, DesignJob.preflightStatus))}
+
+
+def test_shrinking_the_engrave_zone_reports_newly_failing_jobs(api):
+    for width, ref in [(50, "small"), (90, "medium"), (120, "large")]:
+        _create_job(api, width, ref)
+    exported = _create_job(api, 90, "exported")
+    with SessionLocal() as db:
+        db.execute(update(DesignJob).where(DesignJob.id == exported).values(status="exported"))
+        db.commit()
+
+    baseline = run_preflight_impact("product-1", chunk_size=1, workers=2)
+    assert baseline["checkedJobs"] == 3
+    assert baseline["statusCounts"] == {"pass": 2, "warn": 0, "fail": 1}
+    assert baseline["uncheckedFailingCount"] == 1 and baseline["newlyFailingCount"] == 0
+    assert _statuses() == {"small": "pass", "medium": "pass", "large": "fail", "exported": None}
+
+    _set_zone_width(60)
+    report = run_preflight_impact("product-1", chunk_size=2, workers=2)
+    assert report["engraveZone"]["widthMm"] == 60
+    assert report["newlyFailingCount"] == 1
+    assert [(item["orderRef"], item["previousStatus"], item["issueCodes"]) for item in report["newlyFailing"]] == [
+        ("medium", "pass", ["CANVAS_EXCEEDS_ENGRAVE_ZONE"])
+    ]
+    assert _statuses()["medium"] == "fail"
+
+    _set_zone_width(200)
+    assert run_preflight_impact("product-1")["recoveredCount"] == 2
+
+
+def test_impact_runs_are_queued_and_persist_their_report(api):
+    _create_job(api, 90, "medium")
+    assert api.post(f"/api/design-jobs/{_create_job(api, 50, 'small')}/preflight").json()["data"]["status"] == "pass"
+    assert _statuses()["small"] == "pass"
+
+    _set_zone_width(60)
+    response = api.post("/api/product-profiles/product-1/preflight-impact")
+    assert response.status_code == 202
+    assert response.json()["data"]["status"] == "queued"
+
+    for _ in range(100):
+        run = api.get(response.headers["location"]).json()["data"]
+        if run["status"] in ("completed", "failed"):
+            break
+        time.sleep(0.05)
+
+    assert run["status"] == "completed"
+    assert run["checkedJobs"] == 2
+    assert run["report"]["uncheckedFailingCount"] == 1
+    assert api.get("/api/preflight-impact-runs/missing").status_code == 404
+    assert api.post("/api/product-profiles/missing/preflight-impact").status_code == 404
+
+
+def test_jobs_written_after_the_cursor_read_them_are_not_overwritten(api):
+    moved = _create_job(api, 120, "moved")
+    _create_job(api, 50, "untouched")
+    with SessionLocal() as db:
+        product = db.get(ProductProfile, "product-1")
+        snapshot = db.execute(affected_jobs_statement("product-1")).all()
+
+    # The job is re-placed while the impact run still holds the old row.
+    placement = {"version": 2, "canvas": {"widthMm": 50, "heightMm": 50}, "machine": {"strokeWidthWarningThresholdMm": 0.1}, "objects": []}
+    assert api.patch(f"/api/design-jobs/{moved}", json={"placementJson": placement}).status_code == 200
+
+    outcomes, skipped = _preflight_chunk(product, snapshot)
+    assert [outcome["orderRef"] for outcome in outcomes] == ["untouched"]
+    assert skipped == 1
+    assert _statuses() == {"moved": None, "untouched": "pass"}
+    with SessionLocal() as db:
+        assert read_overview(db)["byPreflight"] == {"pass": 1, "warn": 0, "fail": 0, "unchecked": 1}
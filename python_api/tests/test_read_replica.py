@@ -0,0 +1,96 @@
+import shutil
+from pathlib import Path
+
+import pytest
+from sqlalchemy import update
+
+from app.config import settings
+from app.db import SessionLocal, dispose_engine, get_read_engine, recent_writes
+from app.models import ProductProfile
+
+PLACEMENT = {
+    "version": 2,
+    "canvas": {"widthMm": 50, "heightMm": 50},
+    "machine": {"strokeWidthWarningThresholdMm": 0.1},
+    "objects": [],
+}
+
+
+@pytest.fixture
+def replica(api, db_url, monkeypatch):
+    """A second SQLite database standing in for a replica; ``sync()`` copies the primary over it."""
+    primary_path = Path(db_url.removeprefix("sqlite:///"))
+    replica_path = primary_path.with_name("replica.db")
+
+    def sync():
+        dispose_engine()
+        shutil.copyfile(primary_path, replica_path)
+
+    monkeypatch.setattr(settings, "database_read_url", f"sqlite:///{replica_path}")
+    sync()
+    yield sync
+    dispose_engine()
+
+
+def _create_job(api) -> str:
+    response = api.post(
+        "/api/design-jobs",
+        json={"productProfileId": "product-1", "machineProfileId": "machine-1", "placementJson": PLACEMENT},
+    )
+    assert response.status_code == 201
+    return response.json()["data"]["id"]
+
+
+def test_reads_use_the_replica_and_writes_the_primary(api, replica):
+    assert str(get_read_engine().url).endswith("replica.db")
+    with SessionLocal() as db:
+        db.execute(update(ProductProfile).values(name="Renamed on primary"))
+        db.commit()
+
+    assert api.get("/api/product-profiles/product-1").json()["data"]["name"] == "20oz Tumbler"
+    assert api.get("/api/product-profiles").json()["data"][0]["name"] == "20oz Tumbler"
+    fresh = api.get("/api/product-profiles/product-1", headers={"X-Read-Primary": "1"})
+    assert fresh.json()["data"]["name"] == "Renamed on primary"
+
+
+def test_rows_missing_on_the_replica_are_read_from_the_primary(api, replica):
+    job_id = _create_job(api)
+    assert api.get(f"/api/design-jobs/{job_id}").status_code == 200
+    assert api.get(f"/api/design-jobs/{job_id}/proof").json()["data"]["designJobId"] == job_id
+    assert api.get("/api/design-jobs/missing").status_code == 404
+
+
+def test_patched_jobs_are_read_from_the_primary_until_the_window_passes(api, replica, monkeypatch):
+    job_id = _create_job(api)
+    replica()
+    moved = {**PLACEMENT, "canvas": {"widthMm": 80, "heightMm": 50}}
+
+    assert api.patch(f"/api/design-jobs/{job_id}", json={"placementJson": moved}).status_code == 200
+    detail = api.get(f"/api/design-jobs/{job_id}").json()["data"]
+    assert detail["placementJson"]["canvas"]["widthMm"] == 80
+
+    # Once the window has passed, reads go back to the (still stale) replica.
+    monkeypatch.setattr(settings, "read_your_writes_seconds", 0)
+    assert api.patch(f"/api/design-jobs/{job_id}", json={"placementJson": moved}).status_code == 200
+    stale = api.get(f"/api/design-jobs/{job_id}").json()["data"]
+    assert stale["placementJson"]["canvas"]["widthMm"] == 50
+
+
+def test_write_time_sends_reads_to_the_primary_on_any_worker(api, replica):
+    job_id = _create_job(api)
+    replica()
+    moved = {**PLACEMENT, "canvas": {"widthMm": 80, "heightMm": 50}}
+
+    patched = api.patch(f"/api/design-jobs/{job_id}", json={"placementJson": moved})
+    written_at = patched.headers["x-read-after"]
+    assert patched.cookies["lt316_read_after"] == written_at
+    assert "x-read-after" not in api.get(f"/api/design-jobs/{job_id}").headers
+
+    # Another worker has no record of the write; only the client's token routes it.
+    recent_writes.clear()
+    api.cookies.clear()
+    assert api.get(f"/api/design-jobs/{job_id}").json()["data"]["placementJson"]["canvas"]["widthMm"] == 50
+    with_header = api.get(f"/api/design-jobs/{job_id}", headers={"X-Read-After": written_at})
+    assert with_header.json()["data"]["placementJson"]["canvas"]["widthMm"] == 80
+    api.cookies.set("lt316_read_after", written_at)
+    assert api.get(f"/api/design-jobs/{job_id}").json()["data"]["placementJson"]["canvas"]["widthMm"] == 80
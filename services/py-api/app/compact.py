@@ -0,0 +1,419 @@
+"""Streaming compaction of traced SVG.
+
+vtracer writes full-precision coordinates, one ``translate()`` per path, curves
+for straight edges and a separate path for every colour region. This pass reads
+the document with ``iterparse`` and, path by path:
+
+* bakes the translate into the coordinates and snaps them to ``precision``
+  decimal places, working in integer units so relative offsets stay exact;
+* drops unstroked paths whose (approximate, polygonal) area is below
+  ``min_area`` px²;
+* rewrites the geometry with relative commands, using ``h``/``v`` and ``l`` for
+  axis-aligned and straight segments;
+* merges consecutive sibling paths that share every other attribute (fill,
+  fill-rule, ...). Only neighbours are merged, so paint order is unchanged,
+  and only when their bounding boxes do not overlap: overlapping subpaths in
+  one path cancel out under ``evenodd`` (and under ``nonzero`` when their
+  windings oppose), which would punch holes where each path was solid.
+
+Compaction is off unless a request asks for it or ``TRACE_COMPACT`` is set.
+
+Each element is detached from the tree once written, and merged geometry is
+encoded incrementally, so time and memory are linear in the input size.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import math
+import os
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+from xml.sax.saxutils import escape, quoteattr
+
+logger = logging.getLogger("py-api")
+
+_TOKEN = re.compile(r"[MmLlHhVvCcSsQqTtZzAa]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_TRANSLATE = re.compile(r"^\s*translate\(\s*([^\s,)]+)(?:[\s,]+([^\s,)]+))?\s*\)\s*$")
+_ARG_COUNTS = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "S": 4, "Q": 4, "T": 2, "Z": 0}
+
+COMPACT_ENABLED = os.environ.get("TRACE_COMPACT", "0").lower() in ("1", "true", "yes")
+# Two decimals is 1/100 px, far below the laser's spot size at any sensible dpi.
+DEFAULT_PRECISION = int(os.environ.get("TRACE_COMPACT_PRECISION", 2))
+DEFAULT_MIN_AREA = float(os.environ.get("TRACE_COMPACT_MIN_AREA", 1.0))
+MAX_PRECISION = 6
+
+
+@dataclass(frozen=True)
+class CompactOptions:
+    precision: int = DEFAULT_PRECISION
+    min_area: float = DEFAULT_MIN_AREA
+    merge: bool = True
+
+    def cache_token(self) -> str:
+        # v2: merging skips overlapping paths; entries written before that are not reused.
+        return f"compact-v2/{self.precision}/{self.min_area:g}/{int(self.merge)}"
+
+
+@dataclass
+class CompactResult:
+    svg: str
+    input_bytes: int
+    output_bytes: int
+    input_paths: int
+    output_paths: int
+    dropped_paths: int = 0
+
+    @property
+    def size_reduction(self) -> float:
+        return 1 - self.output_bytes / self.input_bytes if self.input_bytes else 0.0
+
+    @property
+    def path_reduction(self) -> float:
+        return 1 - self.output_paths / self.input_paths if self.input_paths else 0.0
+
+
+class _Unsupported(ValueError):
+    """Path data this pass does not rewrite (arcs, non-translate transforms)."""
+
+
+# A segment is (command, points) with absolute integer-unit coordinates;
+# command is one of "M", "L", "C", "Q" or "Z".
+Segment = tuple[str, tuple[tuple[int, int], ...]]
+
+
+def _parse_path(d: str, dx: float, dy: float, unit: float) -> list[Segment]:
+    """Parse ``d`` into absolute, translated, quantized segments."""
+    tokens = _TOKEN.findall(d)
+    segments: list[Segment] = []
+    x = y = start_x = start_y = 0.0
+    # Reflected control point for S/T, in float coordinates.
+    last_control: Optional[tuple[float, float]] = None
+    last_command = ""
+
+    def snap(px: float, py: float) -> tuple[int, int]:
+        return round((px + dx) / unit), round((py + dy) / unit)
+
+    index = 0
+    command = ""
+    while index < len(tokens):
+        token = tokens[index]
+        if token.isalpha():
+            command = token
+            index += 1
+        elif not command or command in "Zz":
+            raise _Unsupported("number without a command")
+        upper = command.upper()
+        if upper == "A":
+            raise _Unsupported("arc commands are not compacted")
+        count = _ARG_COUNTS[upper]
+        args = [float(value) for value in tokens[index : index + count]]
+        if len(args) < count:
+            raise _Unsupported("truncated path data")
+        index += count
+        relative = command.islower()
+        ox, oy = (x, y) if relative else (0.0, 0.0)
+
+        if upper == "Z":
+            segments.append(("Z", ()))
+            x, y = start_x, start_y
+            last_control = None
+        elif upper == "M":
+            x, y = args[0] + ox, args[1] + oy
+            start_x, start_y = x, y
+            segments.append(("M", (snap(x, y),)))
+            last_control = None
+            # Further coordinate pairs after a moveto are implicit linetos.
+            command = "l" if relative else "L"
+        elif upper in ("L", "H", "V", "T"):
+            if upper == "H":
+                x = args[0] + (x if relative else 0.0)
+            elif upper == "V":
+                y = args[0] + (y if relative else 0.0)
+            elif upper == "T":
+                control = (2 * x - last_control[0], 2 * y - last_control[1]) if last_command in "QT" and last_control else (x, y)
+                x, y = args[0] + ox, args[1] + oy
+                segments.append(("Q", (snap(*control), snap(x, y))))
+                last_control, last_command = control, "T"
+                continue
+            else:
+                x, y = args[0] + ox, args[1] + oy
+            segments.append(("L", (snap(x, y),)))
+            last_control = None
+        elif upper in ("C", "S"):
+            if upper == "C":
+                c1 = (args[0] + ox, args[1] + oy)
+                rest = args[2:]
+            else:
+                c1 = (2 * x - last_control[0], 2 * y - last_control[1]) if last_command in "CS" and last_control else (x, y)
+                rest = args
+            c2 = (rest[0] + ox, rest[1] + oy)
+            x, y = rest[2] + ox, rest[3] + oy
+            segments.append(("C", (snap(*c1), snap(*c2), snap(x, y))))
+            last_control = c2
+        elif upper == "Q":
+            control = (args[0] + ox, args[1] + oy)
+            x, y = args[2] + ox, args[3] + oy
+            segments.append(("Q", (snap(*control), snap(x, y))))
+            last_control = control
+        last_command = upper
+    return segments
+
+
+def _polygon_area(segments: list[Segment]) -> float:
+    """Absolute shoelace area over on-curve points, summed per subpath, in units²."""
+    total = 0.0
+    area = 0
+    first: Optional[tuple[int, int]] = None
+    previous: Optional[tuple[int, int]] = None
+    for command, points in segments:
+        if command in ("M", "Z"):
+            if first is not None and previous is not None:
+                area += previous[0] * first[1] - first[0] * previous[1]
+            total += abs(area) / 2
+            area = 0
+            first = previous = points[0] if command == "M" else None
+            continue
+        point = points[-1]
+        if previous is not None:
+            area += previous[0] * point[1] - point[0] * previous[1]
+        previous = point
+    if first is not None and previous is not None:
+        area += previous[0] * first[1] - first[0] * previous[1]
+    return total + abs(area) / 2
+
+
+Box = tuple[int, int, int, int]
+
+
+def _bounding_box(segments: list[Segment]) -> Optional[Box]:
+    """Box around every point, control points included, so it contains the whole curve."""
+    points = [point for _, segment_points in segments for point in segment_points]
+    if not points:
+        return None
+    xs, ys = [x for x, _ in points], [y for _, y in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _overlaps(a: Box, b: Box) -> bool:
+    # Boxes that only touch along an edge share no area.
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _is_straight(start: tuple[int, int], controls: tuple[tuple[int, int], ...], end: tuple[int, int]) -> bool:
+    """True when every control point lies within one unit of the chord, between its ends."""
+    ex, ey = end[0] - start[0], end[1] - start[1]
+    length_sq = ex * ex + ey * ey
+    if length_sq == 0:
+        return all(control == start for control in controls)
+    length = math.sqrt(length_sq)
+    for cx, cy in controls:
+        vx, vy = cx - start[0], cy - start[1]
+        if abs(ex * vy - ey * vx) > length:
+            return False
+        if not 0 <= ex * vx + ey * vy <= length_sq:
+            return False
+    return True
+
+
+class _PathEncoder:
+    """Writes segments as relative path data, carrying the current point across merged paths."""
+
+    def __init__(self, precision: int) -> None:
+        self.precision = precision
+        self.parts: list[str] = []
+        self.x = self.y = 0
+        self.start = (0, 0)
+        self._last_command = ""
+        self._last_number = ""
+
+    def _number(self, value: int) -> str:
+        if self.precision == 0:
+            return str(value)
+        digits = str(abs(value)).rjust(self.precision + 1, "0")
+        whole, fraction = digits[: -self.precision], digits[-self.precision :].rstrip("0")
+        text = f"{whole.lstrip('0') or ('' if fraction else '0')}{'.' + fraction if fraction else ''}"
+        return f"-{text}" if value < 0 else text
+
+    def _emit(self, command: str, *values: int) -> None:
+        # Repeated commands may omit the letter, except moveto (whose repeats mean lineto).
+        if command != self._last_command or command == "m":
+            self.parts.append(command)
+            self._last_number = ""
+        for value in values:
+            text = self._number(value)
+            if self._last_number and not (text[0] == "-" or (text[0] == "." and "." in self._last_number)):
+                self.parts.append(" ")
+            self.parts.append(text)
+            self._last_number = text
+        self._last_command = command
+
+    def _point(self, point: tuple[int, int]) -> tuple[int, int]:
+        return point[0] - self.x, point[1] - self.y
+
+    def add(self, segments: list[Segment]) -> None:
+        for index, (command, points) in enumerate(segments):
+            if command == "M":
+                self._emit("m", *self._point(points[0]))
+                self.x, self.y = self.start = points[0]
+            elif command == "Z":
+                if self._last_command != "z":
+                    self._emit("z")
+                self.x, self.y = self.start
+            else:
+                end = points[-1]
+                if command in ("C", "Q") and _is_straight((self.x, self.y), points[:-1], end):
+                    command, points = "L", (end,)
+                if command == "L":
+                    if end == (self.x, self.y):
+                        continue
+                    following = segments[index + 1][0] if index + 1 < len(segments) else ""
+                    if following == "Z" and end == self.start:
+                        continue  # closepath draws this edge anyway
+                    dx, dy = self._point(end)
+                    if dy == 0:
+                        self._emit("h", dx)
+                    elif dx == 0:
+                        self._emit("v", dy)
+                    else:
+                        self._emit("l", dx, dy)
+                else:
+                    self._emit(command.lower(), *(value for point in points for value in self._point(point)))
+                self.x, self.y = end
+
+    def text(self) -> str:
+        return "".join(self.parts)
+
+
+def _local(name: str) -> str:
+    return name.rsplit("}", 1)[-1]
+
+
+@dataclass
+class _PendingPath:
+    key: tuple[tuple[str, str], ...]
+    encoder: _PathEncoder
+    attributes: dict[str, str] = field(default_factory=dict)
+    # Union of the merged paths' boxes; a path overlapping it starts a new group.
+    box: Optional[Box] = None
+
+    def accepts(self, key: tuple[tuple[str, str], ...], box: Optional[Box]) -> bool:
+        return self.key == key and box is not None and self.box is not None and not _overlaps(self.box, box)
+
+    def add(self, segments: list[Segment], box: Optional[Box]) -> None:
+        self.encoder.add(segments)
+        if box is not None and self.box is not None:
+            box = (min(self.box[0], box[0]), min(self.box[1], box[1]), max(self.box[2], box[2]), max(self.box[3], box[3]))
+        self.box = box
+
+
+def _attribute_text(name: str, value: str, prefixes: dict[str, str]) -> str:
+    if name.startswith("{"):
+        uri, local = name[1:].split("}", 1)
+        prefix = prefixes.get(uri)
+        name = f"{prefix}:{local}" if prefix else local
+    return f"{name}={quoteattr(value)}"
+
+
+def _compact(svg_text: str, options: CompactOptions) -> Iterator[tuple[str, int]]:
+    """Yield output chunks with the number of paths written in each (-1 marks a dropped path)."""
+    unit = 10.0**-options.precision
+    prefixes: dict[str, str] = {}
+    pending_ns: list[tuple[str, str]] = []
+    stack: list[ET.Element] = []
+    pending: Optional[_PendingPath] = None
+
+    def flush() -> Iterator[tuple[str, int]]:
+        nonlocal pending
+        if pending is not None:
+            attributes = "".join(" " + _attribute_text(k, v, prefixes) for k, v in pending.attributes.items())
+            yield f'<path d="{pending.encoder.text()}"{attributes}/>', 1
+            pending = None
+
+    for event, item in ET.iterparse(io.BytesIO(svg_text.encode("utf-8")), events=("start-ns", "start", "end")):
+        if event == "start-ns":
+            prefix, uri = item
+            prefixes[uri] = prefix
+            pending_ns.append((prefix, uri))
+            continue
+
+        element: ET.Element = item
+        tag = _local(element.tag)
+        if event == "start":
+            if tag != "path":
+                yield from flush()
+                if stack and stack[-1].text and stack[-1].text.strip():
+                    yield escape(stack[-1].text), 0
+                    stack[-1].text = None
+                declarations = "".join(
+                    f' xmlns{":" + prefix if prefix else ""}={quoteattr(uri)}' for prefix, uri in pending_ns
+                )
+                pending_ns.clear()
+                attributes = "".join(" " + _attribute_text(k, v, prefixes) for k, v in element.attrib.items())
+                yield f"<{tag}{declarations}{attributes}>", 0
+            stack.append(element)
+            continue
+
+        stack.pop()
+        if tag == "path":
+            attributes = dict(element.attrib)
+            d = attributes.pop("d", "")
+            transform = attributes.pop("transform", "")
+            try:
+                translate = _TRANSLATE.match(transform) if transform else None
+                if transform and translate is None:
+                    raise _Unsupported("only translate() transforms are baked")
+                dx = float(translate.group(1)) if translate else 0.0
+                dy = float(translate.group(2) or 0) if translate else 0.0
+                segments = _parse_path(d, dx, dy, unit)
+            except (_Unsupported, ValueError):
+                yield from flush()
+                yield "<path " + " ".join(_attribute_text(k, v, prefixes) for k, v in element.attrib.items()) + "/>", 1
+            else:
+                stroked = attributes.get("stroke", "none") != "none"
+                if stroked or _polygon_area(segments) * unit * unit >= options.min_area:
+                    key = tuple(sorted(attributes.items()))
+                    box = _bounding_box(segments)
+                    if pending is None or not options.merge or not pending.accepts(key, box):
+                        yield from flush()
+                        pending = _PendingPath(key, _PathEncoder(options.precision), attributes)
+                    pending.add(segments, box)
+                else:
+                    yield "", -1
+        else:
+            yield from flush()
+            if element.text and element.text.strip():
+                yield escape(element.text), 0
+            yield f"</{tag}>", 0
+        if stack:
+            # Detach the finished element so the tree never grows past one branch.
+            stack[-1].remove(element)
+    yield from flush()
+
+
+def compact_svg(svg_text: str, options: CompactOptions) -> CompactResult:
+    """Compact ``svg_text``; the input is returned unchanged if it cannot be parsed or would not shrink."""
+    input_bytes = len(svg_text.encode("utf-8"))
+    input_paths = svg_text.count("<path")
+    unchanged = CompactResult(svg_text, input_bytes, input_bytes, input_paths, input_paths)
+    chunks: list[str] = []
+    output_paths = dropped = 0
+    try:
+        for chunk, paths in _compact(svg_text, options):
+            if paths < 0:
+                dropped += 1
+                continue
+            chunks.append(chunk)
+            output_paths += paths
+    except ET.ParseError as exc:
+        logger.warning("SVG compaction skipped, output is not well-formed: %s", exc)
+        return unchanged
+
+    compacted = "".join(chunks)
+    output_bytes = len(compacted.encode("utf-8"))
+    if output_bytes >= input_bytes:
+        return unchanged
+    return CompactResult(compacted, input_bytes, output_bytes, input_paths, output_paths, dropped)
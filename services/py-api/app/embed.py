@@ -0,0 +1,92 @@
+"""Laser-optimized raster embedding.
+
+The plain embed fallback base64-encodes the upload untouched. This variant
+resamples to the engraving resolution, optionally reduces to grayscale or
+dithered 1-bit, drops EXIF/ICC metadata by re-encoding from pixels only, and
+keeps whichever of PNG or JPEG comes out smaller.
+"""
+
+from __future__ import annotations
+
+import base64
+import io
+from dataclasses import dataclass
+from typing import Optional
+
+from PIL import Image
+
+from app.resample import scaled_size
+
+EMBED_COLORS = ("color", "grayscale", "1bit")
+JPEG_QUALITY = 85
+
+
+@dataclass(frozen=True)
+class OptimizedRaster:
+    data: bytes
+    mime_type: str
+    width: int
+    height: int
+    original_bytes: int
+
+
+def _encode(image: Image.Image, format: str) -> bytes:
+    output = io.BytesIO()
+    if format == "JPEG":
+        image.save(output, format="JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    else:
+        image.save(output, format="PNG", optimize=True)
+    return output.getvalue()
+
+
+def optimize_raster(image_bytes: bytes, scale: float, color: str) -> OptimizedRaster:
+    with Image.open(io.BytesIO(image_bytes)) as source:
+        size = scaled_size(source.width, source.height, scale)
+        if scale < 1:
+            source.draft("RGB", size)
+        has_alpha = "A" in source.getbands() or "transparency" in source.info
+        image = source.convert("RGBA" if has_alpha else "RGB")
+        if image.size != size:
+            image = image.resize(size, Image.Resampling.LANCZOS)
+
+    if has_alpha:
+        # Engraving has no transparency: flatten onto white (unburnt material).
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+
+    if color == "grayscale":
+        image = image.convert("L")
+    elif color == "1bit":
+        image = image.convert("L").convert("1")  # Floyd-Steinberg dithering
+
+    # Re-encoding from pixels drops EXIF, ICC profiles and text chunks.
+    candidates = [("image/png", _encode(image, "PNG"))]
+    if color != "1bit":
+        candidates.append(("image/jpeg", _encode(image, "JPEG")))
+    mime_type, data = min(candidates, key=lambda candidate: len(candidate[1]))
+    return OptimizedRaster(data, mime_type, image.width, image.height, len(image_bytes))
+
+
+def optimized_embed_svg(raster: OptimizedRaster, width_mm: Optional[float], height_mm: Optional[float]) -> str:
+    """Embed ``raster``; sized in millimetres when the engraving size is known."""
+    aspect = raster.width / raster.height
+    if width_mm and height_mm:
+        width_mm = min(width_mm, height_mm * aspect)  # fit inside the target box
+    if width_mm:
+        height_mm = width_mm / aspect
+    elif height_mm:
+        width_mm = height_mm * aspect
+
+    if width_mm and height_mm:
+        outer_width, outer_height = f"{width_mm:.3f}mm", f"{height_mm:.3f}mm"
+    else:
+        outer_width, outer_height = str(raster.width), str(raster.height)
+
+    encoded = base64.b64encode(raster.data).decode("ascii")
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{outer_width}" height="{outer_height}" '
+        f'viewBox="0 0 {raster.width} {raster.height}">'
+        f'<image href="data:{raster.mime_type};base64,{encoded}" width="{raster.width}" height="{raster.height}"/>'
+        "</svg>"
+    )
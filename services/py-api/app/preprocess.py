@@ -0,0 +1,103 @@
+"""Optional clean-up of raster input before tracing.
+
+Photos and JPEG-compressed logos carry noise and smooth gradients that vtracer
+turns into thousands of tiny paths. Each stage here is a whole-array NumPy or
+Pillow operation; stages run in a fixed order (grayscale, denoise, threshold or
+quantize, despeckle) regardless of the order they were requested in.
+"""
+
+from __future__ import annotations
+
+import io
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+STAGES = ("grayscale", "denoise", "threshold", "quantize", "despeckle")
+
+
+@dataclass(frozen=True)
+class PreprocessOptions:
+    stages: frozenset[str]
+    quantize_levels: int = 4
+    threshold_block: int = 31
+    threshold_offset: float = 8.0
+    denoise_size: int = 3
+    speck_size: int = 3
+
+    @classmethod
+    def parse(cls, raw: Optional[str], quantize_levels: Optional[int] = None) -> Optional["PreprocessOptions"]:
+        """Parse a comma-separated stage list; returns None when no stage is requested."""
+        stages = frozenset(stage.strip().lower() for stage in (raw or "").split(",") if stage.strip())
+        if not stages:
+            return None
+        unknown = stages - set(STAGES)
+        if unknown:
+            raise ValueError(f"unknown preprocess stage(s): {', '.join(sorted(unknown))}")
+        if {"threshold", "quantize"} <= stages:
+            raise ValueError("choose either threshold or quantize")
+        if quantize_levels is not None and not 2 <= quantize_levels <= 64:
+            raise ValueError("quantize_levels must be between 2 and 64")
+        return cls(stages=stages, quantize_levels=quantize_levels or cls.quantize_levels)
+
+    def cache_token(self) -> str:
+        return f"{'+'.join(sorted(self.stages))}/{self.quantize_levels}"
+
+
+def adaptive_threshold(gray: np.ndarray, block: int, offset: float) -> np.ndarray:
+    """Binarize against the local mean of a ``block``-sized window, via an integral image."""
+    radius = block // 2
+    padded = np.pad(gray.astype(np.float64), radius + 1, mode="edge")
+    integral = padded.cumsum(axis=0).cumsum(axis=1)
+    height, width = gray.shape
+    size = 2 * radius + 1
+    window_sum = (
+        integral[size : size + height, size : size + width]
+        - integral[0:height, size : size + width]
+        - integral[size : size + height, 0:width]
+        + integral[0:height, 0:width]
+    )
+    local_mean = window_sum / (size * size)
+    return np.where(gray > local_mean - offset, 255, 0).astype(np.uint8)
+
+
+def quantize_levels(array: np.ndarray, levels: int) -> np.ndarray:
+    """Snap every channel to ``levels`` evenly spaced values."""
+    step = 255.0 / (levels - 1)
+    return np.round(np.round(array.astype(np.float32) / step) * step).clip(0, 255).astype(np.uint8)
+
+
+def _despeckle(image: Image.Image, size: int) -> Image.Image:
+    # Opening removes light specks, closing fills dark pinholes; both leave
+    # features larger than ``size`` pixels intact.
+    opened = image.filter(ImageFilter.MinFilter(size)).filter(ImageFilter.MaxFilter(size))
+    return opened.filter(ImageFilter.MaxFilter(size)).filter(ImageFilter.MinFilter(size))
+
+
+def preprocess_image(image_bytes: bytes, options: PreprocessOptions) -> bytes:
+    with Image.open(io.BytesIO(image_bytes)) as source:
+        source.load()
+        image = source.convert("RGBA") if "A" in source.getbands() else source.convert("RGB")
+
+    # Flatten transparency onto white so thresholds see the background as light.
+    if image.mode == "RGBA":
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+
+    if "grayscale" in options.stages or "threshold" in options.stages:
+        image = image.convert("L")
+    if "denoise" in options.stages:
+        image = image.filter(ImageFilter.MedianFilter(options.denoise_size))
+    if "threshold" in options.stages:
+        image = Image.fromarray(adaptive_threshold(np.asarray(image), options.threshold_block, options.threshold_offset))
+    if "quantize" in options.stages:
+        image = Image.fromarray(quantize_levels(np.asarray(image), options.quantize_levels))
+    if "despeckle" in options.stages:
+        image = _despeckle(image, options.speck_size)
+
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import io
+import math
+import os
+from typing import Optional
+
+from PIL import Image
+
+MM_PER_INCH = 25.4
+# Matches the proof templates' default output resolution.
+DEFAULT_DPI = float(os.environ.get("TRACE_DEFAULT_DPI", 300))
+
+
+def target_scale(
+    width_px: int,
+    height_px: int,
+    target_width_mm: Optional[float],
+    target_height_mm: Optional[float],
+    dpi: Optional[float],
+) -> float:
+    """Scale that brings the image down to the pixels the laser can resolve at the target size.
+
+    Returns 1.0 when no target size is given or the image is already at or below
+    the effective resolution; images are never upscaled.
+    """
+    pixels_per_mm = (dpi or DEFAULT_DPI) / MM_PER_INCH
+    scales = []
+    if target_width_mm:
+        scales.append(target_width_mm * pixels_per_mm / width_px)
+    if target_height_mm:
+        scales.append(target_height_mm * pixels_per_mm / height_px)
+    if not scales:
+        return 1.0
+    return min(1.0, min(scales))
+
+
+def scaled_size(width_px: int, height_px: int, scale: float) -> tuple[int, int]:
+    return max(1, math.ceil(width_px * scale)), max(1, math.ceil(height_px * scale))
+
+
+def downscale_image(image_bytes: bytes, scale: float) -> tuple[bytes, int, int]:
+    """Resample to ``scale`` with a Lanczos filter and re-encode as PNG."""
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        size = scaled_size(image.width, image.height, scale)
+        # For JPEGs, draft() makes the decoder do most of the reduction (1/2, 1/4
+        # or 1/8 in the DCT domain) while keeping at least ``size`` pixels.
+        image.draft(image.mode if image.mode in ("RGB", "L") else "RGB", size)
+        if image.mode not in ("RGB", "RGBA", "L", "LA"):
+            image = image.convert("RGBA")
+        resized = image.resize(size, Image.Resampling.LANCZOS)
+
+    output = io.BytesIO()
+    resized.save(output, format="PNG")
+    return output.getvalue(), size[0], size[1]
@@ -0,0 +1,189 @@
+"""Tiled tracing for very large images.
+
+vtracer's time and memory grow super-linearly with pixel count, so large
+artwork is cut into overlapping tiles that are traced independently in the
+worker pool. Workers only ever see one tile, which bounds their memory by the
+tile size. Neither PNG nor baseline JPEG can be decoded region by region, so the
+API process holds the decoded image once while cropping. ``TRACE_MAX_PIXELS``
+caps one image, and a ``DecodeBudget`` caps how many decoded pixels all tiled
+traces in the process may hold at once; jobs beyond it wait for an earlier one
+to finish.
+
+Stitching is core clipping only: each tile contributes its core (the tile minus
+its share of the overlap), paths lying entirely in the overlap are dropped and
+the rest are clipped to the core rectangle. Paths are not merged across tile
+borders, so a shape that crosses one stays split into one clipped piece per tile.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import re
+import weakref
+import xml.etree.ElementTree as ET
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Optional
+from xml.sax.saxutils import quoteattr
+
+from PIL import Image
+
+SVG_NS = "http://www.w3.org/2000/svg"
+_NUMBER = re.compile(r"-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+# Clip rectangles reach half a pixel past the core so anti-aliased renderers do
+# not show hairline gaps where two tiles' clipped pieces meet.
+CLIP_BLEED = 0.5
+_TRANSLATE = re.compile(r"translate\(\s*(" + _NUMBER.pattern + r")[\s,]+(" + _NUMBER.pattern + r")\s*\)")
+
+
+@dataclass(frozen=True)
+class Tile:
+    index: int
+    # Region cropped and traced, including overlap.
+    x0: int
+    y0: int
+    x1: int
+    y1: int
+    # Region this tile is responsible for in the stitched output.
+    core_x0: int
+    core_y0: int
+    core_x1: int
+    core_y1: int
+
+
+def plan_tiles(width: int, height: int, tile_size: int, overlap: int) -> list[Tile]:
+    tiles = []
+    for core_y0 in range(0, height, tile_size):
+        for core_x0 in range(0, width, tile_size):
+            core_x1, core_y1 = min(width, core_x0 + tile_size), min(height, core_y0 + tile_size)
+            tiles.append(
+                Tile(
+                    index=len(tiles),
+                    x0=max(0, core_x0 - overlap),
+                    y0=max(0, core_y0 - overlap),
+                    x1=min(width, core_x1 + overlap),
+                    y1=min(height, core_y1 + overlap),
+                    core_x0=core_x0,
+                    core_y0=core_y0,
+                    core_x1=core_x1,
+                    core_y1=core_y1,
+                )
+            )
+    return tiles
+
+
+@dataclass
+class _LoopBudget:
+    condition: asyncio.Condition = field(default_factory=asyncio.Condition)
+    in_use: int = 0
+
+
+class DecodeBudget:
+    """Limits the decoded pixels held by concurrent tiled traces.
+
+    An image larger than the whole budget is still traced, but only once nothing
+    else holds any of it.
+    """
+
+    def __init__(self, max_pixels: int) -> None:
+        self.max_pixels = max(1, max_pixels)
+        # asyncio conditions belong to one event loop, so keep one per loop.
+        self._loops: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopBudget] = weakref.WeakKeyDictionary()
+
+    def in_use(self) -> int:
+        try:
+            state = self._loops.get(asyncio.get_running_loop())
+        except RuntimeError:
+            return 0
+        return state.in_use if state else 0
+
+    @asynccontextmanager
+    async def reserve(self, pixels: int) -> AsyncIterator[None]:
+        pixels = min(max(0, pixels), self.max_pixels)
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            state = self._loops[loop] = _LoopBudget()
+        async with state.condition:
+            await state.condition.wait_for(lambda: state.in_use + pixels <= self.max_pixels)
+            state.in_use += pixels
+        try:
+            yield
+        finally:
+            async with state.condition:
+                state.in_use -= pixels
+                state.condition.notify_all()
+
+
+class TileCropper:
+    """Decodes the source once and hands out PNG-encoded tiles on demand."""
+
+    def __init__(self, image_bytes: bytes) -> None:
+        source = Image.open(io.BytesIO(image_bytes))
+        source.load()
+        # RGB(A) sources are cropped as decoded; converting them would hold a second full copy.
+        if source.mode not in ("RGB", "RGBA"):
+            source = source.convert("RGBA" if "A" in source.getbands() else "RGB")
+        self.image = source
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self.image.size
+
+    def crop(self, tile: Tile) -> bytes:
+        output = io.BytesIO()
+        self.image.crop((tile.x0, tile.y0, tile.x1, tile.y1)).save(output, format="PNG", compress_level=1)
+        return output.getvalue()
+
+
+def _path_bounds(element: ET.Element) -> Optional[tuple[float, float, float, float]]:
+    numbers = [float(value) for value in _NUMBER.findall(element.get("d", ""))]
+    if len(numbers) < 2:
+        return None
+    dx = dy = 0.0
+    translate = _TRANSLATE.search(element.get("transform", ""))
+    if translate:
+        dx, dy = float(translate.group(1)), float(translate.group(2))
+    xs, ys = numbers[0::2], numbers[1::2]
+    return min(xs) + dx, min(ys) + dy, max(xs) + dx, max(ys) + dy
+
+
+def _tile_paths(svg_text: str) -> list[ET.Element]:
+    root = ET.fromstring(svg_text.encode("utf-8"))
+    return [element for element in root.iter(f"{{{SVG_NS}}}path")]
+
+
+def stitch_tiles(width: int, height: int, traced: list[tuple[Tile, str]]) -> str:
+    defs: list[str] = []
+    groups: list[str] = []
+    for tile, svg_text in sorted(traced, key=lambda item: item[0].index):
+        # Tile-local core rectangle.
+        left, top = tile.core_x0 - tile.x0, tile.core_y0 - tile.y0
+        right, bottom = tile.core_x1 - tile.x0, tile.core_y1 - tile.y0
+
+        kept = []
+        for element in _tile_paths(svg_text):
+            bounds = _path_bounds(element)
+            if bounds is not None and (bounds[2] <= left or bounds[0] >= right or bounds[3] <= top or bounds[1] >= bottom):
+                continue  # entirely inside the overlap; a neighbour owns it
+            attributes = " ".join(f"{name}={quoteattr(value)}" for name, value in element.attrib.items())
+            kept.append(f"<path {attributes}/>")
+        if not kept:
+            continue
+
+        clip_id = f"tile-{tile.index}"
+        defs.append(
+            f'<clipPath id="{clip_id}"><rect x="{left - CLIP_BLEED}" y="{top - CLIP_BLEED}" '
+            f'width="{right - left + 2 * CLIP_BLEED}" height="{bottom - top + 2 * CLIP_BLEED}"/></clipPath>'
+        )
+        groups.append(
+            f'<g transform="translate({tile.x0},{tile.y0})" clip-path="url(#{clip_id})">' + "".join(kept) + "</g>"
+        )
+
+    return (
+        f'<svg version="1.1" xmlns="{SVG_NS}" width="{width}" height="{height}" viewBox="0 0 {width} {height}">'
+        f"<defs>{''.join(defs)}</defs>"
+        + "\n".join(groups)
+        + "</svg>"
+    )
@@ -0,0 +1,150 @@
+"""Per-stage timing of trace requests.
+
+A ``StageTimer`` is bound to the current request through a context variable,
+so pipeline code only needs ``with stage("decode"):`` without threading the
+timer through every call (it also follows ``asyncio.to_thread`` and tasks).
+Finished timers feed process-wide histograms; a request that ended in the embed
+fallback is counted once, under the reason the trace failed.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+# Upper bounds in milliseconds; the last bucket is open-ended.
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+_current: ContextVar[Optional["StageTimer"]] = ContextVar("trace_stage_timer", default=None)
+
+
+class StageTimer:
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.total: Optional[float] = None
+        self.durations: dict[str, float] = {}
+        self.trace_failure: Optional[str] = None
+        self.fallback: Optional[str] = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            # Repeated stages (several cache lookups, one per tile...) accumulate.
+            self.durations[name] = self.durations.get(name, 0.0) + time.perf_counter() - started
+
+    def finish(self) -> None:
+        if self.total is None:
+            self.total = time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.durations.items()]
+        total = self.total if self.total is not None else time.perf_counter() - self.started
+        entries.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(entries)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block against the current request's timer, if there is one."""
+    timer = _current.get()
+    if timer is None:
+        yield
+        return
+    with timer.stage(name):
+        yield
+
+
+def note_trace_failure(reason: str) -> None:
+    """Remember why vtracer produced nothing; the first reason wins."""
+    timer = _current.get()
+    if timer is not None and timer.trace_failure is None:
+        timer.trace_failure = reason
+
+
+def mark_fallback() -> str:
+    """Record that the request fell back to the embed SVG and return the reason."""
+    timer = _current.get()
+    if timer is None:
+        return "unknown"
+    timer.fallback = timer.trace_failure or "unknown"
+    return timer.fallback
+
+
+class _Histogram:
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        index = next((i for i, bound in enumerate(BUCKETS_MS) if value_ms <= bound), len(BUCKETS_MS))
+        self.counts[index] += 1
+        self.count += 1
+        self.sum_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def snapshot(self) -> dict[str, Any]:
+        cumulative, buckets = 0, {}
+        for bound, count in zip([*map(str, BUCKETS_MS), "+Inf"], self.counts):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {
+            "count": self.count,
+            "sumMs": round(self.sum_ms, 1),
+            "meanMs": round(self.sum_ms / self.count, 1) if self.count else 0.0,
+            "maxMs": round(self.max_ms, 1),
+            "buckets": buckets,
+        }
+
+
+class TimingStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stages: dict[str, _Histogram] = {}
+        self._fallbacks: dict[str, int] = {}
+        self._requests = 0
+
+    def record(self, timer: StageTimer) -> None:
+        timer.finish()
+        with self._lock:
+            self._requests += 1
+            for name, seconds in [*timer.durations.items(), ("total", timer.total or 0.0)]:
+                self._stages.setdefault(name, _Histogram()).observe(seconds * 1000)
+            if timer.fallback is not None:
+                self._fallbacks[timer.fallback] = self._fallbacks.get(timer.fallback, 0) + 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "stages": {name: histogram.snapshot() for name, histogram in self._stages.items()},
+                "fallbacks": dict(self._fallbacks),
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+            self._fallbacks.clear()
+            self._requests = 0
+
+
+timing_stats = TimingStats()
+
+
+@contextmanager
+def timed_request() -> Iterator[StageTimer]:
+    """Bind a fresh timer to the current context and record it when the block exits."""
+    timer = StageTimer()
+    token = _current.set(timer)
+    try:
+        yield timer
+    finally:
+        _current.reset(token)
+        timing_stats.record(timer)
@@ -0,0 +1,202 @@
+"""Two-tier cache for trace results.
+
+Keys are ``sha256(image bytes)`` plus the trace parameters, so re-uploads of the
+same logo skip vtracer entirely. A byte-capped in-memory LRU sits in front of an
+on-disk store under ``STORAGE_DIR/trace-cache``; the disk tier survives restarts
+and is shared by every worker process that mounts the same volume. The async
+methods keep disk reads and writes off the event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+
+def storage_dir() -> Path:
+    return Path(os.environ.get("STORAGE_DIR", "./storage"))
+
+
+def trace_cache_key(image_bytes: bytes, mode: str, simplify: Optional[float], *options: object) -> str:
+    """Key for a trace of ``image_bytes``; ``options`` are any further parameters that change the output."""
+    digest = hashlib.sha256(image_bytes).hexdigest()
+    params = ":".join([mode, "" if simplify is None else repr(float(simplify)), *map(str, options)])
+    return f"{digest}-{hashlib.sha256(params.encode('utf-8')).hexdigest()[:16]}"
+
+
+class TraceCache:
+    def __init__(self, root: Path, memory_max_bytes: int, disk_max_bytes: int, rescan_seconds: float = 600.0) -> None:
+        self.root = root
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.rescan_seconds = rescan_seconds
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        # Size of every file on disk, least recently used first, so a store never
+        # rescans the directory. Rebuilt every ``rescan_seconds`` to pick up
+        # entries written or removed by other processes.
+        self._disk_index: Optional[OrderedDict[str, int]] = None
+        self._disk_bytes = 0
+        self._disk_indexed_at = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"memoryHits": 0, "diskHits": 0, "misses": 0, "stores": 0, "memoryEvictions": 0, "diskEvictions": 0}
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.svg"
+
+    def _get_memory(self, key: str) -> Optional[str]:
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is None:
+                return None
+            self._memory.move_to_end(key)
+            self._stats["memoryHits"] += 1
+            return cached.decode("utf-8")
+
+    def _get_disk(self, key: str) -> tuple[Optional[str], str]:
+        path = self._path(key)
+        try:
+            payload = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._stats["misses"] += 1
+            return None, "miss"
+
+        with self._lock:
+            self._stats["diskHits"] += 1
+            self._remember(key, payload)
+            self._index_disk_entry(key, len(payload))
+        return payload.decode("utf-8"), "disk"
+
+    def get(self, key: str) -> tuple[Optional[str], str]:
+        """Return ``(svg, tier)`` where tier is ``memory``, ``disk`` or ``miss``."""
+        cached = self._get_memory(key)
+        if cached is not None:
+            return cached, "memory"
+        return self._get_disk(key)
+
+    async def get_async(self, key: str) -> tuple[Optional[str], str]:
+        """``get`` for the event loop: memory hits answer inline, disk reads run in a thread."""
+        cached = self._get_memory(key)
+        if cached is not None:
+            return cached, "memory"
+        return await asyncio.to_thread(self._get_disk, key)
+
+    def put(self, key: str, svg_text: str) -> None:
+        payload = svg_text.encode("utf-8")
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        temp_path.write_bytes(payload)
+        os.replace(temp_path, path)
+
+        self._refresh_disk_index()
+        with self._lock:
+            self._stats["stores"] += 1
+            self._remember(key, payload)
+            self._index_disk_entry(key, len(payload))
+            victims = self._disk_victims()
+        self._evict_disk(victims)
+
+    async def put_async(self, key: str, svg_text: str) -> None:
+        await asyncio.to_thread(self.put, key, svg_text)
+
+    def _remember(self, key: str, payload: bytes) -> None:
+        # Caller holds the lock. Oversized entries stay on disk only.
+        if len(payload) > self.memory_max_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = payload
+        self._memory_bytes += len(payload)
+        while self._memory_bytes > self.memory_max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self._stats["memoryEvictions"] += 1
+
+    def _index_disk_entry(self, key: str, size: int) -> None:
+        # Caller holds the lock; marks ``key`` as the most recently used file.
+        if self._disk_index is None:
+            return
+        self._disk_bytes += size - self._disk_index.pop(key, 0)
+        self._disk_index[key] = size
+
+    def _disk_victims(self) -> list[tuple[str, int]]:
+        # Caller holds the lock; drops the oldest files from the index until under budget.
+        victims = []
+        while self._disk_index and self._disk_bytes > self.disk_max_bytes:
+            key, size = self._disk_index.popitem(last=False)
+            self._disk_bytes -= size
+            victims.append((key, size))
+        return victims
+
+    def _refresh_disk_index(self) -> None:
+        with self._lock:
+            if self._disk_index is not None and time.monotonic() - self._disk_indexed_at < self.rescan_seconds:
+                return
+
+        entries = []
+        for path in self.root.glob("*/*.svg"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        entries.sort()
+
+        with self._lock:
+            self._disk_index = OrderedDict((key, size) for _, key, size in entries)
+            self._disk_bytes = sum(self._disk_index.values())
+            self._disk_indexed_at = time.monotonic()
+
+    def _evict_disk(self, victims: list[tuple[str, int]]) -> None:
+        evicted = 0
+        for key, _ in victims:
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                continue
+            evicted += 1
+        if evicted:
+            with self._lock:
+                self._stats["diskEvictions"] += evicted
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                **self._stats,
+                "memoryEntries": len(self._memory),
+                "memoryBytes": self._memory_bytes,
+                "memoryMaxBytes": self.memory_max_bytes,
+                "diskBytes": self._disk_bytes,
+                "diskMaxBytes": self.disk_max_bytes,
+            }
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+trace_cache = TraceCache(
+    root=storage_dir() / "trace-cache",
+    memory_max_bytes=_env_int("TRACE_CACHE_MEMORY_BYTES", 64 * 1024 * 1024),
+    disk_max_bytes=_env_int("TRACE_CACHE_DISK_BYTES", 1024 * 1024 * 1024),
+    rescan_seconds=_env_int("TRACE_CACHE_RESCAN_SECONDS", 600),
+)
@@ -0,0 +1,324 @@
+"""Asynchronous trace jobs persisted under ``STORAGE_DIR/trace-jobs``.
+
+Each job is a directory holding the uploaded image, a ``job.json`` status
+document and, once finished, ``result.svg``. Because everything needed to run a
+job is on disk, jobs that were queued or running when the service stopped are
+picked up again on the next start. A sweeper deletes finished jobs once they
+are older than the retention period.
+
+Several processes (or replicas sharing the volume) may try to resume the same
+job, so a job only runs under a lease: ``lease.json`` names its owner and
+expiry. A lease is taken by creating that file with ``O_EXCL``; an expired one
+is first renamed aside, which only one contender can do. The owner renews the
+lease while the job runs, and the sweeper resubmits jobs whose lease lapsed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import re
+import shutil
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import HTTPException
+
+from app.trace_pool import get_trace_pool
+
+logger = logging.getLogger("py-api")
+
+FINISHED_STATUSES = ("succeeded", "failed")
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+# Pool back-pressure is retried inside the job rather than failing it.
+RETRYABLE_STATUS_CODES = (429, 503)
+MAX_RETRIES = 5
+LEASE_SECONDS = float(os.environ.get("TRACE_JOB_LEASE_SECONDS", 60))
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class TraceJobStore:
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _dir(self, job_id: str) -> Path:
+        if not _JOB_ID.match(job_id):
+            raise KeyError(job_id)
+        return self.root / job_id
+
+    def _write_json(self, path: Path, payload: dict[str, Any]) -> None:
+        temp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        temp_path.write_text(json.dumps(payload), encoding="utf-8")
+        os.replace(temp_path, path)
+
+    def create(self, image_bytes: bytes, filename: str, params: dict[str, Any]) -> dict[str, Any]:
+        job_id = uuid.uuid4().hex
+        job_dir = self._dir(job_id)
+        job_dir.mkdir(parents=True)
+        (job_dir / "input").write_bytes(image_bytes)
+        now = _now_iso()
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "progress": 0.0,
+            "filename": filename,
+            "params": params,
+            "createdAt": now,
+            "updatedAt": now,
+            "finishedAt": None,
+            "error": None,
+            "metadata": None,
+        }
+        self._write_json(job_dir / "job.json", job)
+        return job
+
+    def get(self, job_id: str) -> Optional[dict[str, Any]]:
+        try:
+            return json.loads((self._dir(job_id) / "job.json").read_text(encoding="utf-8"))
+        except (KeyError, FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def update(self, job_id: str, **changes: Any) -> dict[str, Any]:
+        with self._lock:
+            job = self.get(job_id)
+            if job is None:
+                raise KeyError(job_id)
+            job.update(changes, updatedAt=_now_iso())
+            if job["status"] in FINISHED_STATUSES and not job["finishedAt"]:
+                job["finishedAt"] = job["updatedAt"]
+            self._write_json(self._dir(job_id) / "job.json", job)
+            return job
+
+    def _lease(self, job_id: str) -> Optional[dict[str, Any]]:
+        try:
+            return json.loads((self._dir(job_id) / "lease.json").read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def claim(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """Take the job's lease unless another owner holds a live one; one concurrent caller wins."""
+        path = self._dir(job_id) / "lease.json"
+        lease = self._lease(job_id)
+        if lease is not None:
+            if lease["expiresAt"] > time.time():
+                return False
+            try:
+                # Only one contender can move the expired lease out of the way.
+                os.rename(path, path.with_name(f"lease.{uuid.uuid4().hex}.expired"))
+            except FileNotFoundError:
+                return False
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump({"owner": owner, "expiresAt": time.time() + lease_seconds}, handle)
+        for expired in path.parent.glob("lease.*.expired"):
+            expired.unlink(missing_ok=True)
+        return True
+
+    def renew(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        lease = self._lease(job_id)
+        if lease is None or lease["owner"] != owner:
+            return False
+        self._write_json(self._dir(job_id) / "lease.json", {"owner": owner, "expiresAt": time.time() + lease_seconds})
+        return True
+
+    def release(self, job_id: str, owner: str) -> None:
+        lease = self._lease(job_id)
+        if lease is not None and lease["owner"] == owner:
+            (self._dir(job_id) / "lease.json").unlink(missing_ok=True)
+
+    def read_input(self, job_id: str) -> bytes:
+        return (self._dir(job_id) / "input").read_bytes()
+
+    def write_result(self, job_id: str, svg_text: str) -> None:
+        path = self._dir(job_id) / "result.svg"
+        temp_path = path.with_name(f"result.{uuid.uuid4().hex}.tmp")
+        temp_path.write_text(svg_text, encoding="utf-8")
+        os.replace(temp_path, path)
+
+    def result_path(self, job_id: str) -> Path:
+        return self._dir(job_id) / "result.svg"
+
+    def _jobs(self) -> list[dict[str, Any]]:
+        if not self.root.is_dir():
+            return []
+        jobs = [self.get(path.name) for path in self.root.iterdir() if _JOB_ID.match(path.name)]
+        return [job for job in jobs if job is not None]
+
+    def pending_ids(self) -> list[str]:
+        pending = [job for job in self._jobs() if job["status"] not in FINISHED_STATUSES]
+        return [job["id"] for job in sorted(pending, key=lambda job: job["createdAt"])]
+
+    def claimable_ids(self) -> list[str]:
+        """Unfinished jobs nobody holds a live lease on."""
+        now = time.time()
+        return [job_id for job_id in self.pending_ids() if (self._lease(job_id) or {"expiresAt": 0})["expiresAt"] <= now]
+
+    def sweep(self, retention_seconds: float) -> int:
+        """Delete finished jobs older than ``retention_seconds``; returns how many were removed."""
+        cutoff = time.time() - retention_seconds
+        removed = 0
+        for job in self._jobs():
+            if job["status"] not in FINISHED_STATUSES:
+                continue
+            finished_at = datetime.fromisoformat(job["finishedAt"] or job["updatedAt"]).timestamp()
+            if finished_at < cutoff:
+                shutil.rmtree(self._dir(job["id"]), ignore_errors=True)
+                removed += 1
+        return removed
+
+
+ProgressFn = Callable[[float], None]
+TraceFn = Callable[[bytes, dict[str, Any], ProgressFn], Awaitable[tuple[str, dict[str, str]]]]
+
+
+class _ProgressWriter:
+    """Coalesces progress reports into background writes, so reporting never blocks the event loop."""
+
+    def __init__(self, store: TraceJobStore, job_id: str) -> None:
+        self.store = store
+        self.job_id = job_id
+        self._latest: Optional[float] = None
+        self._flushing: Optional[asyncio.Task[None]] = None
+
+    def report(self, fraction: float) -> None:
+        # Reserve the last few percent for writing the result.
+        self._latest = round(0.05 + 0.9 * min(1.0, fraction), 3)
+        if self._flushing is None or self._flushing.done():
+            self._flushing = asyncio.get_running_loop().create_task(self._flush())
+
+    async def _flush(self) -> None:
+        while self._latest is not None:
+            progress, self._latest = self._latest, None
+            await asyncio.to_thread(self.store.update, self.job_id, progress=progress)
+
+    async def close(self) -> None:
+        # A progress write still in flight must not land after the final status.
+        if self._flushing is not None:
+            await self._flushing
+
+
+class TraceJobRunner:
+    """Runs stored jobs as event-loop tasks; ``trace`` does the actual work."""
+
+    def __init__(
+        self,
+        store: TraceJobStore,
+        trace: TraceFn,
+        concurrency: Optional[int] = None,
+        lease_seconds: float = LEASE_SECONDS,
+    ) -> None:
+        self.store = store
+        self.trace = trace
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._active: set[str] = set()
+
+    def submit(self, job_id: str) -> None:
+        if job_id in self._active:
+            return
+        if self._slots is None:
+            # Default to one job per pool worker so queued jobs wait here rather
+            # than tripping the pool's admission limit.
+            self._slots = asyncio.Semaphore(max(1, self.concurrency or get_trace_pool().workers))
+        self._active.add(job_id)
+        task = asyncio.get_running_loop().create_task(self._run(job_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        task.add_done_callback(lambda _: self._active.discard(job_id))
+
+    async def resume(self) -> int:
+        """Submit unfinished jobs that no live process holds a lease on."""
+        claimable = await asyncio.to_thread(self.store.claimable_ids)
+        resumed = [job_id for job_id in claimable if job_id not in self._active]
+        for job_id in resumed:
+            self.submit(job_id)
+        return len(resumed)
+
+    async def _keep_lease(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await asyncio.to_thread(self.store.renew, job_id, self.owner, self.lease_seconds):
+                logger.warning("lost the lease on trace job %s", job_id)
+                return
+
+    async def _run(self, job_id: str) -> None:
+        assert self._slots is not None
+        async with self._slots:
+            if not await asyncio.to_thread(self.store.claim, job_id, self.owner, self.lease_seconds):
+                return
+            heartbeat = asyncio.get_running_loop().create_task(self._keep_lease(job_id))
+            try:
+                await self._run_claimed(job_id)
+            finally:
+                heartbeat.cancel()
+                await asyncio.to_thread(self.store.release, job_id, self.owner)
+
+    async def _run_claimed(self, job_id: str) -> None:
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is None or job["status"] in FINISHED_STATUSES:
+            return
+        await asyncio.to_thread(self.store.update, job_id, status="running", progress=0.05)
+        progress = _ProgressWriter(self.store, job_id)
+
+        async def finish(**changes: Any) -> None:
+            await progress.close()
+            await asyncio.to_thread(self.store.update, job_id, **changes)
+
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                image_bytes = await asyncio.to_thread(self.store.read_input, job_id)
+                svg_text, headers = await self.trace(image_bytes, job["params"], progress.report)
+            except HTTPException as exc:
+                if exc.status_code in RETRYABLE_STATUS_CODES and attempt < MAX_RETRIES:
+                    await asyncio.sleep(min(30, 2**attempt))
+                    continue
+                await finish(status="failed", error={"status": exc.status_code, "message": exc.detail})
+                return
+            except Exception as exc:
+                logger.exception("trace job %s failed", job_id)
+                await finish(status="failed", error={"status": 500, "message": str(exc) or "trace failed"})
+                return
+            break
+
+        await asyncio.to_thread(self.store.write_result, job_id, svg_text)
+        await finish(status="succeeded", progress=1.0, metadata=headers)
+
+    async def cancel(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        # Cancelled jobs stay queued/running on disk; their leases are released,
+        # so the next start (or another replica's sweeper) resumes them.
+        self._slots = None
+
+
+async def sweep_forever(runner: TraceJobRunner, retention_seconds: float, interval_seconds: float) -> None:
+    while True:
+        try:
+            removed = await asyncio.to_thread(runner.store.sweep, retention_seconds)
+            if removed:
+                logger.info("removed %s expired trace jobs", removed)
+            # Picks up jobs whose owner died without releasing its lease.
+            resumed = await runner.resume()
+            if resumed:
+                logger.info("resumed %s abandoned trace jobs", resumed)
+        except Exception:
+            logger.exception("trace job sweep failed")
+        await asyncio.sleep(interval_seconds)
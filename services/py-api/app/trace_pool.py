@@ -0,0 +1,258 @@
+"""Process pool for CPU-bound tracing work.
+
+vtracer holds the GIL and can run for a long time on large images, so every
+trace runs in one of a fixed set of long-lived worker processes. Admission is
+bounded: at most ``workers + queue_size`` jobs may be running or waiting, and
+anything beyond that is rejected immediately so the caller can back off. Each
+job has a deadline; a worker that misses it is killed and replaced, which is
+the only reliable way to stop a runaway trace.
+
+Cancelling a caller does not stop its trace: the worker keeps running it. So a
+job stays admitted, and keeps its shared slot, until its worker is actually
+free, not merely until nobody is waiting for the result any more.
+
+Work that fans out (batch items, tiles, background jobs) goes through
+``run_shared`` instead: it waits for one of ``workers`` slots shared by all
+fan-out callers, so a large batch of tiled images queues behind itself rather
+than being rejected or crowding out single requests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger("py-api")
+
+
+class TracePoolSaturated(Exception):
+    """Raised when the admission queue is full."""
+
+
+class TraceQueueTimeout(Exception):
+    """Raised when a job waited too long for a free worker."""
+
+
+class TraceTimeout(Exception):
+    """Raised when a job exceeded its deadline and its worker was killed."""
+
+
+class TraceWorkerCrashed(Exception):
+    """Raised when a worker process died while running a job."""
+
+
+def _worker_main(conn: Connection) -> None:
+    while True:
+        try:
+            fn, args = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        try:
+            conn.send(("ok", fn(*args)))
+        except Exception as exc:  # sent back to the parent and re-raised there
+            conn.send(("error", exc))
+
+
+class _Worker:
+    def __init__(self, context: Any) -> None:
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def run(self, fn: Callable[..., Any], args: tuple[Any, ...], timeout: float) -> Any:
+        self.conn.send((fn, args))
+        if not self.conn.poll(timeout):
+            raise TraceTimeout(f"trace exceeded {timeout:g}s")
+        status, value = self.conn.recv()
+        if status == "error":
+            raise value
+        return value
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+
+class TracePool:
+    def __init__(self, workers: int, queue_size: int, timeout_seconds: float, queue_timeout_seconds: float) -> None:
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.timeout_seconds = timeout_seconds
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: queue.Queue[_Worker] = queue.Queue()
+        self._spawned = 0
+        self._admitted = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        # One waiting thread per admitted job, so admission is the only queue.
+        self._threads = ThreadPoolExecutor(max_workers=self.workers + self.queue_size, thread_name_prefix="trace")
+        self._stats = {"completed": 0, "rejected": 0, "timeouts": 0, "crashes": 0, "queueTimeouts": 0}
+        # asyncio semaphores belong to one event loop, so keep one per loop.
+        self._shared_slots: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _acquire_worker(self) -> _Worker:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            spawn = self._spawned < self.workers
+            if spawn:
+                self._spawned += 1
+        if spawn:
+            try:
+                return _Worker(self._context)
+            except Exception:
+                with self._lock:
+                    self._spawned -= 1
+                raise
+        try:
+            return self._idle.get(timeout=self.queue_timeout_seconds)
+        except queue.Empty as exc:
+            with self._lock:
+                self._stats["queueTimeouts"] += 1
+            raise TraceQueueTimeout("no trace worker became available") from exc
+
+    def _discard_worker(self, worker: _Worker) -> None:
+        worker.kill()
+        with self._lock:
+            self._spawned -= 1
+
+    def _run_blocking(self, fn: Callable[..., Any], args: tuple[Any, ...], timeout: float) -> Any:
+        worker = self._acquire_worker()
+        try:
+            result = worker.run(fn, args, timeout)
+        except TraceTimeout:
+            self._discard_worker(worker)
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise
+        except (EOFError, OSError) as exc:
+            self._discard_worker(worker)
+            with self._lock:
+                self._stats["crashes"] += 1
+            raise TraceWorkerCrashed(str(exc) or "trace worker exited") from exc
+        except BaseException:
+            self._idle.put(worker)
+            raise
+
+        self._idle.put(worker)
+        with self._lock:
+            self._stats["completed"] += 1
+        return result
+
+    def _release_admission(self, _: Future[Any]) -> None:
+        with self._lock:
+            self._admitted -= 1
+
+    def _submit(self, fn: Callable[..., Any], args: tuple[Any, ...], timeout: Optional[float]) -> Future[Any]:
+        with self._lock:
+            if self._closed or self._admitted >= self.workers + self.queue_size:
+                self._stats["rejected"] += 1
+                raise TracePoolSaturated("trace queue is full")
+            self._admitted += 1
+        try:
+            future = self._threads.submit(
+                self._run_blocking, fn, args, self.timeout_seconds if timeout is None else timeout
+            )
+        except BaseException:
+            with self._lock:
+                self._admitted -= 1
+            raise
+        # Runs when the job finishes in its worker, or when it is cancelled before it started.
+        future.add_done_callback(self._release_admission)
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """Run ``fn(*args)`` in a worker process; ``fn`` must be importable by name."""
+        return await asyncio.wrap_future(self._submit(fn, args, timeout))
+
+    async def run_shared(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """``run`` for fan-out work: waits for a free shared slot, then runs ``fn(*args)``."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            slots = self._shared_slots.get(loop)
+            if slots is None:
+                slots = self._shared_slots[loop] = asyncio.Semaphore(self.workers)
+        await slots.acquire()
+        try:
+            future = self._submit(fn, args, timeout)
+        except BaseException:
+            slots.release()
+            raise
+
+        def release_slot(_: Future[Any]) -> None:
+            # The slot belongs to the worker, so it is freed when the job is, even if the caller is gone.
+            try:
+                loop.call_soon_threadsafe(slots.release)
+            except RuntimeError:
+                pass  # the loop is closed, and its semaphore with it
+
+        future.add_done_callback(release_slot)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                **self._stats,
+                "workers": self.workers,
+                "queueSize": self.queue_size,
+                "spawned": self._spawned,
+                "inFlight": self._admitted,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        while True:
+            try:
+                self._idle.get_nowait().kill()
+            except queue.Empty:
+                return
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+_pool: Optional[TracePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_trace_pool() -> TracePool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = int(_env_number("TRACE_WORKERS", len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1))
+            _pool = TracePool(
+                workers=workers,
+                queue_size=int(_env_number("TRACE_QUEUE_SIZE", workers * 2)),
+                timeout_seconds=_env_number("TRACE_TIMEOUT_SECONDS", 60),
+                queue_timeout_seconds=_env_number("TRACE_QUEUE_TIMEOUT_SECONDS", 30),
+            )
+        return _pool
+
+
+def shutdown_trace_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import io
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from app.compact import CompactOptions
+from app.preprocess import PreprocessOptions
+
+logger = logging.getLogger("py-api")
+
+
+TRACE_MODES = ("trace", "embed", "embed-optimized")
+
+
+@dataclass(frozen=True)
+class TraceOptions:
+    mode: str = "trace"
+    simplify: Optional[float] = None
+    target_width_mm: Optional[float] = None
+    target_height_mm: Optional[float] = None
+    dpi: Optional[float] = None
+    preprocess: Optional[PreprocessOptions] = None
+    # Only used by mode "embed-optimized": "color", "grayscale" or "1bit".
+    embed_color: str = "grayscale"
+    # Trace in tiles of this many pixels; None lets the size threshold decide.
+    tile_size: Optional[int] = None
+    # Also trace without preprocessing to report the path-count reduction.
+    compare: bool = False
+    # Post-process vtracer output; None returns it as traced.
+    compact: Optional[CompactOptions] = None
+
+
+def trace_with_vtracer(image_bytes: bytes, mode: str, simplify: Optional[float]) -> Optional[str]:
+    try:
+        import vtracer  # type: ignore
+    except Exception as exc:  # pragma: no cover - runtime fallback
+        logger.warning("vtracer unavailable, using embed fallback: %s", exc)
+        return None
+
+    kwargs = {
+        "mode": "spline" if mode == "trace" else "pixel",
+    }
+    if simplify is not None:
+        kwargs["corner_threshold"] = round(max(0.0, min(180.0, float(simplify) * 100.0)))
+
+    try:
+        if hasattr(vtracer, "convert_raw_image_to_svg"):
+            return vtracer.convert_raw_image_to_svg(image_bytes, **kwargs)
+        if hasattr(vtracer, "convert_image_to_svg_py"):
+            with io.BytesIO(image_bytes) as input_buffer:
+                return vtracer.convert_image_to_svg_py(input_buffer, **kwargs)
+    except Exception as exc:  # pragma: no cover - runtime fallback
+        logger.warning("vtracer failed, using embed fallback: %s", exc)
+        return None
+
+    logger.warning("No supported vtracer entrypoint found, using embed fallback")
+    return None
+
+
+def count_paths(svg_text: str) -> int:
+    return svg_text.count("<path")
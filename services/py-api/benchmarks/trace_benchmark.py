@@ -0,0 +1,274 @@
+"""Measure how the trace pipeline scales across image kinds, sizes and options.
+
+A deterministic corpus (line art, logos, photos and gradients, each at several
+resolutions) is generated in memory and every image is run through
+``main._trace_image`` for each mode and ``simplify`` value. vtracer is called
+in-process instead of through the worker pool, and each case runs in a fresh
+process so its peak RSS is its own.
+
+Without vtracer installed, trace-mode cases are reported as skipped and the
+embed modes still run. Reports are JSON with one entry per case id; pass
+``--baseline old.json`` to print the time and size ratio against an earlier run.
+
+Run from ``services/py-api``::
+
+    python -m benchmarks.trace_benchmark [--sizes 256 512 1024] [--output report.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.metadata
+import importlib.util
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+REPORT_VERSION = 1
+KINDS = ("line-art", "logo", "photo", "gradient")
+MODES = ("trace", "embed", "embed-optimized")
+DEFAULT_SIZES = (256, 512, 1024)
+DEFAULT_SIMPLIFY = (None, 0.2, 0.6)
+
+
+def _line_art(width: int, height: int, rng: np.random.Generator) -> Image.Image:
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    stroke = max(1, round(min(width, height) / 200))
+    for _ in range(40):
+        x0, x1 = sorted(rng.integers(0, width, 2))
+        y0, y1 = sorted(rng.integers(0, height, 2))
+        if rng.random() < 0.5:
+            draw.line((x0, y0, x1, y1), fill="black", width=stroke)
+        else:
+            draw.ellipse((x0, y0, x1, y1), outline="black", width=stroke)
+    return image
+
+
+def _logo(width: int, height: int, rng: np.random.Generator) -> Image.Image:
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    palette = [tuple(int(channel) for channel in rng.integers(0, 256, 3)) for _ in range(4)]
+    for index in range(6):
+        x0, x1 = sorted(rng.integers(0, width, 2))
+        y0, y1 = sorted(rng.integers(0, height, 2))
+        shape = (draw.rectangle, draw.ellipse, draw.rounded_rectangle)[index % 3]
+        shape((x0, y0, x1 + 1, y1 + 1), fill=palette[index % len(palette)])
+    return image
+
+
+def _photo(width: int, height: int, rng: np.random.Generator) -> Image.Image:
+    # Smooth low-frequency structure plus fine sensor-like noise.
+    coarse = Image.fromarray(rng.integers(0, 256, (max(2, height // 32), max(2, width // 32), 3), dtype=np.uint8))
+    base = np.asarray(coarse.resize((width, height), Image.Resampling.BICUBIC), dtype=np.float32)
+    noise = rng.normal(0, 12, (height, width, 3))
+    pixels = np.clip(base + noise, 0, 255).astype(np.uint8)
+    return Image.fromarray(pixels).filter(ImageFilter.GaussianBlur(0.8))
+
+
+def _gradient(width: int, height: int, rng: np.random.Generator) -> Image.Image:
+    xs = np.linspace(0, 1, width, dtype=np.float32)[None, :]
+    ys = np.linspace(0, 1, height, dtype=np.float32)[:, None]
+    radial = np.sqrt((xs - 0.5) ** 2 + (ys - 0.5) ** 2)
+    channels = [xs * np.ones_like(ys), ys * np.ones_like(xs), 1 - np.clip(radial * 1.4, 0, 1)]
+    return Image.fromarray((np.stack(channels, axis=-1) * 255).astype(np.uint8))
+
+
+GENERATORS: dict[str, Callable[[int, int, np.random.Generator], Image.Image]] = {
+    "line-art": _line_art,
+    "logo": _logo,
+    "photo": _photo,
+    "gradient": _gradient,
+}
+
+
+def build_corpus(sizes: list[int], kinds: list[str], seed: int = 316) -> list[dict[str, Any]]:
+    """Generate images whose long side is each of ``sizes`` (4:3 aspect; JPEG for photos, else PNG)."""
+    corpus = []
+    for kind in kinds:
+        for size in sizes:
+            width, height = size, max(1, size * 3 // 4)
+            image = GENERATORS[kind](width, height, np.random.default_rng(seed))
+            buffer = io.BytesIO()
+            # Photos are the one kind that usually arrives as JPEG.
+            image.save(buffer, format="JPEG" if kind == "photo" else "PNG", **({"quality": 90} if kind == "photo" else {}))
+            corpus.append({"name": f"{kind}-{size}", "kind": kind, "width": width, "height": height, "data": buffer.getvalue()})
+    return corpus
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_case(image_bytes: bytes, mode: str, simplify: Optional[float], repeat: int) -> dict[str, Any]:
+    """Trace one image ``repeat`` times in this process; returns the measurements."""
+    import main
+    from app.trace_cache import TraceCache
+    from app.tracing import trace_with_vtracer
+
+    async def trace_in_process(data: bytes, trace_mode: str, trace_simplify: Optional[float]) -> Optional[str]:
+        return trace_with_vtracer(data, trace_mode, trace_simplify)
+
+    main._trace_with_vtracer = trace_in_process
+    options = main._trace_options(mode, simplify, None, None, None, None, None, False)
+    samples = []
+    svg_text, headers = "", {}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for _ in range(repeat):
+            # A fresh, empty cache every time: cache hits would measure nothing.
+            main.trace_cache = TraceCache(Path(cache_dir) / str(len(samples)), 0, 0)
+            started = time.perf_counter()
+            svg_text, headers = asyncio.run(main._trace_image(image_bytes, options))
+            samples.append(time.perf_counter() - started)
+
+    fallback = mode == "trace" and "X-Trace-Paths" not in headers
+    return {
+        "wallMs": round(statistics.median(samples) * 1000, 1),
+        "minWallMs": round(min(samples) * 1000, 1),
+        "peakRssMb": _peak_rss_mb(),
+        "outputBytes": len(svg_text.encode("utf-8")),
+        "paths": svg_text.count("<path"),
+        "rawBytes": int(headers["X-Trace-Raw-Bytes"]) if "X-Trace-Raw-Bytes" in headers else None,
+        "rawPaths": int(headers["X-Trace-Raw-Paths"]) if "X-Trace-Raw-Paths" in headers else None,
+        "fallback": fallback,
+    }
+
+
+def _idle_rss_mb() -> float:
+    import main  # noqa: F401 - measure the cost of importing the service
+
+    return _peak_rss_mb()
+
+
+def _package_version(name: str) -> Optional[str]:
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def _fresh_process() -> ProcessPoolExecutor:
+    # One case per process so ru_maxrss is not inherited from earlier cases.
+    return ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn"), max_tasks_per_child=1)
+
+
+def _in_fresh_process(fn: Callable[..., Any], *args: Any) -> Any:
+    with _fresh_process() as executor:
+        return executor.submit(fn, *args).result()
+
+
+def run(sizes: list[int], kinds: list[str], modes: list[str], simplify_values: list[Optional[float]], repeat: int) -> dict[str, Any]:
+    has_vtracer = importlib.util.find_spec("vtracer") is not None
+    report: dict[str, Any] = {
+        "version": REPORT_VERSION,
+        "generatedAt": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "vtracer": _package_version("vtracer"),
+            "pillow": _package_version("pillow"),
+            "numpy": _package_version("numpy"),
+            "idleRssMb": _in_fresh_process(_idle_rss_mb),
+        },
+        "config": {"sizes": sizes, "kinds": kinds, "modes": modes, "simplify": simplify_values, "repeat": repeat},
+        "cases": {},
+    }
+    if not has_vtracer:
+        print("vtracer is not installed; trace-mode cases are skipped", file=sys.stderr)
+
+    for image in build_corpus(sizes, kinds):
+        for mode in modes:
+            # simplify only changes vtracer's behaviour.
+            for simplify in simplify_values if mode == "trace" else [None]:
+                case_id = f"{image['name']}/{mode}" + (f"/s{simplify:g}" if simplify is not None else "")
+                case: dict[str, Any] = {
+                    "kind": image["kind"],
+                    "width": image["width"],
+                    "height": image["height"],
+                    "inputBytes": len(image["data"]),
+                    "mode": mode,
+                    "simplify": simplify,
+                }
+                if mode == "trace" and not has_vtracer:
+                    case["status"] = "skipped"
+                else:
+                    try:
+                        case.update(_in_fresh_process(run_case, image["data"], mode, simplify, repeat), status="ok")
+                    except Exception as exc:
+                        case.update(status="error", error=f"{type(exc).__name__}: {exc}")
+                report["cases"][case_id] = case
+                print(f"{case_id}: {case.get('wallMs', case['status'])}", file=sys.stderr)
+    return report
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any]) -> list[dict[str, Any]]:
+    """Per-case ratios (current / baseline) for cases that succeeded in both reports."""
+    rows = []
+    for case_id, case in report["cases"].items():
+        previous = baseline.get("cases", {}).get(case_id)
+        if not previous or case.get("status") != "ok" or previous.get("status") != "ok":
+            continue
+        row: dict[str, Any] = {"case": case_id}
+        for metric in ("wallMs", "peakRssMb", "outputBytes", "paths"):
+            if previous.get(metric):
+                row[metric] = round(case[metric] / previous[metric], 3)
+        rows.append(row)
+    return rows
+
+
+def _parse_simplify(value: str) -> Optional[float]:
+    return None if value.lower() in ("none", "default") else float(value)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS))
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--simplify", type=_parse_simplify, nargs="+", default=list(DEFAULT_SIMPLIFY))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", type=Path, help="earlier report to compare against")
+    parser.add_argument("--save-corpus", type=Path, help="also write the generated images to this directory")
+    args = parser.parse_args(argv)
+
+    if args.save_corpus:
+        args.save_corpus.mkdir(parents=True, exist_ok=True)
+        for image in build_corpus(args.sizes, args.kinds):
+            suffix = "jpg" if image["kind"] == "photo" else "png"
+            (args.save_corpus / f"{image['name']}.{suffix}").write_bytes(image["data"])
+
+    report = run(args.sizes, args.kinds, args.modes, args.simplify, max(1, args.repeat))
+    if args.baseline:
+        report["comparison"] = {
+            "baseline": str(args.baseline),
+            "ratios": compare(report, json.loads(args.baseline.read_text(encoding="utf-8"))),
+        }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
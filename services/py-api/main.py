@@ -1,19 +1,73 @@
+import asyncio
 import base64
 import io
 import imghdr
+import json
 import logging
-from typing import Optional
+import os
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import replace
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
 
 from fastapi import FastAPI, File, Form, HTTPException, Query, UploadFile
-from fastapi.responses import Response
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from PIL import Image
 
 from app.routes.codegen import router as codegen_router
+from app.compact import COMPACT_ENABLED, MAX_PRECISION, CompactOptions, CompactResult, compact_svg
+from app.embed import EMBED_COLORS, optimize_raster, optimized_embed_svg
+from app.preprocess import PreprocessOptions, preprocess_image
+from app.resample import downscale_image, scaled_size, target_scale
+from app.trace_cache import storage_dir, trace_cache, trace_cache_key
+from app.trace_jobs import TraceJobRunner, TraceJobStore, sweep_forever
+from app.trace_pool import (
+    TracePoolSaturated,
+    TraceQueueTimeout,
+    TraceTimeout,
+    TraceWorkerCrashed,
+    get_trace_pool,
+    shutdown_trace_pool,
+)
+from app.tiling import DecodeBudget, Tile, TileCropper, plan_tiles, stitch_tiles
+from app.timing import mark_fallback, note_trace_failure, stage, timed_request, timing_stats
+from app.tracing import TRACE_MODES, TraceOptions, count_paths, trace_with_vtracer
 
 
-app = FastAPI(title="LT316 Python Trace Service")
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    resumed = await trace_jobs.resume()
+    if resumed:
+        logger.info("resumed %s unfinished trace jobs", resumed)
+    sweeper = asyncio.create_task(
+        sweep_forever(trace_jobs, TRACE_JOB_RETENTION_SECONDS, TRACE_JOB_SWEEP_INTERVAL_SECONDS)
+    )
+    yield
+    sweeper.cancel()
+    await trace_jobs.cancel()
+    shutdown_trace_pool()
+
+
+app = FastAPI(title="LT316 Python Trace Service", lifespan=lifespan)
 logger = logging.getLogger("py-api")
 
+TRACE_BATCH_MAX_FILES = int(os.environ.get("TRACE_BATCH_MAX_FILES", 50))
+# Images with more traced pixels than this are traced in tiles unless tile_size is given.
+TRACE_TILE_MIN_PIXELS = int(os.environ.get("TRACE_TILE_MIN_PIXELS", 16_000_000))
+TRACE_TILE_SIZE = int(os.environ.get("TRACE_TILE_SIZE", 1024))
+TRACE_TILE_OVERLAP = int(os.environ.get("TRACE_TILE_OVERLAP", 32))
+MIN_TILE_SIZE = 64
+# Every stage (resample, preprocess, tile cropping) decodes the whole image, so
+# larger uploads are refused before decoding instead of exhausting memory.
+TRACE_MAX_PIXELS = int(os.environ.get("TRACE_MAX_PIXELS", 120_000_000))
+# Tiled traces hold their decoded image while tiles are cropped; together they
+# may hold at most this many pixels, and further tiled jobs wait.
+TRACE_TILE_DECODE_BUDGET_PIXELS = int(os.environ.get("TRACE_TILE_DECODE_BUDGET_PIXELS", 2 * TRACE_MAX_PIXELS))
+tile_decode_budget = DecodeBudget(TRACE_TILE_DECODE_BUDGET_PIXELS)
+# Finished trace jobs (input, status and result) are deleted after this long.
+TRACE_JOB_RETENTION_SECONDS = float(os.environ.get("TRACE_JOB_RETENTION_SECONDS", 24 * 60 * 60))
+TRACE_JOB_SWEEP_INTERVAL_SECONDS = float(os.environ.get("TRACE_JOB_SWEEP_INTERVAL_SECONDS", 10 * 60))
+
 app.include_router(codegen_router)
 
 
@@ -41,31 +95,284 @@ def _detect_mime(image_bytes: bytes) -> str:
     return "application/octet-stream"
 
 
-def _trace_with_vtracer(image_bytes: bytes, mode: str, simplify: Optional[float]) -> Optional[str]:
+# Set inside batch items and tiles: their traces wait for a shared pool slot instead of
+# competing for admission, and the slot is held per vtracer call so fan-outs never nest.
+_fan_out: ContextVar[bool] = ContextVar("trace_fan_out", default=False)
+
+
+async def _trace_with_vtracer(image_bytes: bytes, mode: str, simplify: Optional[float]) -> Optional[str]:
+    pool = get_trace_pool()
+    run = pool.run_shared if _fan_out.get() else pool.run
     try:
-        import vtracer  # type: ignore
-    except Exception as exc:  # pragma: no cover - runtime fallback
-        logger.warning("vtracer unavailable, using embed fallback: %s", exc)
+        svg_text = await run(trace_with_vtracer, image_bytes, mode, simplify)
+    except TracePoolSaturated as exc:
+        raise HTTPException(status_code=429, detail="trace queue is full", headers={"Retry-After": "5"}) from exc
+    except TraceQueueTimeout as exc:
+        raise HTTPException(status_code=503, detail="no trace worker available", headers={"Retry-After": "10"}) from exc
+    except TraceTimeout as exc:
+        logger.warning("vtracer did not finish, using embed fallback: %s", exc)
+        note_trace_failure("timeout")
+        return None
+    except TraceWorkerCrashed as exc:
+        logger.warning("vtracer did not finish, using embed fallback: %s", exc)
+        note_trace_failure("worker_crashed")
         return None
+    if not svg_text:
+        # trace_with_vtracer has already logged whether vtracer is missing or failed.
+        note_trace_failure("vtracer_failed")
+    return svg_text
 
-    kwargs = {
-        "mode": "spline" if mode == "trace" else "pixel",
-    }
-    if simplify is not None:
-        kwargs["corner_threshold"] = max(0.0, min(180.0, float(simplify) * 100.0))
+
+@app.get("/trace/cache/stats")
+async def trace_cache_stats() -> dict[str, int]:
+    return trace_cache.stats()
+
+
+@app.get("/trace/pool/stats")
+async def trace_pool_stats() -> dict[str, int]:
+    return get_trace_pool().stats()
+
+
+@app.get("/trace/timing/stats")
+async def trace_timing_stats() -> dict[str, Any]:
+    return timing_stats.snapshot()
+
+
+async def _cached_trace(cache_key: str, produce: Callable[[], Awaitable[Optional[str]]]) -> tuple[Optional[str], str]:
+    """Trace through the result cache; ``produce`` only runs on a miss. Returns ``(svg, cache tier)``."""
+    with stage("cache"):
+        svg_text, cache_tier = await trace_cache.get_async(cache_key)
+    if svg_text is None:
+        svg_text = await produce()
+        # Only real traces are cached; an embed fallback should be retried once vtracer works.
+        if svg_text:
+            with stage("cache"):
+                await trace_cache.put_async(cache_key, svg_text)
+    return svg_text, cache_tier
+
+
+class _TileFailed(Exception):
+    """A tile could not be traced; tiles not yet running are cancelled."""
+
+
+async def _tiled_trace(
+    image_bytes: bytes, options: TraceOptions, tile_size: int, progress: Optional[Callable[[float], None]] = None
+) -> Optional[str]:
+    with Image.open(io.BytesIO(image_bytes)) as header:
+        width, height = header.size
+    async with tile_decode_budget.reserve(width * height):
+        return await _trace_tiles(image_bytes, width, height, options, tile_size, progress)
+
+
+async def _trace_tiles(
+    image_bytes: bytes,
+    width: int,
+    height: int,
+    options: TraceOptions,
+    tile_size: int,
+    progress: Optional[Callable[[float], None]],
+) -> Optional[str]:
+    cropper = await asyncio.to_thread(TileCropper, image_bytes)
+    tiles = plan_tiles(width, height, tile_size, TRACE_TILE_OVERLAP)
+    finished = 0
+
+    async def trace_tile(tile: Tile) -> tuple[Tile, str]:
+        nonlocal finished
+        _fan_out.set(True)
+        tile_bytes = await asyncio.to_thread(cropper.crop, tile)
+        svg_text = await _trace_with_vtracer(tile_bytes, options.mode, options.simplify)
+        if svg_text is None:
+            raise _TileFailed
+        finished += 1
+        if progress is not None:
+            progress(finished / len(tiles))
+        return tile, svg_text
 
     try:
-        if hasattr(vtracer, "convert_raw_image_to_svg"):
-            return vtracer.convert_raw_image_to_svg(image_bytes, **kwargs)
-        if hasattr(vtracer, "convert_image_to_svg_py"):
-            with io.BytesIO(image_bytes) as input_buffer:
-                return vtracer.convert_image_to_svg_py(input_buffer, **kwargs)
-    except Exception as exc:  # pragma: no cover - runtime fallback
-        logger.warning("vtracer failed, using embed fallback: %s", exc)
+        # The first failing tile cancels the tiles still waiting for a worker. Tiles
+        # already running finish in their workers, which stay admitted (and keep
+        # their shared slots) until then; only their results are discarded.
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(trace_tile(tile)) for tile in tiles]
+    except ExceptionGroup as errors:
+        _, others = errors.split(_TileFailed)
+        if others is not None:
+            # Surface a pool rejection (429/503) or crash as if the tiles had run inline.
+            raise others.exceptions[0] from None
         return None
+    traced = [task.result() for task in tasks]
+    return await asyncio.to_thread(stitch_tiles, width, height, traced)
+
+
+async def _trace_image(
+    image_bytes: bytes, options: TraceOptions, progress: Optional[Callable[[float], None]] = None
+) -> tuple[str, dict[str, str]]:
+    if not image_bytes:
+        raise HTTPException(status_code=400, detail="file is empty")
+
+    try:
+        with stage("decode"):
+            # Only the header is read here; pixels are decoded by later stages.
+            image = Image.open(io.BytesIO(image_bytes))
+            width, height = image.size
+    except Image.DecompressionBombError as exc:
+        raise HTTPException(status_code=413, detail="image has too many pixels") from exc
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail="invalid image") from exc
+    if width * height > TRACE_MAX_PIXELS:
+        raise HTTPException(
+            status_code=413, detail=f"image is {width}x{height}; at most {TRACE_MAX_PIXELS} pixels can be traced"
+        )
+
+    with stage("mime"):
+        mime_type = _detect_mime(image_bytes)
+    if mime_type not in {"image/png", "image/jpeg"}:
+        raise HTTPException(status_code=400, detail="file must be PNG or JPG")
+
+    svg_text: Optional[str] = None
+    headers: dict[str, str] = {}
+    if options.mode == "trace":
+        scale = target_scale(width, height, options.target_width_mm, options.target_height_mm, options.dpi)
+        traced_width, traced_height = scaled_size(width, height, scale) if scale < 1 else (width, height)
+        headers["X-Trace-Scale"] = f"{scale:.4f}"
+        headers["X-Trace-Source-Size"] = f"{width}x{height}"
+        headers["X-Trace-Size"] = f"{traced_width}x{traced_height}"
+
+        async def resampled() -> bytes:
+            if scale >= 1:
+                return image_bytes
+            with stage("resample"):
+                resized, _, _ = await asyncio.to_thread(downscale_image, image_bytes, scale)
+            return resized
+
+        async def preprocessed() -> bytes:
+            source = await resampled()
+            with stage("preprocess"):
+                return await asyncio.to_thread(preprocess_image, source, options.preprocess)
+
+        tile_size = options.tile_size
+        if tile_size is None and traced_width * traced_height > TRACE_TILE_MIN_PIXELS:
+            tile_size = TRACE_TILE_SIZE
+        if tile_size is not None:
+            headers["X-Trace-Tiles"] = str(len(plan_tiles(traced_width, traced_height, tile_size, TRACE_TILE_OVERLAP)))
 
-    logger.warning("No supported vtracer entrypoint found, using embed fallback")
-    return None
+        compaction: list[CompactResult] = []
+
+        def producer(
+            prepare: Callable[[], Awaitable[bytes]], report: Optional[list[CompactResult]] = None
+        ) -> Callable[[], Awaitable[Optional[str]]]:
+            async def produce() -> Optional[str]:
+                prepared = await prepare()
+                with stage("vtracer"):
+                    if tile_size is not None:
+                        traced = await _tiled_trace(prepared, options, tile_size, progress)
+                    else:
+                        traced = await _trace_with_vtracer(prepared, options.mode, options.simplify)
+                if not traced or options.compact is None:
+                    return traced
+                with stage("compact"):
+                    result = await asyncio.to_thread(compact_svg, traced, options.compact)
+                if report is not None:
+                    report.append(result)
+                return result.svg
+
+            return produce
+
+        base_key = (image_bytes, options.mode, options.simplify, traced_width, traced_height, f"tile={tile_size}")
+        if options.compact is not None:
+            base_key += (options.compact.cache_token(),)
+        if options.preprocess is None:
+            svg_text, headers["X-Trace-Cache"] = await _cached_trace(
+                trace_cache_key(*base_key), producer(resampled, compaction)
+            )
+        else:
+            svg_text, headers["X-Trace-Cache"] = await _cached_trace(
+                trace_cache_key(*base_key, options.preprocess.cache_token()), producer(preprocessed, compaction)
+            )
+            headers["X-Trace-Preprocess"] = options.preprocess.cache_token()
+            if svg_text and options.compare:
+                baseline, _ = await _cached_trace(trace_cache_key(*base_key), producer(resampled))
+                if baseline:
+                    baseline_paths = count_paths(baseline)
+                    headers["X-Trace-Paths-Baseline"] = str(baseline_paths)
+                    if baseline_paths:
+                        reduction = 1 - count_paths(svg_text) / baseline_paths
+                        headers["X-Trace-Path-Reduction"] = f"{reduction:.4f}"
+        if svg_text:
+            headers["X-Trace-Paths"] = str(count_paths(svg_text))
+            headers["X-Trace-Bytes"] = str(len(svg_text.encode("utf-8")))
+        # Compaction statistics are only known when the trace actually ran.
+        if compaction:
+            headers["X-Trace-Raw-Bytes"] = str(compaction[0].input_bytes)
+            headers["X-Trace-Raw-Paths"] = str(compaction[0].input_paths)
+            headers["X-Trace-Compact-Size-Reduction"] = f"{compaction[0].size_reduction:.4f}"
+            headers["X-Trace-Compact-Path-Reduction"] = f"{compaction[0].path_reduction:.4f}"
+
+    elif options.mode == "embed-optimized":
+        scale = target_scale(width, height, options.target_width_mm, options.target_height_mm, options.dpi)
+        with stage("embed"):
+            raster = await asyncio.to_thread(optimize_raster, image_bytes, scale, options.embed_color)
+            svg_text = optimized_embed_svg(raster, options.target_width_mm, options.target_height_mm)
+        headers["X-Trace-Scale"] = f"{scale:.4f}"
+        headers["X-Embed-Original-Bytes"] = str(raster.original_bytes)
+        headers["X-Embed-Bytes"] = str(len(raster.data))
+        headers["X-Embed-Format"] = raster.mime_type
+
+    if not svg_text:
+        if options.mode == "trace":
+            headers["X-Trace-Fallback"] = mark_fallback()
+        with stage("embed"):
+            svg_text = _embed_image_svg(image_bytes, mime_type, width, height)
+
+    return svg_text, headers
+
+
+def _trace_options(
+    mode: str,
+    simplify: Optional[float],
+    target_width_mm: Optional[float],
+    target_height_mm: Optional[float],
+    dpi: Optional[float],
+    preprocess: Optional[str],
+    quantize_levels: Optional[int],
+    compare: bool,
+    embed_color: Optional[str] = None,
+    tile_size: Optional[int] = None,
+    compact: Optional[bool] = None,
+    precision: Optional[int] = None,
+    min_area: Optional[float] = None,
+) -> TraceOptions:
+    if mode not in TRACE_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of: {', '.join(TRACE_MODES)}")
+    if embed_color is not None and embed_color not in EMBED_COLORS:
+        raise HTTPException(status_code=400, detail=f"embed_color must be one of: {', '.join(EMBED_COLORS)}")
+    try:
+        preprocess_options = PreprocessOptions.parse(preprocess, quantize_levels)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if precision is not None and not 0 <= precision <= MAX_PRECISION:
+        raise HTTPException(status_code=400, detail=f"precision must be between 0 and {MAX_PRECISION}")
+    if min_area is not None and min_area < 0:
+        raise HTTPException(status_code=400, detail="min_area must not be negative")
+    compact_options = None
+    if compact if compact is not None else COMPACT_ENABLED:
+        compact_options = CompactOptions()
+        if precision is not None:
+            compact_options = replace(compact_options, precision=precision)
+        if min_area is not None:
+            compact_options = replace(compact_options, min_area=min_area)
+    return TraceOptions(
+        mode=mode,
+        simplify=simplify,
+        target_width_mm=target_width_mm,
+        target_height_mm=target_height_mm,
+        dpi=dpi,
+        preprocess=preprocess_options,
+        compare=compare,
+        embed_color=embed_color or "grayscale",
+        tile_size=tile_size,
+        compact=compact_options,
+    )
 
 
 @app.post("/trace")
@@ -73,34 +380,209 @@ async def trace(
     file: UploadFile = File(...),
     mode: Optional[str] = Form(default=None),
     simplify: Optional[float] = Form(default=None),
+    target_width_mm: Optional[float] = Form(default=None, gt=0),
+    target_height_mm: Optional[float] = Form(default=None, gt=0),
+    dpi: Optional[float] = Form(default=None, gt=0),
+    preprocess: Optional[str] = Form(default=None),
+    quantize_levels: Optional[int] = Form(default=None),
+    compare: Optional[bool] = Form(default=None),
+    embed_color: Optional[str] = Form(default=None),
+    tile_size: Optional[int] = Form(default=None, ge=MIN_TILE_SIZE),
+    compact: Optional[bool] = Form(default=None),
+    precision: Optional[int] = Form(default=None),
+    min_area: Optional[float] = Form(default=None),
     mode_q: Optional[str] = Query(default=None, alias="mode"),
     simplify_q: Optional[float] = Query(default=None, alias="simplify"),
+    target_width_mm_q: Optional[float] = Query(default=None, alias="target_width_mm", gt=0),
+    target_height_mm_q: Optional[float] = Query(default=None, alias="target_height_mm", gt=0),
+    dpi_q: Optional[float] = Query(default=None, alias="dpi", gt=0),
+    preprocess_q: Optional[str] = Query(default=None, alias="preprocess"),
+    quantize_levels_q: Optional[int] = Query(default=None, alias="quantize_levels"),
+    compare_q: Optional[bool] = Query(default=None, alias="compare"),
+    embed_color_q: Optional[str] = Query(default=None, alias="embed_color"),
+    tile_size_q: Optional[int] = Query(default=None, alias="tile_size", ge=MIN_TILE_SIZE),
+    compact_q: Optional[bool] = Query(default=None, alias="compact"),
+    precision_q: Optional[int] = Query(default=None, alias="precision"),
+    min_area_q: Optional[float] = Query(default=None, alias="min_area"),
 ) -> Response:
-    resolved_mode = mode or mode_q or "trace"
-    resolved_simplify = simplify if simplify is not None else simplify_q
+    options = _trace_options(
+        mode=mode or mode_q or "trace",
+        simplify=simplify if simplify is not None else simplify_q,
+        target_width_mm=target_width_mm if target_width_mm is not None else target_width_mm_q,
+        target_height_mm=target_height_mm if target_height_mm is not None else target_height_mm_q,
+        dpi=dpi if dpi is not None else dpi_q,
+        preprocess=preprocess or preprocess_q,
+        quantize_levels=quantize_levels if quantize_levels is not None else quantize_levels_q,
+        compare=bool(compare if compare is not None else compare_q),
+        embed_color=embed_color or embed_color_q,
+        tile_size=tile_size if tile_size is not None else tile_size_q,
+        compact=compact if compact is not None else compact_q,
+        precision=precision if precision is not None else precision_q,
+        min_area=min_area if min_area is not None else min_area_q,
+    )
+
+    with timed_request() as timer:
+        with stage("read"):
+            image_bytes = await file.read()
+        svg_text, headers = await _trace_image(image_bytes, options)
+        timer.finish()
+    headers["Server-Timing"] = timer.server_timing()
+    return Response(content=svg_text, media_type="image/svg+xml", headers=headers)
+
+
+async def _trace_batch_lines(uploads: list[tuple[str, bytes]], options: TraceOptions) -> AsyncIterator[bytes]:
+    async def trace_one(index: int, filename: str, image_bytes: bytes) -> dict[str, Any]:
+        result: dict[str, Any] = {"index": index, "filename": filename}
+        # Each vtracer call waits for a shared pool slot, so a large batch queues
+        # behind itself instead of tripping the pool's admission limit.
+        _fan_out.set(True)
+        try:
+            with timed_request():
+                svg_text, headers = await _trace_image(image_bytes, options)
+        except HTTPException as exc:
+            return {**result, "ok": False, "status": exc.status_code, "error": exc.detail}
+        except Exception as exc:
+            logger.exception("batch trace of %s failed", filename)
+            return {**result, "ok": False, "status": 500, "error": str(exc) or "trace failed"}
+        return {
+            **result,
+            "ok": True,
+            "svg": svg_text,
+            "scale": float(headers.get("X-Trace-Scale", 1)),
+            "cache": headers.get("X-Trace-Cache"),
+        }
+
+    tasks = [asyncio.create_task(trace_one(index, filename, data)) for index, (filename, data) in enumerate(uploads)]
+    succeeded = 0
+    try:
+        for finished in asyncio.as_completed(tasks):
+            line = await finished
+            succeeded += 1 if line["ok"] else 0
+            yield (json.dumps(line) + "\n").encode("utf-8")
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    summary = {"done": True, "total": len(uploads), "succeeded": succeeded, "failed": len(uploads) - succeeded}
+    yield (json.dumps(summary) + "\n").encode("utf-8")
 
-    if resolved_mode not in {"trace", "embed"}:
-        raise HTTPException(status_code=400, detail="mode must be 'trace' or 'embed'")
 
+@app.post("/trace/batch")
+async def trace_batch(
+    files: list[UploadFile] = File(...),
+    mode: str = Form(default="trace"),
+    simplify: Optional[float] = Form(default=None),
+    target_width_mm: Optional[float] = Form(default=None, gt=0),
+    target_height_mm: Optional[float] = Form(default=None, gt=0),
+    dpi: Optional[float] = Form(default=None, gt=0),
+    preprocess: Optional[str] = Form(default=None),
+    quantize_levels: Optional[int] = Form(default=None),
+    embed_color: Optional[str] = Form(default=None),
+    tile_size: Optional[int] = Form(default=None, ge=MIN_TILE_SIZE),
+    compact: Optional[bool] = Form(default=None),
+    precision: Optional[int] = Form(default=None),
+    min_area: Optional[float] = Form(default=None),
+) -> StreamingResponse:
+    options = _trace_options(
+        mode,
+        simplify,
+        target_width_mm,
+        target_height_mm,
+        dpi,
+        preprocess,
+        quantize_levels,
+        False,
+        embed_color,
+        tile_size,
+        compact,
+        precision,
+        min_area,
+    )
+    if len(files) > TRACE_BATCH_MAX_FILES:
+        raise HTTPException(status_code=413, detail=f"at most {TRACE_BATCH_MAX_FILES} files per batch")
+
+    # Read every upload before streaming starts; the spooled files are closed
+    # once this handler returns.
+    uploads = [(upload.filename or f"file-{index}", await upload.read()) for index, upload in enumerate(files)]
+    return StreamingResponse(_trace_batch_lines(uploads, options), media_type="application/x-ndjson")
+
+
+async def _run_trace_job(
+    image_bytes: bytes, params: dict[str, Any], progress: Callable[[float], None]
+) -> tuple[str, dict[str, str]]:
+    with timed_request():
+        return await _trace_image(image_bytes, _trace_options(**params), progress)
+
+
+trace_jobs = TraceJobRunner(
+    TraceJobStore(storage_dir() / "trace-jobs"),
+    _run_trace_job,
+    int(os.environ["TRACE_JOB_CONCURRENCY"]) if os.environ.get("TRACE_JOB_CONCURRENCY") else None,
+)
+
+
+def _job_status(job: dict[str, Any]) -> dict[str, Any]:
+    status = {key: value for key, value in job.items() if key != "params"}
+    status["resultUrl"] = f"/trace/jobs/{job['id']}/result" if job["status"] == "succeeded" else None
+    return status
+
+
+@app.post("/trace/jobs", status_code=202)
+async def create_trace_job(
+    file: UploadFile = File(...),
+    mode: str = Form(default="trace"),
+    simplify: Optional[float] = Form(default=None),
+    target_width_mm: Optional[float] = Form(default=None, gt=0),
+    target_height_mm: Optional[float] = Form(default=None, gt=0),
+    dpi: Optional[float] = Form(default=None, gt=0),
+    preprocess: Optional[str] = Form(default=None),
+    quantize_levels: Optional[int] = Form(default=None),
+    compare: bool = Form(default=False),
+    embed_color: Optional[str] = Form(default=None),
+    tile_size: Optional[int] = Form(default=None, ge=MIN_TILE_SIZE),
+    compact: Optional[bool] = Form(default=None),
+    precision: Optional[int] = Form(default=None),
+    min_area: Optional[float] = Form(default=None),
+) -> JSONResponse:
+    params = {
+        "mode": mode,
+        "simplify": simplify,
+        "target_width_mm": target_width_mm,
+        "target_height_mm": target_height_mm,
+        "dpi": dpi,
+        "preprocess": preprocess,
+        "quantize_levels": quantize_levels,
+        "compare": compare,
+        "embed_color": embed_color,
+        "tile_size": tile_size,
+        "compact": compact,
+        "precision": precision,
+        "min_area": min_area,
+    }
+    # Reject bad options now rather than as a failed job.
+    _trace_options(**params)
     image_bytes = await file.read()
     if not image_bytes:
         raise HTTPException(status_code=400, detail="file is empty")
 
-    try:
-        image = Image.open(io.BytesIO(image_bytes))
-        width, height = image.size
-    except Exception as exc:
-        raise HTTPException(status_code=400, detail="invalid image") from exc
+    job = await asyncio.to_thread(trace_jobs.store.create, image_bytes, file.filename or "upload", params)
+    trace_jobs.submit(job["id"])
+    return JSONResponse(_job_status(job), status_code=202, headers={"Location": f"/trace/jobs/{job['id']}"})
 
-    mime_type = _detect_mime(image_bytes)
-    if mime_type not in {"image/png", "image/jpeg"}:
-        raise HTTPException(status_code=400, detail="file must be PNG or JPG")
 
-    svg_text: Optional[str] = None
-    if resolved_mode == "trace":
-        svg_text = _trace_with_vtracer(image_bytes, resolved_mode, resolved_simplify)
+@app.get("/trace/jobs/{job_id}")
+async def trace_job_status(job_id: str) -> dict[str, Any]:
+    job = await asyncio.to_thread(trace_jobs.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="trace job not found")
+    return _job_status(job)
 
-    if not svg_text:
-        svg_text = _embed_image_svg(image_bytes, mime_type, width, height)
 
-    return Response(content=svg_text, media_type="image/svg+xml")
+@app.get("/trace/jobs/{job_id}/result")
+async def trace_job_result(job_id: str) -> FileResponse:
+    job = await asyncio.to_thread(trace_jobs.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="trace job not found")
+    if job["status"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"trace job is {job['status']}")
+    return FileResponse(trace_jobs.store.result_path(job_id), media_type="image/svg+xml", headers=job["metadata"] or {})
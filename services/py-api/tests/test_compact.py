@@ -0,0 +1,121 @@
+import io
+import xml.etree.ElementTree as ET
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import main
+from app.compact import CompactOptions, _parse_path, compact_svg
+from app.tiling import SVG_NS
+from app.trace_cache import TraceCache
+
+# Shaped like vtracer output: full-precision numbers, one translate per path,
+# cubic curves for straight edges.
+BACKGROUND = (
+    '<path d="M0 0 C39.6 0 79.2 0 120 0 C120 26.400000000000002 120 52.800000000000004 120 80 '
+    'C80.4 80 40.8 80 0 80 C0 53.599999999999994 0 27.199999999999996 0 0 Z " fill="#FEFEFE" transform="translate(0,0)"/>'
+)
+BLOB = (
+    '<path d="M0 0 C6.6457187839548055 4.766245634333579 11.669119307932334 10.399973229452833 13.09765625 18.73828125 '
+    'C1.5527151816380638 22.53791938166719 -5.544488223048084 16.10407202396083 -14.8046875 16.84375 '
+    'C-12 8 -6 3 0 0 Z M-4 6 L2 12 L-6 12 Z" fill="#FF0000" transform="translate(58.26171875,14.359375)"/>'
+)
+
+
+def _svg(*paths: str) -> str:
+    return f'<?xml version="1.0" encoding="UTF-8"?>\n<svg version="1.1" xmlns="{SVG_NS}" width="120" height="80">\n' + "\n".join(paths) + "\n</svg>"
+
+
+def _square(x: float, y: float, size: float, fill: str) -> str:
+    return f'<path d="M0 0 L{size} 0 L{size} {size} L0 {size} Z " fill="{fill}" transform="translate({x},{y})"/>'
+
+
+def _paths(svg_text: str) -> list[ET.Element]:
+    return list(ET.fromstring(svg_text).iter(f"{{{SVG_NS}}}path"))
+
+
+def _on_curve_points(d: str, dx: float = 0, dy: float = 0) -> list[tuple[int, int]]:
+    return [points[-1] for command, points in _parse_path(d, dx, dy, 0.01) if points]
+
+
+def test_compaction_preserves_geometry_at_the_requested_precision():
+    source = _svg(BACKGROUND, BLOB)
+    result = compact_svg(source, CompactOptions(precision=2, min_area=0))
+
+    original, compacted = _paths(source), _paths(result.svg)
+    assert len(compacted) == 2
+    translations = [(0, 0), (58.26171875, 14.359375)]
+    for before, after, (dx, dy) in zip(original, compacted, translations):
+        assert "transform" not in after.attrib
+        assert after.get("fill") == before.get("fill")
+        assert after.get("d")[0] == "m" and not any(letter in after.get("d") for letter in "MLCZ")
+        # Straight cubic edges collapse to lines, so compare the vertices that survive.
+        assert set(_on_curve_points(after.get("d"))) <= set(_on_curve_points(before.get("d"), dx, dy))
+
+    assert compacted[0].get("d") == "m0 0h120v80h-120z"
+    assert result.output_bytes < result.input_bytes / 2
+    assert result.size_reduction > 0.5
+
+
+def test_small_paths_are_dropped_and_adjacent_same_fill_paths_merged():
+    source = _svg(
+        _square(0, 0, 20, "#000000"),
+        _square(30, 0, 20, "#000000"),
+        _square(60, 0, 0.5, "#000000"),  # speck
+        _square(0, 30, 20, "#FF0000"),
+        _square(30, 30, 20, "#000000"),
+    )
+    result = compact_svg(source, CompactOptions(min_area=1.0))
+
+    assert [path.get("fill") for path in _paths(result.svg)] == ["#000000", "#FF0000", "#000000"]
+    assert _paths(result.svg)[0].get("d") == "m0 0h20v20h-20zm30 0h20v20h-20z"
+    assert (result.input_paths, result.output_paths, result.dropped_paths) == (5, 3, 1)
+    assert result.path_reduction == 0.4
+
+
+def test_overlapping_same_fill_paths_are_not_merged():
+    # A ring with a dot in its hole: merged into one evenodd path, the ring's inner
+    # subpath and the dot would cancel out and the dot would disappear.
+    ring = '<path d="M0 0 L40 0 L40 40 L0 40 Z M10 10 L10 30 L30 30 L30 10 Z" fill="#000000" fill-rule="evenodd"/>'
+    dot = '<path d="M15 15 L25 15 L25 25 L15 25 Z" fill="#000000" fill-rule="evenodd"/>'
+    beside = '<path d="M50 0 L60 0 L60 10 L50 10 Z" fill="#000000" fill-rule="evenodd"/>'
+    result = compact_svg(_svg(ring, dot, beside), CompactOptions(min_area=0))
+
+    assert [path.get("d") for path in _paths(result.svg)] == [
+        "m0 0h40v40h-40zm10 10v20h20v-20z",
+        "m15 15h10v10h-10zm35-15h10v10h-10z",
+    ]
+
+
+def test_unsupported_or_unparseable_input_is_left_alone():
+    arc = '<path d="M0 0 A5 5 0 0 1 10 10 Z" fill="#000"/>'
+    result = compact_svg(_svg(arc, _square(1.23456, 0, 20, "#000000")), CompactOptions())
+    assert [path.get("d") for path in _paths(result.svg)] == ["M0 0 A5 5 0 0 1 10 10 Z", "m1.23 0h20v20h-20z"]
+
+    assert compact_svg("<svg>traced</svg>", CompactOptions()).svg == "<svg>traced</svg>"
+    assert compact_svg("not xml", CompactOptions()).svg == "not xml"
+
+
+def test_trace_reports_compaction(tmp_path, monkeypatch):
+    async def fake_trace(image_bytes, mode, simplify):
+        return _svg(BACKGROUND, BLOB)
+
+    monkeypatch.setattr(main, "_trace_with_vtracer", fake_trace)
+    monkeypatch.setattr(main, "trace_cache", TraceCache(tmp_path, 1024 * 1024, 1024 * 1024))
+    buffer = io.BytesIO()
+    Image.new("RGB", (120, 80)).save(buffer, format="PNG")
+    client = TestClient(main.app)
+
+    compacted = client.post("/trace", files={"file": ("a.png", buffer.getvalue(), "image/png")}, data={"compact": "true", "precision": "1"})
+    assert compacted.status_code == 200
+    assert compacted.headers["x-trace-raw-paths"] == "2"
+    assert int(compacted.headers["x-trace-bytes"]) < int(compacted.headers["x-trace-raw-bytes"])
+    assert float(compacted.headers["x-trace-compact-size-reduction"]) > 0.5
+    assert "transform" not in compacted.text
+
+    raw = client.post("/trace", files={"file": ("a.png", buffer.getvalue(), "image/png")})
+    assert raw.text == _svg(BACKGROUND, BLOB)
+    assert "x-trace-raw-bytes" not in raw.headers
+
+    invalid = client.post("/trace", files={"file": ("a.png", buffer.getvalue(), "image/png")}, data={"compact": "true", "precision": "9"})
+    assert invalid.status_code == 400
@@ -0,0 +1,60 @@
+import io
+
+import numpy as np
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import main
+from app.embed import optimize_raster
+
+
+def _photo_bytes(size=(2400, 1600)) -> bytes:
+    rng = np.random.default_rng(3)
+    gradient = np.linspace(0, 255, size[0], dtype=np.float64)[None, :, None] * np.ones((size[1], 1, 3))
+    pixels = (gradient + rng.normal(0, 6, gradient.shape)).clip(0, 255).astype(np.uint8)
+    image = Image.fromarray(pixels)
+    exif = Image.Exif()
+    exif[0x010F] = "PhoneMaker"
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=95, exif=exif.tobytes(), icc_profile=b"\0" * 512)
+    return buffer.getvalue()
+
+
+def test_optimize_resamples_and_strips_metadata():
+    raster = optimize_raster(_photo_bytes(), 0.25, "grayscale")
+
+    assert (raster.width, raster.height) == (600, 400)
+    assert len(raster.data) < raster.original_bytes / 4
+    with Image.open(io.BytesIO(raster.data)) as image:
+        assert image.mode == "L"
+        assert "exif" not in image.info and "icc_profile" not in image.info
+
+
+def test_one_bit_is_always_png():
+    raster = optimize_raster(_photo_bytes((400, 300)), 1.0, "1bit")
+
+    assert raster.mime_type == "image/png"
+    with Image.open(io.BytesIO(raster.data)) as image:
+        assert image.mode == "1"
+
+
+def test_embed_optimized_mode_reports_sizes():
+    response = TestClient(main.app).post(
+        "/trace",
+        files={"file": ("photo.jpg", _photo_bytes(), "image/jpeg")},
+        data={"mode": "embed-optimized", "target_width_mm": "50.8", "dpi": "300"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["x-trace-scale"] == "0.2500"
+    assert int(response.headers["x-embed-bytes"]) < int(response.headers["x-embed-original-bytes"])
+    assert 'width="50.800mm" height="33.867mm" viewBox="0 0 600 400"' in response.text
+
+
+def test_embed_color_is_validated():
+    response = TestClient(main.app).post(
+        "/trace",
+        files={"file": ("photo.jpg", _photo_bytes((40, 30)), "image/jpeg")},
+        data={"mode": "embed-optimized", "embed_color": "sepia"},
+    )
+    assert response.status_code == 400
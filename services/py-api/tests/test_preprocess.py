@@ -0,0 +1,76 @@
+import io
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import main
+from app.preprocess import PreprocessOptions, adaptive_threshold, preprocess_image, quantize_levels
+from app.trace_cache import TraceCache
+
+
+def _noisy_logo_bytes() -> bytes:
+    rng = np.random.default_rng(7)
+    canvas = np.full((120, 160, 3), 235, dtype=np.float64)
+    canvas[30:90, 40:120] = 20
+    canvas += rng.normal(0, 18, canvas.shape)
+    buffer = io.BytesIO()
+    Image.fromarray(canvas.clip(0, 255).astype(np.uint8)).save(buffer, format="JPEG", quality=60)
+    return buffer.getvalue()
+
+
+def test_parse_validates_stages():
+    assert PreprocessOptions.parse(None) is None
+    assert PreprocessOptions.parse("Grayscale, despeckle").stages == {"grayscale", "despeckle"}
+    with pytest.raises(ValueError):
+        PreprocessOptions.parse("sharpen")
+    with pytest.raises(ValueError):
+        PreprocessOptions.parse("threshold,quantize")
+
+
+def test_adaptive_threshold_follows_local_brightness():
+    gradient = np.tile(np.linspace(40, 220, 64), (32, 1))
+    gradient[10:20, 10:50] -= 35
+
+    binary = adaptive_threshold(gradient, block=15, offset=8)
+
+    assert set(np.unique(binary)) == {0, 255}
+    assert binary[15, 30] == 0
+    assert binary[2, 5] == binary[2, 60] == 255
+
+
+def test_quantize_snaps_to_levels():
+    values = quantize_levels(np.arange(256, dtype=np.uint8), 3)
+    assert set(np.unique(values)) == {0, 128, 255}
+
+
+def test_threshold_and_despeckle_produce_clean_binary_image():
+    options = PreprocessOptions.parse("denoise,threshold,despeckle")
+    with Image.open(io.BytesIO(preprocess_image(_noisy_logo_bytes(), options))) as image:
+        pixels = np.asarray(image)
+
+    assert image.mode == "L"
+    assert set(np.unique(pixels)) <= {0, 255}
+
+
+def test_trace_reports_path_reduction(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "trace_cache", TraceCache(tmp_path, 1 << 20, 1 << 22))
+
+    response = TestClient(main.app).post(
+        "/trace",
+        files={"file": ("logo.jpg", _noisy_logo_bytes(), "image/jpeg")},
+        data={"preprocess": "grayscale,denoise,quantize,despeckle", "quantize_levels": "2", "compare": "true"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["x-trace-preprocess"] == "denoise+despeckle+grayscale+quantize/2"
+    assert int(response.headers["x-trace-paths"]) < int(response.headers["x-trace-paths-baseline"])
+    assert float(response.headers["x-trace-path-reduction"]) > 0.5
+
+
+def test_unknown_stage_is_rejected():
+    response = TestClient(main.app).post(
+        "/trace", files={"file": ("logo.jpg", _noisy_logo_bytes(), "image/jpeg")}, data={"preprocess": "blur"}
+    )
+    assert response.status_code == 400
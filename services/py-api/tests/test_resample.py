@@ -0,0 +1,59 @@
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import main
+from app.resample import downscale_image, target_scale
+from app.trace_cache import TraceCache
+
+
+def _jpeg_bytes(size=(6000, 4000)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (30, 60, 90)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def test_target_scale_uses_the_tighter_dimension():
+    # 40mm at 254 dpi is 400px.
+    assert target_scale(4000, 2000, 40, None, 254) == pytest.approx(0.1)
+    assert target_scale(4000, 2000, 40, 10, 254) == pytest.approx(0.05)
+
+
+def test_target_scale_never_upscales_or_applies_without_target():
+    assert target_scale(100, 100, 40, None, 254) == 1.0
+    assert target_scale(6000, 4000, None, None, 254) == 1.0
+
+
+def test_downscale_jpeg_to_effective_resolution():
+    resized, width, height = downscale_image(_jpeg_bytes(), 0.0789)
+
+    assert (width, height) == (474, 316)
+    with Image.open(io.BytesIO(resized)) as image:
+        assert image.format == "PNG"
+        assert image.size == (474, 316)
+
+
+def test_trace_downscales_before_tracing_and_reports_scale(tmp_path, monkeypatch):
+    traced_sizes = []
+
+    async def fake_trace(image_bytes, mode, simplify):
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            traced_sizes.append(image.size)
+        return "<svg/>"
+
+    monkeypatch.setattr(main, "_trace_with_vtracer", fake_trace)
+    monkeypatch.setattr(main, "trace_cache", TraceCache(tmp_path, 1024, 4096))
+
+    response = TestClient(main.app).post(
+        "/trace",
+        files={"file": ("photo.jpg", _jpeg_bytes(), "image/jpeg")},
+        data={"target_width_mm": "40", "dpi": "300"},
+    )
+
+    assert response.status_code == 200
+    assert traced_sizes == [(473, 315)]
+    assert response.headers["x-trace-scale"] == "0.0787"
+    assert response.headers["x-trace-source-size"] == "6000x4000"
+    assert response.headers["x-trace-size"] == "473x315"
@@ -0,0 +1,167 @@
+import asyncio
+import io
+import json
+import threading
+import time
+import xml.etree.ElementTree as ET
+
+from fastapi.testclient import TestClient
+from PIL import Image, ImageDraw
+
+import main
+from app.tiling import SVG_NS, DecodeBudget, plan_tiles, stitch_tiles
+from app.trace_cache import TraceCache
+from app.trace_pool import TracePool
+
+
+def test_tile_cores_cover_the_image_exactly_once():
+    tiles = plan_tiles(250, 130, 100, 8)
+
+    assert len(tiles) == 6
+    covered = sum((tile.core_x1 - tile.core_x0) * (tile.core_y1 - tile.core_y0) for tile in tiles)
+    assert covered == 250 * 130
+    middle = tiles[1]
+    assert (middle.x0, middle.x1, middle.core_x0, middle.core_x1) == (92, 208, 100, 200)
+
+
+def _tile_svg(*paths: str) -> str:
+    return f'<?xml version="1.0"?><svg xmlns="{SVG_NS}" width="116" height="108">{"".join(paths)}</svg>'
+
+
+def test_stitch_drops_overlap_only_paths_and_clips_the_rest():
+    left, right = plan_tiles(200, 100, 100, 8)
+    traced = [
+        (left, _tile_svg('<path d="M0 0 L10 0 L10 10 Z" fill="#000" transform="translate(20,20)"/>')),
+        (
+            right,
+            _tile_svg(
+                '<path d="M0 0 L4 0 L4 4 Z" fill="#111" transform="translate(1,1)"/>',
+                '<path d="M0 0 L50 0 L50 10 Z" fill="#222" transform="translate(2,30)"/>',
+            ),
+        ),
+    ]
+
+    root = ET.fromstring(stitch_tiles(200, 100, traced))
+
+    fills = [path.get("fill") for path in root.iter(f"{{{SVG_NS}}}path")]
+    assert fills == ["#000", "#222"]
+    groups = root.findall(f"{{{SVG_NS}}}g")
+    assert [group.get("transform") for group in groups] == ["translate(0,0)", "translate(92,0)"]
+    assert len(root.findall(f"{{{SVG_NS}}}defs/{{{SVG_NS}}}clipPath")) == 2
+
+
+def test_decode_budget_holds_tiled_jobs_back_until_pixels_are_free():
+    budget = DecodeBudget(150)
+    order = []
+
+    async def job(name: str, pixels: int, seconds: float) -> None:
+        async with budget.reserve(pixels):
+            order.append(f"{name}+")
+            await asyncio.sleep(seconds)
+            order.append(f"{name}-")
+
+    async def run() -> None:
+        # "huge" exceeds the whole budget, so it runs once nothing else holds any of it.
+        await asyncio.gather(job("a", 100, 0.05), job("b", 100, 0), job("huge", 1000, 0))
+        assert budget.in_use() == 0
+
+    asyncio.run(run())
+
+    assert order == ["a+", "a-", "b+", "b-", "huge+", "huge-"]
+
+
+def test_trace_with_tile_size_stitches_one_svg(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "trace_cache", TraceCache(tmp_path, 1 << 20, 1 << 22))
+    image = Image.new("RGB", (300, 200), "white")
+    ImageDraw.Draw(image).ellipse((40, 30, 260, 170), fill="black")
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+
+    response = TestClient(main.app).post(
+        "/trace", files={"file": ("art.png", buffer.getvalue(), "image/png")}, data={"tile_size": "128"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["x-trace-tiles"] == "6"
+    root = ET.fromstring(response.text)
+    assert root.get("viewBox") == "0 0 300 200"
+    assert len(root.findall(f"{{{SVG_NS}}}g")) == 6
+    assert int(response.headers["x-trace-paths"]) >= 6
+
+
+def test_images_over_the_pixel_cap_are_rejected_before_decoding(monkeypatch):
+    monkeypatch.setattr(main, "TRACE_MAX_PIXELS", 300 * 200 - 1)
+    buffer = io.BytesIO()
+    Image.new("RGB", (300, 200), "white").save(buffer, format="PNG")
+
+    response = TestClient(main.app).post("/trace", files={"file": ("art.png", buffer.getvalue(), "image/png")})
+
+    assert response.status_code == 413
+    assert "300x200" in response.json()["detail"]
+
+
+class _CountingPool(TracePool):
+    """A pool whose workers trace nothing but record how many jobs really overlap."""
+
+    def __init__(self, workers: int, fail_first: bool = False) -> None:
+        super().__init__(workers=workers, queue_size=0, timeout_seconds=5, queue_timeout_seconds=5)
+        self.fail_first = fail_first
+        self.calls = self.in_flight = self.peak = 0
+        self.counter = threading.Lock()
+
+    def _run_blocking(self, fn, args, timeout):
+        with self.counter:
+            self.calls += 1
+            if self.fail_first and self.calls == 1:
+                return None
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(0.5 if self.fail_first else 0.01)
+        with self.counter:
+            self.in_flight -= 1
+        return f'<svg xmlns="{SVG_NS}"><path d="M0 0 L1 0 L1 1 Z" fill="#000"/></svg>'
+
+
+def _art_png(size=(300, 200)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "white").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_batched_tiles_share_one_limiter_sized_to_the_pool(tmp_path, monkeypatch):
+    pool = _CountingPool(workers=2)
+    monkeypatch.setattr(main, "get_trace_pool", lambda: pool)
+    monkeypatch.setattr(main, "trace_cache", TraceCache(tmp_path, 1 << 20, 1 << 22))
+
+    response = TestClient(main.app).post(
+        "/trace/batch",
+        files=[("files", (f"{index}.png", _art_png((300, 200 + index)), "image/png")) for index in range(3)],
+        data={"tile_size": "64"},
+    )
+
+    assert response.status_code == 200
+    assert json.loads(response.text.splitlines()[-1])["succeeded"] == 3
+    assert pool.calls == 3 * 20
+    assert pool.peak == 2
+    pool.close()
+
+
+def test_a_failed_tile_cancels_waiting_tiles_but_running_ones_keep_their_slot(tmp_path, monkeypatch):
+    pool = _CountingPool(workers=4, fail_first=True)
+    monkeypatch.setattr(main, "get_trace_pool", lambda: pool)
+    monkeypatch.setattr(main, "trace_cache", TraceCache(tmp_path, 1 << 20, 1 << 22))
+    client = TestClient(main.app)
+
+    response = client.post("/trace", files={"file": ("art.png", _art_png(), "image/png")}, data={"tile_size": "64"})
+
+    assert response.status_code == 200
+    assert response.headers["x-trace-fallback"]
+    # Tiles still waiting for a worker never started.
+    assert pool.calls < 20
+    # The abandoned tiles still count against admission until their workers are done.
+    assert pool.stats()["inFlight"] >= 1
+    deadline = time.monotonic() + 5
+    while pool.stats()["inFlight"] and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert pool.stats()["inFlight"] == 0 and pool.peak <= 4
+    pool.close()
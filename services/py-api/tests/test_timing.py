@@ -0,0 +1,85 @@
+import io
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import main
+from app.timing import stage, timed_request, timing_stats
+from app.trace_cache import TraceCache
+from app.trace_pool import TraceTimeout
+
+
+def _png_bytes(size=(8, 8)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _server_timing(header: str) -> dict[str, float]:
+    entries = (entry.split(";dur=") for entry in header.split(", "))
+    return {name: float(duration) for name, duration in entries}
+
+
+def test_stages_accumulate_and_feed_histograms():
+    timing_stats.reset()
+    with timed_request() as timer:
+        with stage("cache"):
+            pass
+        with stage("cache"):
+            pass
+
+    assert list(timer.durations) == ["cache"]
+    with stage("outside-a-request"):
+        pass
+
+    snapshot = timing_stats.snapshot()
+    assert snapshot["requests"] == 1
+    assert set(snapshot["stages"]) == {"cache", "total"}
+    assert snapshot["stages"]["cache"]["count"] == 1
+    assert snapshot["stages"]["total"]["buckets"]["+Inf"] == 1
+
+
+def test_trace_returns_server_timing(tmp_path, monkeypatch):
+    async def fake_trace(image_bytes, mode, simplify):
+        return "<svg>traced</svg>"
+
+    monkeypatch.setattr(main, "_trace_with_vtracer", fake_trace)
+    monkeypatch.setattr(main, "trace_cache", TraceCache(tmp_path, 1024, 4096))
+    timing_stats.reset()
+    client = TestClient(main.app)
+
+    response = client.post("/trace", files={"file": ("a.png", _png_bytes(), "image/png")}, data={"compact": "true"})
+
+    timings = _server_timing(response.headers["server-timing"])
+    assert {"read", "decode", "mime", "cache", "vtracer", "compact", "total"} <= set(timings)
+    assert timings["total"] >= timings["vtracer"]
+    assert "x-trace-fallback" not in response.headers
+
+    stats = client.get("/trace/timing/stats").json()
+    assert stats["requests"] == 1
+    assert stats["stages"]["vtracer"]["count"] == 1
+    assert stats["fallbacks"] == {}
+
+
+def test_fallbacks_are_counted_by_reason(tmp_path, monkeypatch):
+    class TimingOutPool:
+        workers = 1
+
+        async def run(self, fn, *args):
+            raise TraceTimeout("took too long")
+
+    monkeypatch.setattr(main, "get_trace_pool", lambda: TimingOutPool())
+    monkeypatch.setattr(main, "trace_cache", TraceCache(tmp_path, 1024, 4096))
+    timing_stats.reset()
+    client = TestClient(main.app)
+
+    for _ in range(2):
+        response = client.post("/trace", files={"file": ("a.png", _png_bytes(), "image/png")})
+        assert response.status_code == 200
+        assert response.headers["x-trace-fallback"] == "timeout"
+        assert "embed" in _server_timing(response.headers["server-timing"])
+    client.post("/trace", files={"file": ("a.png", _png_bytes(), "image/png")}, data={"mode": "embed"})
+
+    stats = client.get("/trace/timing/stats").json()
+    assert stats["requests"] == 3
+    assert stats["fallbacks"] == {"timeout": 2}
@@ -0,0 +1,59 @@
+import io
+import json
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import main
+from app.trace_cache import TraceCache
+
+
+def _png_bytes(size=(8, 8)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_batch_streams_one_line_per_file(tmp_path, monkeypatch):
+    async def fake_trace(image_bytes, mode, simplify):
+        return "<svg>traced</svg>"
+
+    monkeypatch.setattr(main, "_trace_with_vtracer", fake_trace)
+    monkeypatch.setattr(main, "trace_cache", TraceCache(tmp_path, 1024, 4096))
+
+    response = TestClient(main.app).post(
+        "/trace/batch",
+        files=[
+            ("files", ("a.png", _png_bytes(), "image/png")),
+            ("files", ("broken.png", b"not an image", "image/png")),
+            ("files", ("empty.png", b"", "image/png")),
+            ("files", ("b.png", _png_bytes((16, 8)), "image/png")),
+        ],
+        data={"simplify": "0.4"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    results = sorted(lines[:-1], key=lambda line: line["index"])
+
+    assert [(line["filename"], line["ok"]) for line in results] == [
+        ("a.png", True),
+        ("broken.png", False),
+        ("empty.png", False),
+        ("b.png", True),
+    ]
+    assert results[0]["svg"] == "<svg>traced</svg>"
+    assert results[1] == {"index": 1, "filename": "broken.png", "ok": False, "status": 400, "error": "invalid image"}
+    assert lines[-1] == {"done": True, "total": 4, "succeeded": 2, "failed": 2}
+
+
+def test_batch_rejects_too_many_files(monkeypatch):
+    monkeypatch.setattr(main, "TRACE_BATCH_MAX_FILES", 1)
+
+    response = TestClient(main.app).post(
+        "/trace/batch",
+        files=[("files", ("a.png", _png_bytes(), "image/png")), ("files", ("b.png", _png_bytes(), "image/png"))],
+    )
+
+    assert response.status_code == 413
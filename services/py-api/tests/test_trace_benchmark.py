@@ -0,0 +1,37 @@
+import io
+
+from PIL import Image
+
+import main
+from benchmarks import trace_benchmark
+
+
+def test_corpus_is_deterministic_and_covers_every_kind():
+    corpus = trace_benchmark.build_corpus([64, 96], list(trace_benchmark.KINDS))
+
+    assert [image["name"] for image in corpus[:2]] == ["line-art-64", "line-art-96"]
+    assert {image["kind"] for image in corpus} == set(trace_benchmark.KINDS)
+    assert corpus == trace_benchmark.build_corpus([64, 96], list(trace_benchmark.KINDS))
+    with Image.open(io.BytesIO(corpus[1]["data"])) as image:
+        assert image.size == (96, 72)
+
+
+def test_report_skips_trace_cases_without_vtracer(monkeypatch):
+    monkeypatch.setattr(trace_benchmark.importlib.util, "find_spec", lambda name: None)
+    # Run cases in this process; the spawn per case only matters for RSS.
+    monkeypatch.setattr(trace_benchmark, "_in_fresh_process", lambda fn, *args: fn(*args))
+    # run_case rebinds these in its (normally throwaway) process; restore them afterwards.
+    monkeypatch.setattr(main, "_trace_with_vtracer", main._trace_with_vtracer)
+    monkeypatch.setattr(main, "trace_cache", main.trace_cache)
+
+    report = trace_benchmark.run([64], ["logo"], ["trace", "embed"], [None, 0.5], repeat=1)
+
+    assert set(report["cases"]) == {"logo-64/trace", "logo-64/trace/s0.5", "logo-64/embed"}
+    assert report["cases"]["logo-64/trace/s0.5"]["status"] == "skipped"
+    embed = report["cases"]["logo-64/embed"]
+    assert embed["status"] == "ok"
+    assert embed["paths"] == 0 and embed["outputBytes"] > embed["inputBytes"]
+    assert embed["peakRssMb"] > 0
+
+    baseline = {"cases": {"logo-64/embed": {**embed, "outputBytes": embed["outputBytes"] * 2}}}
+    assert trace_benchmark.compare(report, baseline)[0]["outputBytes"] == 0.5
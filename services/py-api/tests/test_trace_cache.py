@@ -0,0 +1,91 @@
+import asyncio
+import io
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import main
+from app.trace_cache import TraceCache, trace_cache_key
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = TraceCache(tmp_path / "trace-cache", memory_max_bytes=1024, disk_max_bytes=4096)
+    monkeypatch.setattr(main, "trace_cache", cache)
+    return cache
+
+
+def _png_bytes(color=(0, 0, 0)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (16, 16), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_key_depends_on_bytes_mode_and_simplify():
+    image = _png_bytes()
+    assert trace_cache_key(image, "trace", 0.4) == trace_cache_key(image, "trace", 0.4)
+    assert trace_cache_key(image, "trace", 0.4) != trace_cache_key(image, "trace", None)
+    assert trace_cache_key(image, "trace", 0.4) != trace_cache_key(_png_bytes((255, 0, 0)), "trace", 0.4)
+
+
+def test_memory_then_disk_tiers(cache):
+    cache.put("ab-1", "<svg/>")
+    assert cache.get("ab-1") == ("<svg/>", "memory")
+
+    cache.clear_memory()
+    assert cache.get("ab-1") == ("<svg/>", "disk")
+    assert cache.get("ab-1") == ("<svg/>", "memory")
+    assert cache.get("cd-2") == (None, "miss")
+
+    stats = cache.stats()
+    assert (stats["memoryHits"], stats["diskHits"], stats["misses"]) == (2, 1, 1)
+
+
+def test_memory_and_disk_caps_evict_oldest(cache):
+    for index in range(6):
+        cache.put(f"k{index}", "x" * 1000)
+
+    stats = cache.stats()
+    assert stats["memoryBytes"] <= 1024
+    assert stats["diskBytes"] <= 4096
+    assert stats["diskEvictions"] >= 2
+    cache.clear_memory()
+    assert cache.get("k0") == (None, "miss")
+    assert cache.get("k5")[1] == "disk"
+
+
+def test_stores_evict_from_the_size_index_without_rescanning(cache, monkeypatch):
+    scans = []
+    glob = Path.glob
+    monkeypatch.setattr(Path, "glob", lambda self, pattern: scans.append(pattern) or glob(self, pattern))
+
+    for index in range(8):
+        asyncio.run(cache.put_async(f"k{index}", "x" * 1000))
+
+    assert len(scans) == 1
+    assert sum(path.stat().st_size for path in cache.root.glob("*/*.svg")) == cache.stats()["diskBytes"] <= 4096
+    cache.clear_memory()
+    assert asyncio.run(cache.get_async("k7")) == ("x" * 1000, "disk")
+    assert asyncio.run(cache.get_async("k0")) == (None, "miss")
+
+
+def test_trace_endpoint_reuses_cached_result(cache, monkeypatch):
+    calls = []
+
+    async def fake_trace(image_bytes, mode, simplify):
+        calls.append(simplify)
+        return "<svg>traced</svg>"
+
+    monkeypatch.setattr(main, "_trace_with_vtracer", fake_trace)
+    client = TestClient(main.app)
+    files = {"file": ("logo.png", _png_bytes(), "image/png")}
+
+    first = client.post("/trace", files=files, data={"simplify": "0.4"})
+    second = client.post("/trace", files=files, data={"simplify": "0.4"})
+
+    assert first.text == second.text == "<svg>traced</svg>"
+    assert (first.headers["x-trace-cache"], second.headers["x-trace-cache"]) == ("miss", "memory")
+    assert calls == [0.4]
+    assert client.get("/trace/cache/stats").json()["stores"] == 1
@@ -0,0 +1,158 @@
+import io
+import json
+import os
+import time
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import main
+from app.trace_cache import TraceCache
+from app.trace_jobs import TraceJobRunner, TraceJobStore
+
+
+def _png_bytes(size=(8, 8)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _use_tmp_storage(tmp_path, monkeypatch) -> TraceJobStore:
+    async def fake_trace(image_bytes, mode, simplify):
+        return "<svg>traced</svg>"
+
+    store = TraceJobStore(tmp_path / "trace-jobs")
+    monkeypatch.setattr(main, "_trace_with_vtracer", fake_trace)
+    monkeypatch.setattr(main, "trace_cache", TraceCache(tmp_path / "trace-cache", 1024, 4096))
+    monkeypatch.setattr(main, "trace_jobs", TraceJobRunner(store, main._run_trace_job, concurrency=2))
+    return store
+
+
+def _wait_for(client: TestClient, job_id: str) -> dict:
+    for _ in range(200):
+        status = client.get(f"/trace/jobs/{job_id}").json()
+        if status["status"] in ("succeeded", "failed"):
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_job_runs_in_background_and_serves_result(tmp_path, monkeypatch):
+    _use_tmp_storage(tmp_path, monkeypatch)
+
+    with TestClient(main.app) as client:
+        response = client.post("/trace/jobs", files={"file": ("logo.png", _png_bytes(), "image/png")})
+        assert response.status_code == 202
+        job = response.json()
+        assert job["status"] == "queued"
+        assert "params" not in job
+        assert response.headers["location"] == f"/trace/jobs/{job['id']}"
+
+        status = _wait_for(client, job["id"])
+        assert status["status"] == "succeeded"
+        assert status["progress"] == 1.0
+        assert status["finishedAt"]
+        assert status["resultUrl"] == f"/trace/jobs/{job['id']}/result"
+
+        result = client.get(status["resultUrl"])
+        assert result.status_code == 200
+        assert result.headers["content-type"].startswith("image/svg+xml")
+        assert result.headers["x-trace-paths"] == "0"
+        assert result.text == "<svg>traced</svg>"
+
+
+def test_failed_job_records_error(tmp_path, monkeypatch):
+    _use_tmp_storage(tmp_path, monkeypatch)
+
+    with TestClient(main.app) as client:
+        job = client.post("/trace/jobs", files={"file": ("broken.png", b"not an image", "image/png")}).json()
+        status = _wait_for(client, job["id"])
+
+        assert status["status"] == "failed"
+        assert status["error"] == {"status": 400, "message": "invalid image"}
+        assert client.get(f"/trace/jobs/{job['id']}/result").status_code == 409
+
+
+def test_job_validation_and_unknown_ids(tmp_path, monkeypatch):
+    _use_tmp_storage(tmp_path, monkeypatch)
+    client = TestClient(main.app)
+
+    bad_mode = client.post("/trace/jobs", files={"file": ("a.png", _png_bytes(), "image/png")}, data={"mode": "x"})
+    assert bad_mode.status_code == 400
+    assert client.get("/trace/jobs/0123456789abcdef0123456789abcdef").status_code == 404
+    assert client.get("/trace/jobs/..%2F..%2Fetc").status_code == 404
+
+
+def test_unfinished_jobs_resume_after_restart(tmp_path, monkeypatch):
+    store = _use_tmp_storage(tmp_path, monkeypatch)
+    job = store.create(_png_bytes(), "a.png", {**_default_params(), "simplify": 0.5})
+    store.update(job["id"], status="running", progress=0.4)
+
+    with TestClient(main.app) as client:
+        status = _wait_for(client, job["id"])
+
+    assert status["status"] == "succeeded"
+    assert store.result_path(job["id"]).read_text(encoding="utf-8") == "<svg>traced</svg>"
+
+
+def test_job_lease_has_one_owner_until_it_expires(tmp_path):
+    store = TraceJobStore(tmp_path)
+    job = store.create(b"x", "a.png", _default_params())
+
+    assert store.claim(job["id"], "a", lease_seconds=60)
+    assert not store.claim(job["id"], "b", lease_seconds=60)
+    assert not store.renew(job["id"], "b", lease_seconds=60)
+    assert store.claimable_ids() == []
+
+    assert store.renew(job["id"], "a", lease_seconds=-1)
+    assert store.claimable_ids() == [job["id"]]
+    assert store.claim(job["id"], "b", lease_seconds=60)
+    assert not store.renew(job["id"], "a", lease_seconds=60)
+    store.release(job["id"], "a")
+    assert not store.claim(job["id"], "c", lease_seconds=60)
+
+    store.release(job["id"], "b")
+    assert sorted(os.listdir(tmp_path / job["id"])) == ["input", "job.json"]
+
+
+def test_resume_skips_jobs_leased_by_another_process(tmp_path, monkeypatch):
+    store = _use_tmp_storage(tmp_path, monkeypatch)
+    job = store.create(_png_bytes(), "a.png", _default_params())
+    store.update(job["id"], status="running", progress=0.4)
+    assert store.claim(job["id"], "other-replica", lease_seconds=60)
+
+    with TestClient(main.app) as client:
+        assert client.get(f"/trace/jobs/{job['id']}").json()["progress"] == 0.4
+
+    assert store.get(job["id"])["status"] == "running"
+
+
+def test_sweep_removes_only_expired_finished_jobs(tmp_path):
+    store = TraceJobStore(tmp_path)
+    expired = store.create(b"x", "old.png", _default_params())
+    store.update(expired["id"], status="succeeded", finishedAt="2020-01-01T00:00:00+00:00")
+    recent = store.create(b"x", "new.png", _default_params())
+    store.update(recent["id"], status="failed")
+    pending = store.create(b"x", "pending.png", _default_params())
+
+    assert store.sweep(retention_seconds=3600) == 1
+    assert store.get(expired["id"]) is None
+    assert store.get(recent["id"])["status"] == "failed"
+    assert store.pending_ids() == [pending["id"]]
+    assert sorted(os.listdir(tmp_path)) == sorted([recent["id"], pending["id"]])
+    assert json.loads((tmp_path / pending["id"] / "job.json").read_text())["status"] == "queued"
+
+
+def _default_params() -> dict:
+    return {
+        "mode": "trace",
+        "simplify": None,
+        "target_width_mm": None,
+        "target_height_mm": None,
+        "dpi": None,
+        "preprocess": None,
+        "quantize_levels": None,
+        "compare": False,
+        "embed_color": None,
+        "tile_size": None,
+    }
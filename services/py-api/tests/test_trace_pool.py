@@ -0,0 +1,104 @@
+import asyncio
+import io
+import os
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import main
+from app.trace_pool import TracePool, TracePoolSaturated, TraceTimeout
+
+
+def _pid() -> int:
+    return os.getpid()
+
+
+def _sleep(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def _boom() -> None:
+    raise ValueError("bad image")
+
+
+@pytest.fixture
+def pool():
+    pool = TracePool(workers=1, queue_size=1, timeout_seconds=5, queue_timeout_seconds=5)
+    yield pool
+    pool.close()
+
+
+def test_runs_in_a_reused_worker_process(pool):
+    first = asyncio.run(pool.run(_pid))
+    second = asyncio.run(pool.run(_pid))
+
+    assert first == second != os.getpid()
+    assert pool.stats()["completed"] == 2
+
+
+def test_job_errors_are_reraised(pool):
+    with pytest.raises(ValueError, match="bad image"):
+        asyncio.run(pool.run(_boom))
+    assert asyncio.run(pool.run(_sleep, 0)) == 0
+
+
+def test_runaway_job_is_killed_and_worker_replaced(pool):
+    before = asyncio.run(pool.run(_pid))
+    with pytest.raises(TraceTimeout):
+        asyncio.run(pool.run(_sleep, 30, timeout=0.5))
+
+    assert asyncio.run(pool.run(_pid)) != before
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_rejects_jobs_beyond_workers_plus_queue(pool):
+    async def burst():
+        return await asyncio.gather(*(pool.run(_sleep, 0.5) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(burst())
+
+    assert sum(isinstance(result, TracePoolSaturated) for result in results) == 1
+    assert results.count(0.5) == 2
+
+
+def test_saturated_trace_returns_429(pool, monkeypatch):
+    pool.close()
+    monkeypatch.setattr(main, "get_trace_pool", lambda: pool)
+
+    async def miss(key):
+        return None, "miss"
+
+    monkeypatch.setattr(main.trace_cache, "get_async", miss)
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8)).save(buffer, format="PNG")
+
+    response = TestClient(main.app).post("/trace", files={"file": ("a.png", buffer.getvalue(), "image/png")})
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "5"
+
+
+def test_shared_runs_wait_for_a_slot_instead_of_being_rejected(pool):
+    async def fan_out():
+        return await asyncio.gather(*(pool.run_shared(_sleep, 0.1) for _ in range(4)))
+
+    assert asyncio.run(fan_out()) == [0.1] * 4
+    assert pool.stats()["rejected"] == 0
+
+
+def test_cancelled_run_stays_admitted_until_its_worker_is_free(pool):
+    async def cancel_midway():
+        task = asyncio.ensure_future(pool.run(_sleep, 1.0))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert pool.stats()["inFlight"] == 1
+        # The cancelled job still occupies the only worker, so the queue has one place left.
+        results = await asyncio.gather(pool.run(_sleep, 0), pool.run(_sleep, 0), return_exceptions=True)
+        assert sum(isinstance(result, TracePoolSaturated) for result in results) == 1
+
+    asyncio.run(cancel_midway())
+    assert pool.stats()["inFlight"] == 0
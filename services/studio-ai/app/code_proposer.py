@@ -3,12 +3,27 @@ from __future__ import annotations
 import json
 import os
 import uuid
+from collections.abc import AsyncIterator
 from typing import Any
 
+from .llm_client import LLMClient, get_llm_client
 from .models import CodeProposeRequest, CodeProposeResponse
+from .proposal_cache import proposal_cache, proposal_cache_key
+from .repo_context import REPO_CONTEXT_VERSION, build_repo_context, token_budget
 
 DEFAULT_MODEL = "gpt-4o-mini"
-MAX_CONTEXT_CHARS = 12_000
+FALLBACK_SUMMARY = "No code patch generated. Returning placeholder proposal."
+
+# Bump whenever SYSTEM_PROMPT changes so cached proposals from the old prompt are not reused.
+SYSTEM_PROMPT_VERSION = 1
+SYSTEM_PROMPT = (
+    "You generate git unified diffs only. "
+    "Return strict JSON with keys: patch (string), summary (string), warnings (array of strings), files (array of strings). "
+    "Patch constraints: only modify paths under src/studio/, src/components/, app/(studio)/, or src/app/(studio)/. "
+    "Allowed extensions: .ts, .tsx, .css, .md, .json. "
+    "Never include markdown fences. "
+    "If unsure, return a minimal safe patch in src/studio/."
+)
 
 
 def _normalize_text(value: Any) -> str:
@@ -19,13 +34,10 @@ def _normalize_text(value: Any) -> str:
     return json.dumps(value, ensure_ascii=False)
 
 
-def _repo_context_excerpt(repo_context: dict[str, Any] | None) -> str:
-    if not repo_context:
-        return "{}"
-    as_text = json.dumps(repo_context, ensure_ascii=False)
-    if len(as_text) <= MAX_CONTEXT_CHARS:
-        return as_text
-    return as_text[:MAX_CONTEXT_CHARS] + "\n...<truncated>"
+def _repo_context_excerpt(request: CodeProposeRequest) -> str:
+    query = f"{_normalize_text(request.instruction)} {_normalize_text(request.target)}"
+    packed = build_repo_context(request.repo_context, query, token_budget())
+    return json.dumps(packed, ensure_ascii=False)
 
 
 def _extract_paths_from_patch(patch: str) -> list[str]:
@@ -41,8 +53,16 @@ def _extract_paths_from_patch(patch: str) -> list[str]:
     return paths
 
 
+def _new_proposal_id() -> str:
+    return f"proposal_{uuid.uuid4().hex[:12]}"
+
+
+def _model_name() -> str:
+    return os.getenv("OPENAI_MODEL", DEFAULT_MODEL).strip() or DEFAULT_MODEL
+
+
 def _fallback_response(instruction: str, reason: str) -> CodeProposeResponse:
-    proposal_id = f"proposal_{uuid.uuid4().hex[:12]}"
+    proposal_id = _new_proposal_id()
     safe_instruction = instruction.replace("\n", " ").strip()[:220]
     patch = (
         "diff --git a/src/studio/ai-proposals.md b/src/studio/ai-proposals.md\n"
@@ -58,72 +78,234 @@ def _fallback_response(instruction: str, reason: str) -> CodeProposeResponse:
     return CodeProposeResponse(
         proposal_id=proposal_id,
         patch=patch,
-        summary="No code patch generated. Returning placeholder proposal.",
+        summary=FALLBACK_SUMMARY,
         warnings=[reason],
         files=_extract_paths_from_patch(patch),
     )
 
 
-def propose_code(request: CodeProposeRequest) -> CodeProposeResponse:
+def _completion_args(request: CodeProposeRequest) -> dict[str, Any]:
+    user_prompt = {
+        "instruction": _normalize_text(request.instruction),
+        "target": _normalize_text(request.target),
+        "repo_context_excerpt": _repo_context_excerpt(request),
+    }
+    return {
+        "model": _model_name(),
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": json.dumps(user_prompt, ensure_ascii=False)},
+        ],
+        "response_format": {"type": "json_object"},
+        "temperature": 0.2,
+    }
+
+
+def _response_from_content(request: CodeProposeRequest, content: str) -> CodeProposeResponse:
+    parsed = json.loads(content or "{}")
+
+    patch = _normalize_text(parsed.get("patch", "")).strip()
+    summary = _normalize_text(parsed.get("summary", "Generated patch proposal.")).strip() or "Generated patch proposal."
+    warnings_raw = parsed.get("warnings", [])
+    warnings = [str(item) for item in warnings_raw] if isinstance(warnings_raw, list) else []
+
+    if not patch.startswith("diff --git "):
+        return _fallback_response(request.instruction, "OpenAI response did not contain a valid git patch.")
+
+    files_raw = parsed.get("files", [])
+    files = [str(item) for item in files_raw] if isinstance(files_raw, list) else []
+    if not files:
+        files = _extract_paths_from_patch(patch)
+
+    return CodeProposeResponse(
+        proposal_id=_new_proposal_id(),
+        patch=patch,
+        summary=summary,
+        warnings=warnings,
+        files=files,
+    )
+
+
+def _client_or_fallback(request: CodeProposeRequest) -> LLMClient | CodeProposeResponse:
     api_key = os.getenv("OPENAI_API_KEY", "").strip()
     if not api_key:
         return _fallback_response(request.instruction, "OPENAI_API_KEY is not set.")
-
     try:
-        from openai import OpenAI
+        return get_llm_client(api_key)
     except Exception as exc:  # noqa: BLE001
         return _fallback_response(request.instruction, f"OpenAI SDK import failed: {exc}")
 
-    model = os.getenv("OPENAI_MODEL", DEFAULT_MODEL).strip() or DEFAULT_MODEL
-    client = OpenAI(api_key=api_key)
 
-    system_prompt = (
-        "You generate git unified diffs only. "
-        "Return strict JSON with keys: patch (string), summary (string), warnings (array of strings), files (array of strings). "
-        "Patch constraints: only modify paths under src/studio/, src/components/, app/(studio)/, or src/app/(studio)/. "
-        "Allowed extensions: .ts, .tsx, .css, .md, .json. "
-        "Never include markdown fences. "
-        "If unsure, return a minimal safe patch in src/studio/."
+async def propose_code(request: CodeProposeRequest) -> CodeProposeResponse:
+    client = _client_or_fallback(request)
+    if isinstance(client, CodeProposeResponse):
+        return client
+
+    try:
+        content = await client.complete(**_completion_args(request))
+        return _response_from_content(request, content)
+    except Exception as exc:  # noqa: BLE001
+        return _fallback_response(request.instruction, f"OpenAI request failed: {exc}")
+
+
+def _cache_key(request: CodeProposeRequest) -> str:
+    return proposal_cache_key(
+        request.instruction,
+        request.target,
+        request.repo_context,
+        _model_name(),
+        SYSTEM_PROMPT_VERSION,
+        token_budget(),
+        REPO_CONTEXT_VERSION,
     )
 
-    user_prompt = {
-        "instruction": _normalize_text(request.instruction),
-        "target": _normalize_text(request.target),
-        "repo_context_excerpt": _repo_context_excerpt(request.repo_context),
-    }
 
+def _cached_proposal(key: str) -> CodeProposeResponse | None:
+    cached = proposal_cache.get(key)
+    if cached is None:
+        return None
+    return cached.model_copy(update={"proposal_id": _new_proposal_id()}, deep=True)
+
+
+def _remember(key: str, response: CodeProposeResponse) -> None:
+    # Placeholders are not cached, so a missing key or an outage is not replayed.
+    if response.summary != FALLBACK_SUMMARY:
+        proposal_cache.put(key, response)
+
+
+async def propose_code_cached(
+    request: CodeProposeRequest, *, bypass_cache: bool = False
+) -> tuple[CodeProposeResponse, str]:
+    """Serve identical requests from the proposal cache; returns ``(response, hit|miss|bypass)``.
+
+    A bypass skips the lookup but still stores the fresh proposal.
+    """
+    key = _cache_key(request)
+    cached = None if bypass_cache else _cached_proposal(key)
+    if cached is not None:
+        return cached, "hit"
+
+    response = await propose_code(request)
+    _remember(key, response)
+    return response, "bypass" if bypass_cache else "miss"
+
+
+_JSON_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "/": "/", "\\": "\\", '"': '"'}
+
+
+class PatchPathWatcher:
+    """Follows a streamed JSON completion and reports diff paths as their ``+++`` lines complete.
+
+    A small character-level scanner tracks nesting and string state, decodes
+    the top-level ``patch`` string as it arrives and hands each finished line to
+    ``_extract_paths_from_patch``. Each character is looked at once.
+    """
+
+    def __init__(self) -> None:
+        self.files: list[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._in_patch = False
+        self._escape = ""
+        self._chars: list[str] = []
+        self._last_string: str | None = None
+        self._key: str | None = None
+
+    def feed(self, delta: str) -> bool:
+        """Consume the next piece of the completion; True when new paths were found."""
+        known = len(self.files)
+        for char in delta:
+            if self._in_string:
+                if self._escape:
+                    self._escape += char
+                    if self._escape[1] == "u" and len(self._escape) < 6:
+                        continue
+                    self._string_char(self._unescape(self._escape))
+                    self._escape = ""
+                elif char == "\\":
+                    self._escape = char
+                elif char == '"':
+                    self._end_string()
+                else:
+                    self._string_char(char)
+            elif char == '"':
+                self._in_string = True
+                self._in_patch = self._depth == 1 and self._key == "patch"
+                self._chars = []
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+            elif char == ":" and self._depth == 1:
+                self._key = self._last_string
+            elif char == "," and self._depth == 1:
+                self._key = None
+        return len(self.files) > known
+
+    @staticmethod
+    def _unescape(sequence: str) -> str:
+        if sequence[1] == "u":
+            try:
+                return chr(int(sequence[2:], 16))
+            except ValueError:
+                return ""
+        return _JSON_ESCAPES.get(sequence[1], sequence[1])
+
+    def _string_char(self, char: str) -> None:
+        if self._in_patch and char == "\n":
+            self._finish_line()
+        elif self._in_patch or (self._depth == 1 and len(self._chars) < 64):
+            # Outside the patch only short top-level strings (keys) matter.
+            self._chars.append(char)
+
+    def _finish_line(self) -> None:
+        line = "".join(self._chars)
+        self._chars = []
+        if line.startswith("+++ "):
+            for path in _extract_paths_from_patch(line):
+                if path not in self.files:
+                    self.files.append(path)
+
+    def _end_string(self) -> None:
+        self._in_string = False
+        if self._in_patch:
+            self._finish_line()
+            self._in_patch = False
+            self._key = None
+        elif self._depth == 1:
+            self._last_string = "".join(self._chars)
+
+
+async def stream_code_proposal(
+    request: CodeProposeRequest, *, bypass_cache: bool = False
+) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+    """Yield ``(event, data)`` pairs: ``start``, then ``token`` and ``files`` as the completion
+    streams in, and finally ``result`` with the same response ``propose_code`` would return.
+    """
+    key = _cache_key(request)
+    cached = None if bypass_cache else _cached_proposal(key)
+    yield "start", {"cache": "hit" if cached is not None else "bypass" if bypass_cache else "miss"}
+    if cached is not None:
+        yield "files", {"files": cached.files}
+        yield "result", cached.model_dump()
+        return
+
+    client = _client_or_fallback(request)
+    if isinstance(client, CodeProposeResponse):
+        yield "result", client.model_dump()
+        return
+
+    watcher = PatchPathWatcher()
+    chunks: list[str] = []
     try:
-        completion = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": json.dumps(user_prompt, ensure_ascii=False)},
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.2,
-        )
-        content = completion.choices[0].message.content or "{}"
-        parsed = json.loads(content)
-
-        patch = _normalize_text(parsed.get("patch", "")).strip()
-        summary = _normalize_text(parsed.get("summary", "Generated patch proposal.")).strip() or "Generated patch proposal."
-        warnings_raw = parsed.get("warnings", [])
-        warnings = [str(item) for item in warnings_raw] if isinstance(warnings_raw, list) else []
-
-        if not patch.startswith("diff --git "):
-            return _fallback_response(request.instruction, "OpenAI response did not contain a valid git patch.")
-
-        files_raw = parsed.get("files", [])
-        files = [str(item) for item in files_raw] if isinstance(files_raw, list) else []
-        if not files:
-            files = _extract_paths_from_patch(patch)
-
-        return CodeProposeResponse(
-            proposal_id=f"proposal_{uuid.uuid4().hex[:12]}",
-            patch=patch,
-            summary=summary,
-            warnings=warnings,
-            files=files,
-        )
+        async for delta in client.stream(**_completion_args(request)):
+            chunks.append(delta)
+            yield "token", {"delta": delta}
+            if watcher.feed(delta):
+                yield "files", {"files": list(watcher.files)}
+        response = _response_from_content(request, "".join(chunks))
     except Exception as exc:  # noqa: BLE001
-        return _fallback_response(request.instruction, f"OpenAI request failed: {exc}")
+        response = _fallback_response(request.instruction, f"OpenAI request failed: {exc}")
+
+    _remember(key, response)
+    yield "result", response.model_dump()
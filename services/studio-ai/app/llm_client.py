@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_TIMEOUT_SECONDS = 60.0
+DEFAULT_CONNECT_TIMEOUT_SECONDS = 5.0
+DEFAULT_MAX_RETRIES = 3
+RETRY_BASE_SECONDS = 0.5
+RETRY_CAP_SECONDS = 8.0
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _retryable() -> tuple[type[Exception], ...]:
+    import openai
+
+    return (
+        openai.APIConnectionError,  # includes APITimeoutError
+        openai.RateLimitError,
+        openai.InternalServerError,
+    )
+
+
+def retry_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(RETRY_CAP_SECONDS, RETRY_BASE_SECONDS * 2**attempt))
+
+
+class LLMClient:
+    """One pooled async OpenAI client per process, with a concurrency cap and jittered retries.
+
+    The SDK's own retries are disabled so every attempt, including retries,
+    holds a concurrency slot and follows the same backoff.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str | None,
+        max_concurrency: int,
+        timeout_seconds: float,
+        max_retries: int,
+    ) -> None:
+        import httpx
+        from openai import AsyncOpenAI
+
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self._slots = asyncio.Semaphore(max(1, max_concurrency))
+        self._client: AsyncOpenAI = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0,
+            timeout=httpx.Timeout(timeout_seconds, connect=DEFAULT_CONNECT_TIMEOUT_SECONDS),
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=max(1, max_concurrency),
+                    max_keepalive_connections=max(1, max_concurrency),
+                    keepalive_expiry=60,
+                ),
+                timeout=httpx.Timeout(timeout_seconds, connect=DEFAULT_CONNECT_TIMEOUT_SECONDS),
+            ),
+        )
+
+    async def complete(self, **create_args: Any) -> str:
+        """Run a chat completion and return the first choice's content."""
+        retryable = _retryable()
+        attempt = 0
+        while True:
+            try:
+                async with self._slots:
+                    completion = await self._client.chat.completions.create(**create_args)
+                return completion.choices[0].message.content or ""
+            except retryable:
+                if attempt >= self.max_retries:
+                    raise
+            # Sleep outside the semaphore so waiting retries do not block other requests.
+            await asyncio.sleep(retry_delay(attempt))
+            attempt += 1
+
+    async def stream(self, **create_args: Any) -> AsyncIterator[str]:
+        """Stream a chat completion, yielding content deltas as they arrive.
+
+        Retries only happen before the first delta; once tokens have been handed
+        out a failure is raised, since a restart would repeat them. The slot is
+        held for the whole stream.
+        """
+        retryable = _retryable()
+        attempt = 0
+        while True:
+            started = False
+            try:
+                async with self._slots:
+                    chunks = await self._client.chat.completions.create(**create_args, stream=True)
+                    async for chunk in chunks:
+                        delta = chunk.choices[0].delta.content if chunk.choices else None
+                        if delta:
+                            started = True
+                            yield delta
+                return
+            except retryable:
+                if started or attempt >= self.max_retries:
+                    raise
+            await asyncio.sleep(retry_delay(attempt))
+            attempt += 1
+
+    async def close(self) -> None:
+        await self._client.close()
+
+
+_clients: dict[tuple[str, str | None], tuple[asyncio.AbstractEventLoop, LLMClient]] = {}
+
+
+def get_llm_client(api_key: str) -> LLMClient:
+    """Shared client for the running event loop (its connections and semaphore are loop-bound)."""
+    base_url = os.getenv("OPENAI_BASE_URL", "").strip() or None
+    loop = asyncio.get_running_loop()
+    entry = _clients.get((api_key, base_url))
+    if entry is not None and entry[0] is loop:
+        return entry[1]
+    client = LLMClient(
+        api_key=api_key,
+        base_url=base_url,
+        max_concurrency=int(_env_number("LLM_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
+        timeout_seconds=_env_number("LLM_TIMEOUT_SECONDS", DEFAULT_TIMEOUT_SECONDS),
+        max_retries=int(_env_number("LLM_MAX_RETRIES", DEFAULT_MAX_RETRIES)),
+    )
+    _clients[(api_key, base_url)] = (loop, client)
+    return client
+
+
+async def close_llm_clients() -> None:
+    loop = asyncio.get_running_loop()
+    entries = list(_clients.values())
+    _clients.clear()
+    for client_loop, client in entries:
+        # Clients bound to another (finished) loop cannot be closed from here.
+        if client_loop is loop:
+            await client.close()
@@ -1,17 +1,29 @@
 from __future__ import annotations
 
 import json
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import ValidationError
 
-from .code_proposer import propose_code
+from .code_proposer import propose_code_cached, stream_code_proposal
+from .llm_client import close_llm_clients
 from .models import CodeProposeRequest, ProposeRequest
 from .proposer import propose_layout
 
 MAX_BODY_BYTES = 64_000
 
-app = FastAPI(title="studio-ai", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    yield
+    await close_llm_clients()
+
+
+app = FastAPI(title="studio-ai", version="0.1.0", lifespan=lifespan)
 
 
 @app.get("/health")
@@ -41,8 +53,12 @@ async def propose(request: Request) -> dict:
     return response.model_dump()
 
 
-@app.post("/v1/code/propose")
-async def code_propose(request: Request) -> dict:
+def _bypass_cache(request: Request) -> bool:
+    cache_control = request.headers.get("cache-control", "").lower()
+    return "no-cache" in cache_control or "no-store" in cache_control
+
+
+async def _code_propose_request(request: Request) -> CodeProposeRequest:
     raw = await request.body()
     if len(raw) > MAX_BODY_BYTES:
         raise HTTPException(status_code=413, detail="payload too large")
@@ -53,11 +69,41 @@ async def code_propose(request: Request) -> dict:
         raise HTTPException(status_code=400, detail="invalid json") from exc
 
     try:
-        parsed = CodeProposeRequest.model_validate(payload)
-        response = propose_code(parsed)
+        return CodeProposeRequest.model_validate(payload)
     except ValidationError as exc:
         raise HTTPException(status_code=422, detail=exc.errors()) from exc
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    return response.model_dump()
+
+@app.post("/v1/code/propose")
+async def code_propose(request: Request, response: Response) -> dict:
+    parsed = await _code_propose_request(request)
+    proposal, cache_status = await propose_code_cached(parsed, bypass_cache=_bypass_cache(request))
+    response.headers["X-Proposal-Cache"] = cache_status
+    return proposal.model_dump()
+
+
+def _sse_event(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/v1/code/propose/stream")
+async def code_propose_stream(request: Request) -> StreamingResponse:
+    """Server-Sent Events variant of ``/v1/code/propose``.
+
+    Emits ``start``, ``token`` and ``files`` events while the completion streams
+    and ends with a ``result`` event carrying the validated proposal.
+    """
+    parsed = await _code_propose_request(request)
+    events = stream_code_proposal(parsed, bypass_cache=_bypass_cache(request))
+
+    async def body() -> AsyncIterator[str]:
+        async for event, data in events:
+            yield _sse_event(event, data)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
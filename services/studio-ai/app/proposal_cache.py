@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from .models import CodeProposeResponse
+
+DEFAULT_TTL_SECONDS = 600.0
+DEFAULT_MAX_ENTRIES = 256
+
+
+def _collapse_whitespace(value: str | None) -> str:
+    return " ".join((value or "").split())
+
+
+def proposal_cache_key(
+    instruction: str,
+    target: str | None,
+    repo_context: dict[str, Any] | None,
+    model: str,
+    prompt_version: int,
+    context_budget: int,
+    context_version: int,
+) -> str:
+    """Hash of everything that shapes the completion, insensitive to whitespace and key order.
+
+    The raw repo context only counts through how it is packed into the prompt, so the packing
+    budget and version are part of the key too.
+    """
+    normalized = {
+        "instruction": _collapse_whitespace(instruction),
+        "target": _collapse_whitespace(target),
+        "repo_context": repo_context or {},
+        "model": model,
+        "prompt_version": prompt_version,
+        "context_budget": context_budget,
+        "context_version": context_version,
+    }
+    encoded = json.dumps(normalized, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ProposalCache:
+    """Size-bounded LRU of proposals whose entries expire ``ttl_seconds`` after being stored."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, CodeProposeResponse]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "stores": 0}
+
+    def get(self, key: str) -> CodeProposeResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            expires_at, response = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return response
+
+    def put(self, key: str, response: CodeProposeResponse) -> None:
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, response)
+            self._entries.move_to_end(key)
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries)}
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+proposal_cache = ProposalCache(
+    max_entries=int(_env_number("PROPOSAL_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+    ttl_seconds=_env_number("PROPOSAL_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS),
+)
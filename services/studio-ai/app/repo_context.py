@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+DEFAULT_TOKEN_BUDGET = 2_000
+# Bump whenever chunking, scoring or packing changes, so cached proposals built from
+# differently packed context are not reused.
+REPO_CONTEXT_VERSION = 1
+# Rough size of a token for code and paths; good enough to keep prompts within budget.
+CHARS_PER_TOKEN = 4
+MAX_CHUNK_LINES = 24
+BM25_K1 = 1.2
+BM25_B = 0.75
+GAP_MARKER = "// ..."
+# Chunks scoring below this share of the best match are left out even if they would fit.
+MIN_RELATIVE_SCORE = 0.2
+
+_WORD = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or that the this to with add make new use".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-cased words, splitting paths, snake_case and camelCase; a trailing plural ``s`` is dropped."""
+    terms = []
+    for word in _WORD.findall(text):
+        term = word.lower()
+        if term in _STOPWORDS:
+            continue
+        if len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+            term = term[:-1]
+        terms.append(term)
+    return terms
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def token_budget() -> int:
+    try:
+        return int(os.getenv("REPO_CONTEXT_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET))
+    except ValueError:
+        return DEFAULT_TOKEN_BUDGET
+
+
+@dataclass
+class Chunk:
+    key: str
+    index: int
+    text: str
+    # List items are emitted as list entries, everything else as text.
+    item: Any = None
+    terms: Counter[str] = field(default_factory=Counter)
+
+    @property
+    def tokens(self) -> int:
+        # Measured as it appears in the prompt: JSON-escaped, plus a separator.
+        return estimate_tokens(json.dumps(self.text, ensure_ascii=False)) + 1
+
+
+_STRING_LITERAL = re.compile(r"""(["'`])(?:\\.|(?!\1).)*\1""")
+
+
+def _bracket_delta(line: str) -> int:
+    code = _STRING_LITERAL.sub("", line)
+    return sum(code.count(char) for char in "([{") - sum(code.count(char) for char in ")]}")
+
+
+def _split_source(text: str) -> list[str]:
+    """Split source text into top-level statements and the entries of top-level objects.
+
+    A chunk starts at every line at bracket depth 0 and at depth-1 lines that
+    open a nested block (``image: {``), so closing lines and short members stay
+    with their block. Long blocks are cut every ``MAX_CHUNK_LINES`` lines.
+    """
+    chunks: list[list[str]] = []
+    depth = 0
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        delta = _bracket_delta(line)
+        starts_block = depth <= 0 or (depth == 1 and delta > 0)
+        if not chunks or starts_block or len(chunks[-1]) >= MAX_CHUNK_LINES:
+            chunks.append([])
+        chunks[-1].append(line)
+        depth += delta
+    return ["\n".join(lines) for lines in chunks]
+
+
+def chunk_repo_context(repo_context: dict[str, Any]) -> list[Chunk]:
+    """Index list entries (``tree_hint``, ``existing_blocks``) one per chunk and text by top-level block."""
+    chunks: list[Chunk] = []
+    for key, value in repo_context.items():
+        if isinstance(value, list):
+            for index, item in enumerate(value):
+                text = item if isinstance(item, str) else json.dumps(item, ensure_ascii=False)
+                chunks.append(Chunk(key, index, text, item=item))
+            continue
+        text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, indent=2)
+        for index, piece in enumerate(_split_source(text)):
+            chunks.append(Chunk(key, index, piece))
+    for chunk in chunks:
+        chunk.terms = Counter(tokenize(chunk.text))
+    return chunks
+
+
+def bm25_scores(chunks: list[Chunk], query: str) -> list[float]:
+    query_terms = set(tokenize(query))
+    if not chunks or not query_terms:
+        return [0.0] * len(chunks)
+    average_length = sum(sum(chunk.terms.values()) for chunk in chunks) / len(chunks) or 1.0
+    document_frequency = Counter(term for chunk in chunks for term in query_terms & chunk.terms.keys())
+    idf = {
+        term: math.log(1 + (len(chunks) - count + 0.5) / (count + 0.5))
+        for term, count in document_frequency.items()
+    }
+    scores = []
+    for chunk in chunks:
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * sum(chunk.terms.values()) / average_length)
+        score = 0.0
+        for term, weight in idf.items():
+            frequency = chunk.terms.get(term, 0)
+            if frequency:
+                score += weight * frequency * (BM25_K1 + 1) / (frequency + length_norm)
+        scores.append(score)
+    return scores
+
+
+def _assemble(repo_context: dict[str, Any], selected: list[Chunk]) -> dict[str, Any]:
+    by_key: dict[str, list[Chunk]] = {}
+    for chunk in sorted(selected, key=lambda chunk: chunk.index):
+        by_key.setdefault(chunk.key, []).append(chunk)
+
+    packed: dict[str, Any] = {}
+    for key, value in repo_context.items():
+        chunks = by_key.get(key)
+        if not chunks:
+            continue
+        if isinstance(value, list):
+            packed[key] = [chunk.item for chunk in chunks]
+            continue
+        lines = [chunks[0].text]
+        for previous, chunk in zip(chunks, chunks[1:]):
+            if chunk.index != previous.index + 1:
+                lines.append(GAP_MARKER)
+            lines.append(chunk.text)
+        packed[key] = "\n".join(lines)
+    return packed
+
+
+def build_repo_context(repo_context: dict[str, Any] | None, query: str, budget: int) -> dict[str, Any]:
+    """Pick the chunks of ``repo_context`` most relevant to ``query`` that fit in ``budget`` tokens.
+
+    Chunks are ranked by BM25 against the query and packed greedily; chunks
+    scoring under ``MIN_RELATIVE_SCORE`` of the best one are left out. If nothing
+    matches, context is kept in document order up to the budget, like the old
+    truncation. The result has the shape of the input, with entries and blocks
+    in their original order.
+    """
+    if not repo_context:
+        return {}
+    chunks = chunk_repo_context(repo_context)
+    scores = bm25_scores(chunks, query)
+    best = max(scores, default=0.0)
+    matched = best > 0
+    if matched:
+        ranked = sorted(range(len(chunks)), key=lambda position: -scores[position])
+        candidates = [chunks[position] for position in ranked if scores[position] >= best * MIN_RELATIVE_SCORE]
+    else:
+        candidates = chunks
+
+    selected: list[Chunk] = []
+    keys: set[str] = set()
+    remaining = budget
+    for chunk in candidates:
+        # The first chunk of a key also pays for the key, and gaps for their marker.
+        cost = chunk.tokens + estimate_tokens(GAP_MARKER)
+        if chunk.key not in keys:
+            cost += estimate_tokens(json.dumps(chunk.key)) + 2
+        if cost > remaining:
+            if not matched:
+                break
+            continue
+        selected.append(chunk)
+        keys.add(chunk.key)
+        remaining -= cost
+    return _assemble(repo_context, selected)
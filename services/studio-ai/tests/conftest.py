@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import pytest
+
+from app.proposal_cache import proposal_cache
+
+STUB_PATCH = (
+    "diff --git a/src/studio/notes.md b/src/studio/notes.md\n"
+    "new file mode 100644\n"
+    "--- /dev/null\n"
+    "+++ b/src/studio/notes.md\n"
+    "@@ -0,0 +1 @@\n"
+    "+# Notes\n"
+)
+
+
+class CompletionStub:
+    """A local stand-in for the chat completions API that records every request."""
+
+    def __init__(self) -> None:
+        self.requests: list[dict[str, Any]] = []
+        self.patch = STUB_PATCH
+        self.delay_seconds = 0.0
+        # Answer this many requests with a 500 before succeeding.
+        self.failures = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.connections: set[tuple[str, int]] = set()
+        self.lock = threading.Lock()
+
+    def content(self) -> str:
+        return json.dumps({"patch": self.patch, "summary": "Add notes.", "warnings": [], "files": []})
+
+    def completion(self, body: dict[str, Any]) -> dict[str, Any]:
+        content = self.content()
+        return {
+            "id": f"chatcmpl-{len(self.requests)}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body.get("model", "stub"),
+            "choices": [
+                {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}
+            ],
+        }
+
+    def chunks(self, body: dict[str, Any], size: int = 7) -> Iterator[dict[str, Any]]:
+        """The content split into small ``chat.completion.chunk`` deltas."""
+        content = self.content()
+        for start in range(0, len(content), size):
+            yield {
+                "id": f"chatcmpl-{len(self.requests)}",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": body.get("model", "stub"),
+                "choices": [{"index": 0, "finish_reason": None, "delta": {"content": content[start : start + size]}}],
+            }
+
+
+@pytest.fixture
+def completion_stub(monkeypatch: pytest.MonkeyPatch) -> Iterator[CompletionStub]:
+    stub = CompletionStub()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+
+        def do_POST(self) -> None:  # noqa: N802 - http.server naming
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            with stub.lock:
+                stub.requests.append(body)
+                stub.connections.add(self.client_address)
+                stub.in_flight += 1
+                stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                failing = stub.failures > 0
+                stub.failures -= 1 if failing else 0
+            time.sleep(stub.delay_seconds)
+            with stub.lock:
+                stub.in_flight -= 1
+
+            if failing:
+                payload = json.dumps({"error": {"message": "upstream overloaded", "type": "server_error"}}).encode()
+                self.send_response(500)
+            elif body.get("stream"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for chunk in stub.chunks(body):
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+                return
+            else:
+                payload = json.dumps(stub.completion(body)).encode("utf-8")
+                self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    # Clients that time out hang up mid-response; that is expected here.
+    server.handle_error = lambda request, client_address: None  # type: ignore[method-assign]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    proposal_cache.clear()
+    try:
+        yield stub
+    finally:
+        server.shutdown()
+        server.server_close()
+        proposal_cache.clear()
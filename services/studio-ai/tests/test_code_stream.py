@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from conftest import STUB_PATCH, CompletionStub
+from fastapi.testclient import TestClient
+
+from app.code_proposer import PatchPathWatcher
+from app.main import app
+
+PAYLOAD = {"instruction": "Add a notes file", "target": "src/studio"}
+
+
+def _events(client: TestClient, headers: dict[str, str] | None = None) -> list[tuple[str, Any]]:
+    with client.stream("POST", "/v1/code/propose/stream", json=PAYLOAD, headers=headers or {}) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        text = "".join(response.iter_text())
+
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_stream_forwards_tokens_and_ends_with_the_proposal(completion_stub: CompletionStub) -> None:
+    completion_stub.patch = STUB_PATCH + (
+        "diff --git a/src/components/Panel.tsx b/src/components/Panel.tsx\n"
+        "--- a/src/components/Panel.tsx\n"
+        "+++ b/src/components/Panel.tsx\n"
+        "@@ -1 +1 @@\n"
+        "-export {}\n"
+        "+export const Panel = () => null\n"
+    )
+    with TestClient(app) as client:
+        events = _events(client)
+
+    names = [name for name, _ in events]
+    assert names[0] == "start" and events[0][1] == {"cache": "miss"}
+    assert names[-1] == "result"
+    assert completion_stub.requests[0]["stream"] is True
+
+    tokens = "".join(data["delta"] for name, data in events if name == "token")
+    assert tokens == completion_stub.content()
+
+    # Files are announced as their headers complete, before the stream ends.
+    files_events = [(index, data["files"]) for index, (name, data) in enumerate(events) if name == "files"]
+    assert [files for _, files in files_events] == [
+        ["src/studio/notes.md"],
+        ["src/studio/notes.md", "src/components/Panel.tsx"],
+    ]
+    assert files_events[0][0] < names.index("token", files_events[0][0]) < files_events[1][0]
+
+    result = events[-1][1]
+    assert result["patch"] == completion_stub.patch.strip()
+    assert result["files"] == ["src/studio/notes.md", "src/components/Panel.tsx"]
+
+
+def test_stream_replays_cached_proposals_without_a_completion(completion_stub: CompletionStub) -> None:
+    with TestClient(app) as client:
+        first = client.post("/v1/code/propose", json=PAYLOAD).json()
+        events = _events(client)
+        bypassed = _events(client, {"Cache-Control": "no-cache"})
+
+    assert [name for name, _ in events] == ["start", "files", "result"]
+    assert events[0][1] == {"cache": "hit"}
+    assert events[-1][1]["patch"] == first["patch"]
+    assert events[-1][1]["proposal_id"] != first["proposal_id"]
+    assert bypassed[0][1] == {"cache": "bypass"}
+    assert len(completion_stub.requests) == 2
+
+
+def test_stream_without_api_key_returns_the_fallback(monkeypatch) -> None:
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    with TestClient(app) as client:
+        events = _events(client)
+        invalid = client.post("/v1/code/propose/stream", json={"instruction": ""})
+
+    assert [name for name, _ in events] == ["start", "result"]
+    assert events[-1][1]["files"] == ["src/studio/ai-proposals.md"]
+    assert invalid.status_code == 422
+
+
+def test_patch_watcher_handles_escapes_split_across_chunks() -> None:
+    content = json.dumps(
+        {
+            "summary": "+++ b/not/a/patch.md\n",
+            "patch": "diff --git a/src/studio/été.md b/src/studio/été.md\n+++ b/src/studio/été.md\n",
+            "files": [],
+        }
+    )
+    watcher = PatchPathWatcher()
+    found = [watcher.feed(content[index : index + 3]) for index in range(0, len(content), 3)]
+
+    assert watcher.files == ["src/studio/été.md"]
+    assert found.count(True) == 1
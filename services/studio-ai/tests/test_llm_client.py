@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from conftest import CompletionStub
+
+from app import llm_client
+from app.code_proposer import propose_code
+from app.models import CodeProposeRequest, CodeProposeResponse
+
+
+def _request(index: int) -> CodeProposeRequest:
+    return CodeProposeRequest(instruction=f"Add studio note number {index}", target="src/studio")
+
+
+async def _propose_concurrently(count: int) -> list[str]:
+    try:
+        responses = await asyncio.gather(*(propose_code(_request(index)) for index in range(count)))
+    finally:
+        await llm_client.close_llm_clients()
+    return [response.summary for response in responses]
+
+
+async def _propose_one() -> CodeProposeResponse:
+    try:
+        return await propose_code(_request(0))
+    finally:
+        await llm_client.close_llm_clients()
+
+
+def test_concurrency_is_capped_and_connections_reused(
+    completion_stub: CompletionStub, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("LLM_MAX_CONCURRENCY", "2")
+    completion_stub.delay_seconds = 0.05
+
+    summaries = asyncio.run(_propose_concurrently(6))
+
+    assert summaries == ["Add notes."] * 6
+    assert completion_stub.max_in_flight == 2
+    # Six requests over at most two kept-alive connections.
+    assert len(completion_stub.connections) <= 2
+
+
+def test_server_errors_are_retried(completion_stub: CompletionStub, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(llm_client, "retry_delay", lambda attempt: 0.0)
+    completion_stub.failures = 2
+
+    assert asyncio.run(_propose_concurrently(1)) == ["Add notes."]
+    assert len(completion_stub.requests) == 3
+
+
+def test_gives_up_after_max_retries(completion_stub: CompletionStub, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(llm_client, "retry_delay", lambda attempt: 0.0)
+    monkeypatch.setenv("LLM_MAX_RETRIES", "1")
+    completion_stub.failures = 5
+
+    response = asyncio.run(_propose_one())
+
+    assert response.warnings[0].startswith("OpenAI request failed")
+    assert len(completion_stub.requests) == 2
+
+
+def test_slow_completions_time_out(completion_stub: CompletionStub, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LLM_TIMEOUT_SECONDS", "0.1")
+    monkeypatch.setenv("LLM_MAX_RETRIES", "0")
+    completion_stub.delay_seconds = 0.5
+
+    response = asyncio.run(_propose_one())
+
+    assert "timed out" in response.warnings[0].lower()
+
+
+def test_retry_delay_is_jittered_and_capped() -> None:
+    delays = [llm_client.retry_delay(attempt) for attempt in range(10) for _ in range(20)]
+
+    assert all(0 <= delay <= llm_client.RETRY_CAP_SECONDS for delay in delays)
+    assert len(set(delays)) > 1
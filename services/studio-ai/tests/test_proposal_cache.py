@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import CodeProposeResponse
+from app.proposal_cache import ProposalCache, proposal_cache_key
+
+from conftest import CompletionStub
+
+client = TestClient(app)
+
+
+def _propose(instruction: str = "Add a note in studio docs", **headers: str) -> tuple[str, dict]:
+    response = client.post(
+        "/v1/code/propose",
+        json={"instruction": instruction, "target": "src/studio", "repo_context": {"tree_hint": ["src/studio"]}},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    return response.headers["x-proposal-cache"], response.json()
+
+
+def test_key_ignores_whitespace_and_key_order() -> None:
+    base = proposal_cache_key("Add  a note\n", "src/studio", {"a": 1, "b": [2]}, "gpt-4o-mini", 1, 2000, 1)
+
+    assert base == proposal_cache_key("Add a note", " src/studio ", {"b": [2], "a": 1}, "gpt-4o-mini", 1, 2000, 1)
+    assert base != proposal_cache_key("Add a note", "src/studio", {"a": 1, "b": [2]}, "gpt-4o", 1, 2000, 1)
+    assert base != proposal_cache_key("Add a note", "src/studio", {"a": 1, "b": [2]}, "gpt-4o-mini", 2, 2000, 1)
+    assert base != proposal_cache_key("Add a note", "src/studio", {"a": 1, "b": [2]}, "gpt-4o-mini", 1, 500, 1)
+    assert base != proposal_cache_key("Add a note", "src/studio", {"a": 1, "b": [2]}, "gpt-4o-mini", 1, 2000, 2)
+
+
+def test_entries_expire_and_least_recently_used_are_evicted() -> None:
+    now = [0.0]
+    cache = ProposalCache(max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+    proposal = CodeProposeResponse(proposal_id="p", patch="diff --git a b", summary="s")
+
+    cache.put("a", proposal)
+    cache.put("b", proposal)
+    assert cache.get("a") is proposal
+    cache.put("c", proposal)  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    now[0] = 10.0
+    assert cache.get("a") is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "expired": 1, "evictions": 1, "stores": 3, "entries": 1}
+
+
+def test_repeated_proposals_are_served_from_cache(completion_stub: CompletionStub) -> None:
+    first_status, first = _propose()
+    second_status, second = _propose("Add a note   in studio docs")
+
+    assert (first_status, second_status) == ("miss", "hit")
+    assert len(completion_stub.requests) == 1
+    assert second["patch"] == first["patch"] and second["files"] == ["src/studio/notes.md"]
+    assert second["proposal_id"] != first["proposal_id"]
+
+    bypass_status, _ = _propose(**{"Cache-Control": "no-cache"})
+    assert bypass_status == "bypass"
+    assert len(completion_stub.requests) == 2
+
+
+def test_context_budget_change_misses_the_cache(completion_stub: CompletionStub, monkeypatch) -> None:
+    assert _propose()[0] == "miss"
+    monkeypatch.setenv("REPO_CONTEXT_TOKEN_BUDGET", "500")
+
+    assert _propose()[0] == "miss"
+    assert len(completion_stub.requests) == 2
+
+
+def test_placeholder_proposals_are_not_cached(completion_stub: CompletionStub) -> None:
+    completion_stub.patch = "not a diff"
+
+    assert _propose()[0] == "miss"
+    assert _propose()[0] == "miss"
+    assert len(completion_stub.requests) == 2
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import json
+
+from conftest import CompletionStub
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.repo_context import GAP_MARKER, build_repo_context, chunk_repo_context, estimate_tokens
+
+REGISTRY = """import { z } from "zod";
+import {
+  imageBlockPropsSchema,
+  textBlockPropsSchema
+} from "@/studio/types";
+
+export const studioBlockRegistry = {
+  text: {
+    label: "Text",
+    propsSchema: textBlockPropsSchema,
+    defaultProps: { text: "New text block", align: "left" }
+  },
+  image: {
+    label: "Image",
+    propsSchema: imageBlockPropsSchema,
+    defaultProps: { src: "", alt: "" }
+  },
+  qrCode: {
+    label: "QR code",
+    propsSchema: qrCodeBlockPropsSchema,
+    defaultProps: { value: "https://example.com", sizeMm: 20 }
+  }
+};
+"""
+
+CONTEXT = {
+    "block_registry_excerpt": REGISTRY,
+    "existing_blocks": ["TextBlock.tsx", "ImageBlock.tsx", "QrCodeBlock.tsx"],
+    "tree_hint": ["src/studio/blocks", "src/studio/registry.ts", "app/(studio)/studio/page.tsx"],
+}
+
+
+def test_registry_is_chunked_by_top_level_entry() -> None:
+    chunks = [chunk.text for chunk in chunk_repo_context({"registry": REGISTRY})]
+
+    assert chunks[1].startswith("import {") and chunks[1].endswith('} from "@/studio/types";')
+    assert [chunk.split(":")[0].strip() for chunk in chunks[3:]] == ["text", "image", "qrCode"]
+    assert chunks[-1].endswith("};")
+
+
+def test_most_relevant_chunks_are_packed_in_original_order() -> None:
+    packed = build_repo_context(CONTEXT, "Align the text block like the QR code block", budget=200)
+
+    registry = packed["block_registry_excerpt"]
+    assert "image: {" not in registry
+    text_at = registry.index("text: {")
+    assert text_at < registry.index(GAP_MARKER, text_at) < registry.index("qrCode: {")
+    assert packed["existing_blocks"] == ["TextBlock.tsx", "QrCodeBlock.tsx"]
+    assert list(packed) == [key for key in CONTEXT if key in packed]
+    assert estimate_tokens(json.dumps(packed)) <= 200
+
+    tight = build_repo_context(CONTEXT, "Make the QR code block default to a larger size", budget=80)
+    assert tight["block_registry_excerpt"].lstrip().startswith("qrCode: {")
+    assert tight["existing_blocks"] == ["QrCodeBlock.tsx"]
+
+
+def test_unrelated_instructions_keep_context_in_document_order() -> None:
+    packed = build_repo_context(CONTEXT, "zzz qwerty", budget=40)
+
+    assert REGISTRY.startswith(packed["block_registry_excerpt"])
+    assert "tree_hint" not in packed
+    assert build_repo_context(None, "anything", budget=40) == {}
+
+
+def test_prompt_carries_the_packed_context(completion_stub: CompletionStub, monkeypatch) -> None:
+    monkeypatch.setenv("REPO_CONTEXT_TOKEN_BUDGET", "80")
+    with TestClient(app) as client:
+        response = client.post(
+            "/v1/code/propose",
+            json={"instruction": "Make the QR code block default to a larger size", "repo_context": CONTEXT},
+        )
+
+    assert response.status_code == 200
+    user_prompt = json.loads(completion_stub.requests[0]["messages"][1]["content"])
+    excerpt = json.loads(user_prompt["repo_context_excerpt"])
+    assert excerpt["existing_blocks"] == ["QrCodeBlock.tsx"]
+    assert len(user_prompt["repo_context_excerpt"]) < len(json.dumps(CONTEXT))
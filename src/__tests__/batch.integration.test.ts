@@ -1,16 +1,20 @@
 import { createBatchRun, retryFailed } from "@/services/batch.service";
 import { prisma } from "@/lib/prisma";
 
-jest.mock("@/lib/prisma", () => ({
-  prisma: {
+jest.mock("@/lib/prisma", () => {
+  const prisma = {
     template: { findUnique: jest.fn() },
     productProfile: { findUnique: jest.fn() },
     batchRun: { create: jest.fn(), update: jest.fn(), findUnique: jest.fn() },
     batchRunItem: { create: jest.fn(), findMany: jest.fn() },
     designJob: { create: jest.fn() },
-    auditLog: { create: jest.fn() }
-  }
-}));
+    auditLog: { create: jest.fn() },
+    $queryRaw: jest.fn(async () => []),
+    $executeRaw: jest.fn(async () => 1),
+    $transaction: jest.fn(async (run: (tx: unknown) => unknown) => run(prisma))
+  };
+  return { prisma };
+});
 
 describe("batch integration", () => {
   it("handles mixed valid/invalid rows and retry failed path", async () => {
@@ -41,4 +45,30 @@ describe("batch integration", () => {
     const retry = await retryFailed("batch_1");
     expect(retry.id).toBe("batch_1");
   });
+
+  it("queues policy-resolved items for the worker when BATCH_EXECUTION=worker", async () => {
+    process.env.BATCH_EXECUTION = "worker";
+    (prisma.batchRunItem.create as jest.Mock).mockClear();
+    (prisma.batchRun.update as jest.Mock).mockClear();
+    (prisma.designJob.create as jest.Mock).mockClear();
+
+    try {
+      const run = await createBatchRun({
+        templateId: "tpl_1",
+        productProfileId: "prod_1",
+        mapping: { first_name: "FirstName" },
+        csvContent: ["FirstName,Note", "Alice,ok", ",missing name"].join("\n")
+      });
+
+      expect(run.id).toBe("batch_1");
+      const items = (prisma.batchRunItem.create as jest.Mock).mock.calls.map(([{ data }]) => data);
+      expect(items.map((item) => item.status)).toEqual(["queued", "failed"]);
+      expect(items[0].placementJson.objects[0].text).toBe("Alice");
+      expect(items[0].placementHash).toEqual(expect.any(String));
+      expect(prisma.designJob.create).not.toHaveBeenCalled();
+      expect(prisma.batchRun.update).not.toHaveBeenCalled();
+    } finally {
+      delete process.env.BATCH_EXECUTION;
+    }
+  });
 });
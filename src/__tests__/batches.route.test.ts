@@ -5,16 +5,20 @@ import { GET as getErrorsCsv } from "@/app/api/batches/[id]/errors.csv/route";
 import { POST as retryFailed } from "@/app/api/batches/[id]/retry-failed/route";
 import { prisma } from "@/lib/prisma";
 
-jest.mock("@/lib/prisma", () => ({
-  prisma: {
+jest.mock("@/lib/prisma", () => {
+  const prisma = {
     template: { findUnique: jest.fn() },
     productProfile: { findUnique: jest.fn() },
     batchRun: { create: jest.fn(), update: jest.fn(), findUnique: jest.fn() },
     batchRunItem: { create: jest.fn(), findMany: jest.fn() },
     designJob: { create: jest.fn() },
-    auditLog: { create: jest.fn() }
-  }
-}));
+    auditLog: { create: jest.fn() },
+    $queryRaw: jest.fn(async () => []),
+    $executeRaw: jest.fn(async () => 1),
+    $transaction: jest.fn(async (run: (tx: unknown) => unknown) => run(prisma))
+  };
+  return { prisma };
+});
 
 describe("batches API", () => {
   beforeEach(() => jest.clearAllMocks());
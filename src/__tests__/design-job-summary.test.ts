@@ -0,0 +1,79 @@
+import { createDesignJob, updateDesignJobPlacement } from "@/services/design-job.service";
+import { prisma } from "@/lib/prisma";
+
+jest.mock("@/lib/prisma", () => {
+  // Writes must go through the transaction client, never the top-level client.
+  const tx = {
+    designJob: { create: jest.fn(), update: jest.fn() },
+    $queryRaw: jest.fn(),
+    $executeRaw: jest.fn(async () => 1)
+  };
+  return {
+    prisma: {
+      productProfile: { findUnique: jest.fn() },
+      machineProfile: { findUnique: jest.fn() },
+      designJob: { findUnique: jest.fn() },
+      $transaction: jest.fn(async (run: (client: typeof tx) => unknown) => run(tx)),
+      tx
+    }
+  };
+});
+
+type TxMock = {
+  designJob: { create: jest.Mock; update: jest.Mock };
+  $queryRaw: jest.Mock;
+  $executeRaw: jest.Mock;
+};
+
+const tx = (prisma as unknown as { tx: TxMock }).tx;
+
+const placementJson = {
+  version: 2,
+  canvas: { widthMm: 50, heightMm: 50 },
+  machine: { strokeWidthWarningThresholdMm: 0.1 },
+  objects: []
+};
+
+// Values bound into each summary upsert: productProfileId, status, preflightOutcome, delta.
+function summaryUpserts() {
+  return tx.$executeRaw.mock.calls.map(([, ...values]) => values);
+}
+
+describe("design job summary", () => {
+  beforeEach(() => {
+    jest.clearAllMocks();
+  });
+
+  it("counts a created job in the same transaction", async () => {
+    (prisma.productProfile.findUnique as jest.Mock).mockResolvedValue({ id: "prod_1" });
+    (prisma.machineProfile.findUnique as jest.Mock).mockResolvedValue({ id: "mach_1" });
+    tx.designJob.create.mockResolvedValue({ id: "job_1", productProfileId: "prod_1", status: "draft", preflightStatus: null });
+
+    await createDesignJob({ productProfileId: "prod_1", machineProfileId: "mach_1", placementJson });
+
+    expect(prisma.$transaction).toHaveBeenCalledTimes(1);
+    expect(summaryUpserts()).toEqual([["prod_1", "draft", "unchecked", 1]]);
+  });
+
+  it("moves a re-placed job from its preflight outcome back to unchecked", async () => {
+    (prisma.designJob.findUnique as jest.Mock).mockResolvedValue({ id: "job_1" });
+    tx.$queryRaw.mockResolvedValue([{ productProfileId: "prod_1", status: "approved", preflightStatus: "fail" }]);
+    tx.designJob.update.mockResolvedValue({
+      id: "job_1",
+      productProfileId: "prod_1",
+      status: "approved",
+      preflightStatus: null,
+      placementJson
+    });
+
+    await updateDesignJobPlacement("job_1", { placementJson });
+
+    expect(tx.designJob.update).toHaveBeenCalledWith(
+      expect.objectContaining({ data: expect.objectContaining({ preflightStatus: null, preflightCheckedAt: null }) })
+    );
+    expect(summaryUpserts()).toEqual([
+      ["prod_1", "approved", "fail", -1],
+      ["prod_1", "approved", "unchecked", 1]
+    ]);
+  });
+});
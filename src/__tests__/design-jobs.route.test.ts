@@ -2,13 +2,17 @@ import { POST } from "@/app/api/design-jobs/route";
 import { PATCH } from "@/app/api/design-jobs/[id]/route";
 import { prisma } from "@/lib/prisma";
 
-jest.mock("@/lib/prisma", () => ({
-  prisma: {
+jest.mock("@/lib/prisma", () => {
+  const prisma = {
     productProfile: { findUnique: jest.fn() },
     machineProfile: { findUnique: jest.fn() },
-    designJob: { create: jest.fn(), findUnique: jest.fn(), update: jest.fn() }
-  }
-}));
+    designJob: { create: jest.fn(), findUnique: jest.fn(), update: jest.fn() },
+    $queryRaw: jest.fn(async () => []),
+    $executeRaw: jest.fn(async () => 1),
+    $transaction: jest.fn(async (run: (tx: unknown) => unknown) => run(prisma))
+  };
+  return { prisma };
+});
 
 describe("design-jobs routes", () => {
   beforeEach(() => {
@@ -63,8 +67,12 @@ describe("design-jobs routes", () => {
 
   it("PATCH /api/design-jobs/:id updates only placement payload", async () => {
     (prisma.designJob.findUnique as jest.Mock).mockResolvedValue({ id: "job_123" });
+    (prisma.$queryRaw as jest.Mock).mockResolvedValueOnce([{ productProfileId: "prod_1", status: "draft", preflightStatus: "pass" }]);
     (prisma.designJob.update as jest.Mock).mockResolvedValue({
       id: "job_123",
+      productProfileId: "prod_1",
+      status: "draft",
+      preflightStatus: null,
       placementJson: {
         version: 2,
         canvas: { widthMm: 65, heightMm: 40 },
@@ -93,7 +101,7 @@ describe("design-jobs routes", () => {
     expect(res.status).toBe(200);
     expect(prisma.designJob.update).toHaveBeenCalledWith(
       expect.objectContaining({
-        data: { placementJson: expect.any(Object) }
+        data: { placementJson: expect.any(Object), preflightStatus: null, preflightCheckedAt: null }
       })
     );
 
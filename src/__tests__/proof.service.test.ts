@@ -1,13 +1,17 @@
 import JSZip from "jszip";
 
-jest.mock("@/lib/prisma", () => ({
-  prisma: {
+jest.mock("@/lib/prisma", () => {
+  const prisma = {
     designJob: {
       findUnique: jest.fn(),
       update: jest.fn()
-    }
-  }
-}));
+    },
+    $queryRaw: jest.fn(async () => []),
+    $executeRaw: jest.fn(async () => 1),
+    $transaction: jest.fn(async (run: (tx: unknown) => unknown) => run(prisma))
+  };
+  return { prisma };
+});
 
 jest.mock("@/lib/tracer-asset-store", () => ({
   readTracerAsset: jest.fn(),
@@ -65,7 +69,8 @@ describe("proof service", () => {
         stepMm: 20
       }
     });
-    (prisma.designJob.update as jest.Mock).mockResolvedValue({});
+    (prisma.$queryRaw as jest.Mock).mockResolvedValueOnce([{ productProfileId: "prod_1", status: "draft", preflightStatus: null }]);
+    (prisma.designJob.update as jest.Mock).mockResolvedValue({ productProfileId: "prod_1", status: "exported", preflightStatus: null });
     (readTracerAsset as jest.Mock).mockResolvedValue({ buffer: Buffer.from('<svg xmlns="http://www.w3.org/2000/svg"><rect width="20" height="10"/></svg>') });
     (createTracerAsset as jest.Mock)
       .mockResolvedValueOnce({ id: "proof_png", url: "/api/tracer/assets/proof_png" })
@@ -3,14 +3,18 @@ import { GET as getTemplate, PATCH } from "@/app/api/templates/[id]/route";
 import { POST as applyTemplate } from "@/app/api/templates/[id]/apply/route";
 import { prisma } from "@/lib/prisma";
 
-jest.mock("@/lib/prisma", () => ({
-  prisma: {
+jest.mock("@/lib/prisma", () => {
+  const prisma = {
     template: { create: jest.fn(), findMany: jest.fn(), findUnique: jest.fn(), update: jest.fn() },
     productProfile: { findUnique: jest.fn() },
     designJob: { update: jest.fn() },
-    auditLog: { create: jest.fn() }
-  }
-}));
+    auditLog: { create: jest.fn() },
+    $queryRaw: jest.fn(async () => []),
+    $executeRaw: jest.fn(async () => 1),
+    $transaction: jest.fn(async (run: (tx: unknown) => unknown) => run(prisma))
+  };
+  return { prisma };
+});
 
 describe("templates API", () => {
   beforeEach(() => jest.clearAllMocks());
@@ -36,7 +40,8 @@ describe("templates API", () => {
     (prisma.template.findUnique as jest.Mock).mockResolvedValue({ id: "tpl_1", productProfileId: null, placementDocument: {}, tokenDefinitions: [], version: 1, templateHash: "x" });
     (prisma.template.update as jest.Mock).mockResolvedValue({ id: "tpl_1", tokenDefinitions: [] });
     (prisma.productProfile.findUnique as jest.Mock).mockResolvedValue({ id: "prod_1", engraveZoneWidthMm: 100, engraveZoneHeightMm: 100 });
-    (prisma.designJob.update as jest.Mock).mockResolvedValue({ id: "job_1" });
+    (prisma.$queryRaw as jest.Mock).mockResolvedValueOnce([{ productProfileId: "prod_1", status: "draft", preflightStatus: null }]);
+    (prisma.designJob.update as jest.Mock).mockResolvedValue({ id: "job_1", productProfileId: "prod_1", status: "draft", preflightStatus: null });
     (prisma.auditLog.create as jest.Mock).mockResolvedValue({});
 
     expect((await getTemplate(new Request("http://localhost"), { params: Promise.resolve({ id: "tpl_1" }) })).status).toBe(200);
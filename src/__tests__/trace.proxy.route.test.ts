@@ -0,0 +1,48 @@
+const TINY_PNG = Buffer.from(
+  "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mP8/x8AAwMCAO7Z0t8AAAAASUVORK5CYII=",
+  "base64"
+);
+
+describe("trace proxy route", () => {
+  const originalFetch = global.fetch;
+
+  beforeEach(() => {
+    process.env.PY_API_URL = "http://py-api:8000";
+    jest.resetModules();
+  });
+
+  afterEach(() => {
+    global.fetch = originalFetch;
+  });
+
+  it("forwards trace options and the trace diagnostics headers", async () => {
+    const fetchMock = jest.fn().mockResolvedValue(
+      new Response("<svg/>", {
+        status: 200,
+        headers: {
+          "content-type": "image/svg+xml",
+          "server-timing": "decode;dur=1.0",
+          "x-trace-scale": "0.5000",
+          "x-trace-tiles": "4",
+          "x-embed-bytes": "120",
+          "x-internal-debug": "1"
+        }
+      })
+    );
+    global.fetch = fetchMock as unknown as typeof fetch;
+    const { POST } = await import("@/app/api/trace/route");
+
+    const form = new FormData();
+    form.append("file", new File([TINY_PNG], "tiny.png", { type: "image/png" }));
+    form.append("tile_size", "512");
+    const res = await POST(new Request("http://localhost/api/trace", { method: "POST", body: form }));
+
+    const outbound = fetchMock.mock.calls[0][1].body as FormData;
+    expect(outbound.get("tile_size")).toBe("512");
+    expect(res.headers.get("x-trace-scale")).toBe("0.5000");
+    expect(res.headers.get("x-trace-tiles")).toBe("4");
+    expect(res.headers.get("x-embed-bytes")).toBe("120");
+    expect(res.headers.get("server-timing")).toBe("decode;dur=1.0");
+    expect(res.headers.get("x-internal-debug")).toBeNull();
+  });
+});
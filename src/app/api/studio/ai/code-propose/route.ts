@@ -59,9 +59,11 @@ export async function POST(request: Request) {
     }
 
     const repoContext = await loadRepoContext();
+    // "Cache-Control: no-cache" asks studio-ai for a fresh proposal instead of a cached one.
+    const cacheControl = request.headers.get("cache-control");
     const upstream = await fetch(`${upstreamUrl}/v1/code/propose`, {
       method: "POST",
-      headers: { "content-type": "application/json" },
+      headers: { "content-type": "application/json", ...(cacheControl ? { "cache-control": cacheControl } : {}) },
       body: JSON.stringify({
         instruction: body.instruction,
         target: body.target,
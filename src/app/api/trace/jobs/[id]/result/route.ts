@@ -0,0 +1,26 @@
+import { NextResponse } from 'next/server';
+
+export const runtime = 'nodejs';
+
+const PY_API_URL = process.env.PY_API_URL;
+
+export async function GET(_request: Request, { params }: { params: Promise<{ id: string }> }): Promise<Response> {
+  if (!PY_API_URL) {
+    return NextResponse.json(
+      { error: 'PY_API_URL is not configured on the app service.' },
+      { status: 500 },
+    );
+  }
+
+  const { id } = await params;
+  const pyResponse = await fetch(new URL(`/trace/jobs/${encodeURIComponent(id)}/result`, PY_API_URL), {
+    cache: 'no-store',
+  });
+
+  return new Response(pyResponse.body, {
+    status: pyResponse.status,
+    headers: {
+      'content-type': pyResponse.headers.get('content-type') ?? 'image/svg+xml',
+    },
+  });
+}
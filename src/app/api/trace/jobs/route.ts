@@ -0,0 +1,44 @@
+import { NextResponse } from 'next/server';
+
+import { FORWARDED_FIELDS } from '@/lib/trace-proxy';
+
+export const runtime = 'nodejs';
+
+const PY_API_URL = process.env.PY_API_URL;
+
+export async function POST(request: Request): Promise<Response> {
+  if (!PY_API_URL) {
+    return NextResponse.json(
+      { error: 'PY_API_URL is not configured on the app service.' },
+      { status: 500 },
+    );
+  }
+
+  const inbound = await request.formData();
+  const file = inbound.get('file');
+  if (!(file instanceof File)) {
+    return NextResponse.json({ error: 'Missing multipart file field: file' }, { status: 400 });
+  }
+
+  const outbound = new FormData();
+  outbound.append('file', file, file.name || 'upload');
+
+  for (const field of FORWARDED_FIELDS) {
+    const value = inbound.get(field);
+    if (typeof value === 'string' && value.length > 0) {
+      outbound.append(field, value);
+    }
+  }
+
+  const pyResponse = await fetch(new URL('/trace/jobs', PY_API_URL), {
+    method: 'POST',
+    body: outbound,
+  });
+
+  return new Response(await pyResponse.text(), {
+    status: pyResponse.status,
+    headers: {
+      'content-type': pyResponse.headers.get('content-type') ?? 'application/json',
+    },
+  });
+}
@@ -3,9 +3,13 @@ import path from 'node:path';
 
 import { NextResponse } from 'next/server';
 
+import { FORWARDED_FIELDS } from '@/lib/trace-proxy';
+
 export const runtime = 'nodejs';
 
 const PY_API_URL = process.env.PY_API_URL;
+// Trace diagnostics (X-Trace-Scale, X-Trace-Cache, X-Embed-Bytes, ...) and stage timings.
+const FORWARDED_RESPONSE_HEADER = /^(x-trace-|x-embed-|server-timing$)/i;
 
 function safeSlug(input: string): string {
   return input.replace(/[^a-zA-Z0-9_-]/g, '-').slice(0, 120);
@@ -28,14 +32,11 @@ export async function POST(request: Request): Promise<Response> {
   const outbound = new FormData();
   outbound.append('file', file, file.name || 'upload');
 
-  const mode = inbound.get('mode');
-  if (typeof mode === 'string' && mode.length > 0) {
-    outbound.append('mode', mode);
-  }
-
-  const simplify = inbound.get('simplify');
-  if (typeof simplify === 'string' && simplify.length > 0) {
-    outbound.append('simplify', simplify);
+  for (const field of FORWARDED_FIELDS) {
+    const value = inbound.get(field);
+    if (typeof value === 'string' && value.length > 0) {
+      outbound.append(field, value);
+    }
   }
 
   const pyResponse = await fetch(new URL('/trace', PY_API_URL), {
@@ -66,10 +67,15 @@ export async function POST(request: Request): Promise<Response> {
     }
   }
 
+  const headers: Record<string, string> = { 'content-type': contentType };
+  pyResponse.headers.forEach((value, name) => {
+    if (FORWARDED_RESPONSE_HEADER.test(name)) {
+      headers[name] = value;
+    }
+  });
+
   return new Response(responseBody, {
     status: pyResponse.status,
-    headers: {
-      'content-type': contentType,
-    },
+    headers,
   });
 }
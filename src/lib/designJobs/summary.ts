@@ -0,0 +1,58 @@
+import type { Prisma } from "@prisma/client";
+
+// Mirrors python_api/app/job_summary.py: every DesignJob write that creates a job or
+// moves it between (productProfileId, status, preflight outcome) buckets applies its
+// +1/-1 deltas to "DesignJobSummary" inside the same transaction as the job write.
+export const UNCHECKED_PREFLIGHT = "unchecked";
+
+export type SummaryJob = {
+  productProfileId: string;
+  status: string;
+  preflightStatus?: string | null;
+};
+
+export type SummaryKey = readonly [productProfileId: string, status: string, preflightOutcome: string];
+
+export function summaryKey(job: SummaryJob): SummaryKey {
+  return [job.productProfileId, job.status, job.preflightStatus ?? UNCHECKED_PREFLIGHT];
+}
+
+function compareKeys(a: SummaryKey, b: SummaryKey) {
+  for (let i = 0; i < a.length; i += 1) {
+    if (a[i] !== b[i]) return a[i] < b[i] ? -1 : 1;
+  }
+  return 0;
+}
+
+export async function applySummaryDeltas(tx: Prisma.TransactionClient, deltas: Array<[SummaryKey, number]>) {
+  // Sorted so concurrent transactions lock summary rows in the same order.
+  const rows = deltas.filter(([, delta]) => delta !== 0).sort(([a], [b]) => compareKeys(a, b));
+  for (const [[productProfileId, status, preflightOutcome], delta] of rows) {
+    await tx.$executeRaw`
+      INSERT INTO "DesignJobSummary" ("productProfileId", "status", "preflightOutcome", "jobCount", "updatedAt")
+      VALUES (${productProfileId}, ${status}::"DesignJobStatus", ${preflightOutcome}, ${delta}, CURRENT_TIMESTAMP)
+      ON CONFLICT ("productProfileId", "status", "preflightOutcome")
+      DO UPDATE SET "jobCount" = "DesignJobSummary"."jobCount" + EXCLUDED."jobCount", "updatedAt" = EXCLUDED."updatedAt"`;
+  }
+}
+
+// `null` means the job did not exist (before) or was removed (after).
+export async function recordJobChange(tx: Prisma.TransactionClient, before: SummaryJob | null, after: SummaryJob | null) {
+  const beforeKey = before ? summaryKey(before) : null;
+  const afterKey = after ? summaryKey(after) : null;
+  if (beforeKey && afterKey && compareKeys(beforeKey, afterKey) === 0) return;
+
+  const deltas: Array<[SummaryKey, number]> = [];
+  if (beforeKey) deltas.push([beforeKey, -1]);
+  if (afterKey) deltas.push([afterKey, 1]);
+  await applySummaryDeltas(tx, deltas);
+}
+
+// Locks the job row until the transaction ends, so the bucket read here is the one the
+// following update moves the job out of.
+export async function lockSummaryJob(tx: Prisma.TransactionClient, id: string): Promise<SummaryJob | null> {
+  const rows = await tx.$queryRaw<SummaryJob[]>`
+    SELECT "productProfileId", "status"::text AS "status", "preflightStatus"::text AS "preflightStatus"
+    FROM "DesignJob" WHERE "id" = ${id} FOR UPDATE`;
+  return rows[0] ?? null;
+}
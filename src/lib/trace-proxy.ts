@@ -0,0 +1,17 @@
+// Multipart fields the app's trace routes pass through to the Python trace
+// service; /api/trace and /api/trace/jobs accept the same options.
+export const FORWARDED_FIELDS = [
+  'mode',
+  'simplify',
+  'target_width_mm',
+  'target_height_mm',
+  'dpi',
+  'preprocess',
+  'quantize_levels',
+  'compare',
+  'embed_color',
+  'compact',
+  'precision',
+  'min_area',
+  'tile_size'
+] as const;
@@ -8,10 +8,19 @@ import type { TokenDefinition } from "@/lib/vdp";
 import { resolveTokensForObject, validateTokenValues } from "@/lib/vdp";
 import { renderProofImage } from "./proof-renderer.service";
 import { fingerprint } from "@/lib/canonical";
+import { recordJobChange } from "@/lib/designJobs/summary";
 import { logAudit } from "./audit.service";
 
 const MAX_ROWS = Number(process.env.BATCH_MAX_ROWS ?? "500");
 const MAX_CSV_BYTES = Number(process.env.CSV_MAX_SIZE_BYTES ?? "1048576");
+export const DEFAULT_BATCH_MACHINE_PROFILE_ID = "fiber-galvo-300-lens-default";
+
+// With BATCH_EXECUTION=worker, rows that pass token validation and the placement
+// policy are stored as queued items carrying the policy-resolved document, and the
+// python_api batch worker creates and exports their jobs.
+function queuesForWorker() {
+  return process.env.BATCH_EXECUTION === "worker";
+}
 
 export async function createBatchRun(rawInput: unknown) {
   const input = createBatchSchema.parse(rawInput);
@@ -25,6 +34,7 @@ export async function createBatchRun(rawInput: unknown) {
   const parsed = parseCsv(input.csvContent);
   if (parsed.rows.length > MAX_ROWS) throw new AppError(`CSV exceeds max rows (${MAX_ROWS})`, 400, "ROW_LIMIT_EXCEEDED");
 
+  const queued = queuesForWorker();
   const batch = await prisma.batchRun.create({
     data: {
       templateId: input.templateId,
@@ -33,11 +43,12 @@ export async function createBatchRun(rawInput: unknown) {
       totalRows: parsed.rows.length,
       status: "processing",
       policyMode: input.policyMode,
+      machineProfileId: DEFAULT_BATCH_MACHINE_PROFILE_ID,
       startedAt: new Date()
     }
   });
 
-  const results = [] as Array<{ rowIndex: number; status: "success" | "failed"; error?: string }>;
+  const results = [] as Array<{ rowIndex: number; status: "success" | "failed" | "queued"; error?: string }>;
   const zone = await prisma.productProfile.findUnique({ where: { id: input.productProfileId } });
   if (!zone) throw new AppError("Invalid product profile", 400, "INVALID_PRODUCT_PROFILE");
   const tokenDefinitions: TokenDefinition[] = template.tokenDefinitions.map((definition) => ({
@@ -94,6 +105,23 @@ export async function createBatchRun(rawInput: unknown) {
       continue;
     }
 
+    if (queued) {
+      await prisma.batchRunItem.create({
+        data: {
+          batchRunId: batch.id,
+          rowIndex: i + 1,
+          rowDataJson: row,
+          resolvedTokensJson: mapped,
+          status: "queued",
+          warningsJson: policyResult.warnings,
+          placementJson: policyResult.document as Prisma.InputJsonValue,
+          placementHash: fingerprint(policyResult.document)
+        }
+      });
+      results.push({ rowIndex: i + 1, status: "queued" });
+      continue;
+    }
+
     const item = await prisma.batchRunItem.create({
       data: {
         batchRunId: batch.id,
@@ -106,23 +134,32 @@ export async function createBatchRun(rawInput: unknown) {
     });
 
     const rendered = await renderProofImage({ placementDocument: policyResult.document, productProfileId: zone.id, rowIndex: i + 1 });
-    await prisma.designJob.create({
-      data: {
-        orderRef: mapped.order_number,
-        productProfileId: input.productProfileId,
-        machineProfileId: "fiber-galvo-300-lens-default",
-        status: "draft",
-        placementJson: policyResult.document as Prisma.InputJsonValue,
-        proofImagePath: rendered.imagePath,
-        placementHash: fingerprint(policyResult.document),
-        templateId: template.id,
-        batchRunItemId: item.id
-      }
+    await prisma.$transaction(async (tx) => {
+      const job = await tx.designJob.create({
+        data: {
+          orderRef: mapped.order_number,
+          productProfileId: input.productProfileId,
+          machineProfileId: DEFAULT_BATCH_MACHINE_PROFILE_ID,
+          status: "draft",
+          placementJson: policyResult.document as Prisma.InputJsonValue,
+          proofImagePath: rendered.imagePath,
+          placementHash: fingerprint(policyResult.document),
+          templateId: template.id,
+          batchRunItemId: item.id
+        }
+      });
+      await recordJobChange(tx, null, job);
     });
 
     results.push({ rowIndex: i + 1, status: "success" });
   }
 
+  // The worker finalizes the run once its last queued item is done.
+  if (results.some((r) => r.status === "queued")) {
+    await logAudit("batch.start", "BatchRun", { entityId: batch.id, correlationId: batch.id });
+    return batch;
+  }
+
   const validRows = results.filter((r) => r.status === "success").length;
   const invalidRows = results.length - validRows;
 
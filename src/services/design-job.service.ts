@@ -1,6 +1,7 @@
 import { prisma } from "@/lib/prisma";
 import { AppError } from "@/lib/errors";
 import { parsePlacementDocument } from "@/lib/placement/document";
+import { lockSummaryJob, recordJobChange } from "@/lib/designJobs/summary";
 import {
   createDesignJobSchema,
   CreateDesignJobInput,
@@ -21,20 +22,24 @@ export async function createDesignJob(rawInput: unknown) {
 
   const placementJson = parsePlacementDocument(input.placementJson);
 
-  const job = await prisma.designJob.create({
-    data: {
-      orderRef: input.orderRef,
-      productProfileId: input.productProfileId,
-      machineProfileId: input.machineProfileId,
-      placementJson,
-      previewImagePath: input.previewImagePath,
-      proofImagePath: input.previewImagePath,
-      status: "draft"
-    },
-    include: {
-      productProfile: true,
-      machineProfile: true
-    }
+  const job = await prisma.$transaction(async (tx) => {
+    const created = await tx.designJob.create({
+      data: {
+        orderRef: input.orderRef,
+        productProfileId: input.productProfileId,
+        machineProfileId: input.machineProfileId,
+        placementJson,
+        previewImagePath: input.previewImagePath,
+        proofImagePath: input.previewImagePath,
+        status: "draft"
+      },
+      include: {
+        productProfile: true,
+        machineProfile: true
+      }
+    });
+    await recordJobChange(tx, null, created);
+    return created;
   });
 
   return job;
@@ -50,16 +55,28 @@ export async function updateDesignJobPlacement(id: string, rawInput: unknown) {
 
   const placementJson = parsePlacementDocument(input.placementJson);
 
-  const job = await prisma.designJob.update({
-    where: { id },
-    data: {
-      placementJson
-    },
-    include: {
-      productProfile: true,
-      machineProfile: true,
-      assets: true
+  const job = await prisma.$transaction(async (tx) => {
+    const before = await lockSummaryJob(tx, id);
+    if (!before) {
+      throw new AppError("DesignJob not found", 404, "NOT_FOUND");
     }
+
+    // A new placement invalidates the last preflight result.
+    const updated = await tx.designJob.update({
+      where: { id },
+      data: {
+        placementJson,
+        preflightStatus: null,
+        preflightCheckedAt: null
+      },
+      include: {
+        productProfile: true,
+        machineProfile: true,
+        assets: true
+      }
+    });
+    await recordJobChange(tx, before, updated);
+    return updated;
   });
 
   return { ...job, placementJson: parsePlacementDocument(job.placementJson) };
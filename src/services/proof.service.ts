@@ -2,6 +2,7 @@ import JSZip from "jszip";
 import sharp from "sharp";
 import { prisma } from "@/lib/prisma";
 import { AppError } from "@/lib/errors";
+import { lockSummaryJob, recordJobChange } from "@/lib/designJobs/summary";
 import { createDefaultPlacementDocument } from "@/schemas/placement";
 import { createTracerAsset, readTracerAsset } from "@/lib/tracer-asset-store";
 import { defaultTemplateId, getTemplateById } from "@/lib/templates";
@@ -112,19 +113,23 @@ export async function createProofJobFromTracerSvg(sourceSvgAssetId: string) {
   const template = getTemplateById(defaultTemplateId);
   const placement = resolvePlacementMm(null);
 
-  return prisma.designJob.create({
-    data: {
-      productProfileId: product.id,
-      machineProfileId: machine.id,
-      placementJson: createDefaultPlacementDocument(),
-      sourceSvgAssetId,
-      proofTemplateId: template.id,
-      proofDpi: template.defaultDpi,
-      proofPlacementJson: placement,
-      proofPlacementMmJson: placement,
-      proofUiSettingsJson: proofUiSettingsSchema.parse({}),
-      proofStatus: "draft"
-    }
+  return prisma.$transaction(async (tx) => {
+    const job = await tx.designJob.create({
+      data: {
+        productProfileId: product.id,
+        machineProfileId: machine.id,
+        placementJson: createDefaultPlacementDocument(),
+        sourceSvgAssetId,
+        proofTemplateId: template.id,
+        proofDpi: template.defaultDpi,
+        proofPlacementJson: placement,
+        proofPlacementMmJson: placement,
+        proofUiSettingsJson: proofUiSettingsSchema.parse({}),
+        proofStatus: "draft"
+      }
+    });
+    await recordJobChange(tx, null, job);
+    return job;
   });
 }
 
@@ -247,13 +252,17 @@ export async function exportProofPackage(jobId: string) {
     originalName: `production-package-${job.id}.zip`
   });
 
-  await prisma.designJob.update({
-    where: { id: jobId },
-    data: {
-      exportZipAssetId: zipAsset.id,
-      proofStatus: "exported",
-      status: "exported"
-    }
+  await prisma.$transaction(async (tx) => {
+    const before = await lockSummaryJob(tx, jobId);
+    const exported = await tx.designJob.update({
+      where: { id: jobId },
+      data: {
+        exportZipAssetId: zipAsset.id,
+        proofStatus: "exported",
+        status: "exported"
+      }
+    });
+    await recordJobChange(tx, before, exported);
   });
 
   return {
@@ -2,6 +2,7 @@ import { prisma } from "@/lib/prisma";
 import { Prisma } from "@prisma/client";
 import { AppError } from "@/lib/errors";
 import { fingerprint } from "@/lib/canonical";
+import { lockSummaryJob, recordJobChange } from "@/lib/designJobs/summary";
 import { applyTemplateSchema, createTemplateSchema, patchTemplateSchema } from "@/schemas/template";
 import { logAudit } from "./audit.service";
 import { remapDocumentToProfile } from "@/lib/placement-policy";
@@ -98,13 +99,22 @@ export async function applyTemplate(id: string, rawInput: unknown) {
     return { placementDocument, warnings };
   }
 
-  const job = await prisma.designJob.update({
-    where: { id: input.designJobId },
-    data: {
-      placementJson: placementDocument as Prisma.InputJsonValue,
-      templateId: id,
-      placementHash: fingerprint(placementDocument)
-    }
+  const designJobId = input.designJobId;
+  const job = await prisma.$transaction(async (tx) => {
+    const before = await lockSummaryJob(tx, designJobId);
+    // A new placement invalidates the last preflight result.
+    const updated = await tx.designJob.update({
+      where: { id: designJobId },
+      data: {
+        placementJson: placementDocument as Prisma.InputJsonValue,
+        templateId: id,
+        placementHash: fingerprint(placementDocument),
+        preflightStatus: null,
+        preflightCheckedAt: null
+      }
+    });
+    await recordJobChange(tx, before, updated);
+    return updated;
   });
 
   await logAudit("template.apply", "DesignJob", { entityId: job.id, payloadJson: { templateId: id, warnings } });